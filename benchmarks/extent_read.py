@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark de lectura de archivos fragmentados en FiUnamFS
+
+Mide el throughput de lectura de un mismo archivo guardado en 1, 2, 8, 32
+y 125 extents (o los que se pidan con --extents):
+- export: export_file() completo a un archivo temporal
+- read: lecturas secuenciales de --chunk bytes con _read_file_data(), como
+  las que hace el montaje FUSE
+
+Para cada número de extents se formatea una imagen temporal y se dejan
+huecos libres del tamaño adecuado (archivos separadores de un cluster),
+así que import_file() reparte el archivo en exactamente esos huecos. El
+cache de clusters se desactiva para medir la ruta hacia la imagen.
+
+Uso:
+    python3 benchmarks/extent_read.py
+    python3 benchmarks/extent_read.py --size 64 --extents 1 16 256
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Agregar src/ al path para poder importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.filesystem import Filesystem, format_image
+
+
+def fragment_free_space(fs: Filesystem, pieces: int, piece_clusters: int) -> None:
+    """
+    Deja el espacio libre de la imagen en pieces huecos de piece_clusters.
+
+    Args:
+        fs: Filesystem recién formateado
+        pieces: Huecos a dejar
+        piece_clusters: Clusters de cada hueco
+    """
+    cluster_size = fs.superblock.cluster_size
+
+    for i in range(pieces):
+        fs.create_file(f'h{i}')
+        fs.truncate_file(f'h{i}', piece_clusters * cluster_size)
+        fs.create_file(f's{i}')
+        fs.truncate_file(f's{i}', 1)
+
+    # Ocupar el resto para que ningún hueco contiguo alcance al archivo
+    fs.create_file('resto')
+    fs.truncate_file('resto', fs.cluster_map.largest_contiguous_block() * cluster_size)
+
+    for i in range(pieces):
+        fs.delete_file(f'h{i}')
+
+
+def best_of(repeats: int, func) -> float:
+    """
+    Ejecuta func varias veces y retorna el menor tiempo.
+
+    Args:
+        repeats: Repeticiones
+        func: Función sin argumentos a medir
+
+    Returns:
+        Segundos de la ejecución más rápida
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(size: int, cluster_size: int, extents: int, chunk: int, repeats: int,
+        workdir: str) -> dict:
+    """
+    Mide un archivo de size bytes repartido en extents huecos.
+
+    Args:
+        size: Tamaño del archivo en bytes
+        cluster_size: Tamaño de cluster de la imagen
+        extents: Extents en que se guarda el archivo
+        chunk: Bytes por lectura en la medición 'read'
+        repeats: Repeticiones (se reporta la mejor)
+        workdir: Directorio para la imagen y los archivos temporales
+
+    Returns:
+        Diccionario con 'extents', 'export_mb_s' y 'read_mb_s'
+    """
+    image = os.path.join(workdir, 'bench.img')
+    source = os.path.join(workdir, 'source.bin')
+    exported = os.path.join(workdir, 'export.bin')
+
+    clusters = -(-size // cluster_size)
+    format_image(image, clusters * 3, cluster_size, 512, overwrite=True)
+
+    with open(source, 'wb') as f:
+        f.write(os.urandom(size))
+
+    with Filesystem(image, cache_bytes=0) as fs:
+        if extents > 1:
+            fragment_free_space(fs, extents, -(-clusters // extents))
+        result = fs.import_file(source, 'big')
+        entry = fs._find_file('big')
+
+        export_time = best_of(repeats, lambda: fs.export_file('big', exported))
+
+        def read_all():
+            for offset in range(0, size, chunk):
+                fs._read_file_data(entry, offset, chunk)
+
+        read_time = best_of(repeats, read_all)
+
+    return {
+        'extents': result['extents'],
+        'export_mb_s': size / export_time / 1e6,
+        'read_mb_s': size / read_time / 1e6
+    }
+
+
+def main():
+    """Función principal - parsea argumentos y muestra la tabla."""
+    parser = argparse.ArgumentParser(
+        description='Throughput de lectura de FiUnamFS según el número de extents'
+    )
+    parser.add_argument('--size', type=int, default=32,
+                        help='Tamaño del archivo en MB (default: 32)')
+    parser.add_argument('--cluster-size', type=int, default=4096,
+                        help='Tamaño de cluster en bytes (default: 4096)')
+    parser.add_argument('--extents', type=int, nargs='+', default=[1, 2, 8, 32, 125],
+                        help='Números de extents a medir (default: 1 2 8 32 125)')
+    parser.add_argument('--chunk', type=int, default=128 * 1024,
+                        help='Bytes por lectura secuencial (default: 131072)')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Repeticiones por medición (default: 3)')
+    args = parser.parse_args()
+
+    size = args.size * 1024 * 1024
+    print(f"Archivo de {args.size} MB, clusters de {args.cluster_size} bytes, "
+          f"lecturas de {args.chunk} bytes")
+    print(f"{'extents':>8} {'export MB/s':>12} {'read MB/s':>10}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for extents in args.extents:
+            row = run(size, args.cluster_size, extents, args.chunk, args.repeats, workdir)
+            print(f"{row['extents']:>8} {row['export_mb_s']:>12.0f} {row['read_mb_s']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
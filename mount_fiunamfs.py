@@ -18,6 +18,12 @@ Ejemplos:
     # Montar con debug habilitado
     python3 mount_fiunamfs.py fiunamfs/fiunamfs.img /mnt/fiunamfs -f -d
 
+    # Montar en solo lectura (la imagen se abre con O_RDONLY)
+    python3 mount_fiunamfs.py fiunamfs/fiunamfs.img /mnt/fiunamfs -o ro
+
+    # Devolver al host el espacio de los archivos eliminados
+    python3 mount_fiunamfs.py fiunamfs/fiunamfs.img /mnt/fiunamfs --discard
+
 Desmontar:
     fusermount -u /mnt/fiunamfs        # Linux
     umount /mnt/fiunamfs               # macOS
@@ -27,6 +33,7 @@ Autor: PaoGo (pao.gonzma@gmail.com)
 
 import sys
 import os
+import time
 import argparse
 
 # Agregar src/ al path para poder importar módulos
@@ -47,6 +54,9 @@ except ImportError:
     sys.exit(1)
 
 from fuse_mount import FiUnamFSMount
+from models.filesystem import Filesystem
+from models.cluster_cache import DEFAULT_CACHE_BYTES
+from utils.exceptions import FiUnamFSError
 
 
 def main():
@@ -88,6 +98,40 @@ def main():
         help='Opciones de montaje adicionales (ej: -o allow_other,ro)'
     )
 
+    parser.add_argument(
+        '--cache-size',
+        dest='cache_bytes',
+        type=int,
+        default=DEFAULT_CACHE_BYTES,
+        help=f'Presupuesto del cache de clusters en bytes (default: {DEFAULT_CACHE_BYTES}, 0 = sin cache)'
+    )
+
+    parser.add_argument(
+        '--show-stats',
+        action='store_true',
+        help='Listar el archivo virtual de métricas /.fiunamfs_stats en el directorio raíz'
+    )
+
+    parser.add_argument(
+        '--stats-json',
+        dest='stats_json',
+        default=None,
+        help='Archivo donde volcar las métricas en JSON al desmontar'
+    )
+
+    parser.add_argument(
+        '--warm-cache',
+        action='store_true',
+        help='Precargar los datos de los archivos en el cache antes de montar'
+    )
+
+    parser.add_argument(
+        '--discard',
+        action='store_true',
+        help='Perforar en la imagen (en segundo plano) los clusters que se liberan, '
+             'para que ocupe menos disco en el host'
+    )
+
     args = parser.parse_args()
 
     # Validar que el filesystem existe
@@ -114,28 +158,50 @@ def main():
             print("Montaje cancelado.")
             sys.exit(0)
 
-    # Crear instancia de FiUnamFSMount
+    # Abrir y validar la imagen una sola vez; la misma instancia se monta
+    started = time.perf_counter()
+    mount_options = [option.strip() for option in args.mount_options.split(',') if option.strip()]
+    read_only = 'ro' in mount_options
+
     try:
-        fs_operations = FiUnamFSMount(args.filesystem)
-    except Exception as e:
+        filesystem = Filesystem(args.filesystem, cache_bytes=args.cache_bytes,
+                                read_only=read_only, discard=args.discard)
+    except (OSError, FiUnamFSError) as e:
         print(f"Error al abrir el filesystem: {e}", file=sys.stderr)
         sys.exit(1)
 
+    fs_operations = FiUnamFSMount(
+        args.filesystem,
+        show_stats=args.show_stats,
+        stats_json=os.path.abspath(args.stats_json) if args.stats_json else None,
+        filesystem=filesystem
+    )
+
+    # Construir índices y caches antes de entregar el control a FUSE
+    startup = fs_operations.warm_up(prefetch_data=args.warm_cache, started=started)
+    memory_kb = sum(startup['memory'].values()) / 1024
+    print(f"Filesystem listo en {startup['ready_ms']:.1f} ms "
+          f"({memory_kb:.1f} KB en memoria: " +
+          ", ".join(f"{name}={size / 1024:.1f} KB" for name, size in startup['memory'].items()) +
+          ")")
+
     # Preparar opciones de montaje
     fuse_options = {
         'foreground': args.foreground,
         'debug': args.debug,
         'nothreads': True,  # FiUnamFS no es thread-safe para múltiples operaciones simultáneas
+        # Descartar el page cache de un archivo al abrirlo si cambió su
+        # mtime o tamaño (e.g., modificado por la CLI con la imagen montada)
+        'auto_cache': True,
     }
 
     # Agregar opciones adicionales si se especificaron
-    if args.mount_options:
-        for option in args.mount_options.split(','):
-            key_val = option.split('=', 1)
-            if len(key_val) == 2:
-                fuse_options[key_val[0]] = key_val[1]
-            else:
-                fuse_options[key_val[0]] = True
+    for option in mount_options:
+        key_val = option.split('=', 1)
+        if len(key_val) == 2:
+            fuse_options[key_val[0]] = key_val[1]
+        else:
+            fuse_options[key_val[0]] = True
 
     # Mensaje informativo
     print(f"Montando '{args.filesystem}' en '{args.mountpoint}'...")
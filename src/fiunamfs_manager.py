@@ -54,7 +54,8 @@ from services.ui_thread import (
     submit_command,
     wait_for_result,
     display_result,
-    display_error_result
+    display_error_result,
+    format_fsck_line
 )
 
 
@@ -74,6 +75,79 @@ def prompt_confirmation(filename: str, size: int) -> bool:
     return response in ['s', 'si', 'sí', 'y', 'yes']
 
 
+def parse_size(text: str) -> int:
+    """
+    Convierte un tamaño con sufijo opcional (K, M, G) a bytes.
+
+    Args:
+        text: Tamaño, por ejemplo '4096', '512M' o '2G'
+
+    Returns:
+        Tamaño en bytes
+
+    Raises:
+        argparse.ArgumentTypeError: Si el texto no es un tamaño válido
+    """
+    multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper().rstrip('B')
+    factor = multipliers.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+
+    try:
+        size = int(text) * factor
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamaño inválido: '{text}'")
+
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"El tamaño debe ser positivo: '{text}'")
+
+    return size
+
+
+def cmd_format(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'format' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'format', {
+            'total_clusters': args.size // args.cluster_size,
+            'cluster_size': args.cluster_size,
+            'directory_entries': args.entries,
+            'label': args.label,
+            'overwrite': args.force
+        })
+
+        result = wait_for_result(result_queue, timeout=10.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
 def cmd_list(args: argparse.Namespace) -> int:
     """
     Ejecuta el comando 'list' usando arquitectura de threading.
@@ -88,13 +162,13 @@ def cmd_list(args: argparse.Namespace) -> int:
     command_queue = queue.Queue()  # UI → I/O
     result_queue = queue.Queue()   # I/O → UI
 
-    # Crear e iniciar hilo de E/S
-    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    # Crear e iniciar hilo de E/S (solo lectura: no bloquea a escritores)
+    io_thread = IOThread(args.filesystem, command_queue, result_queue, read_only=True)
     io_thread.start()
 
     try:
         # Enviar comando 'list' al hilo de E/S (non-blocking put)
-        submit_command(command_queue, 'list', None)
+        submit_command(command_queue, 'list', {'path': args.path})
 
         # Esperar resultado del hilo de E/S (blocking get con timeout)
         result = wait_for_result(result_queue, timeout=10.0)
@@ -131,13 +205,14 @@ def cmd_export(args: argparse.Namespace) -> int:
     command_queue = queue.Queue()
     result_queue = queue.Queue()
 
-    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread = IOThread(args.filesystem, command_queue, result_queue, read_only=True)
     io_thread.start()
 
     try:
         submit_command(command_queue, 'export', {
             'filename': args.filename,
-            'dest_path': args.destination
+            'dest_path': args.destination,
+            'verify': args.verify
         })
 
         result = wait_for_result(result_queue, timeout=10.0)
@@ -177,7 +252,9 @@ def cmd_import(args: argparse.Namespace) -> int:
     try:
         submit_command(command_queue, 'import', {
             'src_path': args.source,
-            'filename': args.name
+            'filename': args.name,
+            'dedup': args.dedup,
+            'compress': args.compress
         })
 
         result = wait_for_result(result_queue, timeout=10.0)
@@ -198,6 +275,297 @@ def cmd_import(args: argparse.Namespace) -> int:
         io_thread.join(timeout=5.0)
 
 
+def cmd_copy(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'copy' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'copy', {
+            'src_name': args.source,
+            'dst_name': args.destination
+        })
+
+        result = wait_for_result(result_queue, timeout=10.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
+def cmd_mkdir(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'mkdir' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'mkdir', {'path': args.path})
+
+        result = wait_for_result(result_queue, timeout=10.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
+def cmd_rmdir(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'rmdir' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'rmdir', {'path': args.path})
+
+        result = wait_for_result(result_queue, timeout=10.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
+def cmd_scrub(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'scrub' usando arquitectura de threading.
+
+    Cada imagen se verifica con su propio hilo de E/S (en solo lectura),
+    una después de otra.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = sin daños, 1 = archivos dañados o error)
+    """
+    exit_code = 0
+
+    for fs_path in args.filesystem:
+        command_queue = queue.Queue()
+        result_queue = queue.Queue()
+
+        io_thread = IOThread(fs_path, command_queue, result_queue, read_only=True)
+        io_thread.start()
+
+        try:
+            submit_command(command_queue, 'scrub', {'workers': args.workers})
+
+            # Leer toda la imagen puede tardar más que otros comandos
+            result = wait_for_result(result_queue, timeout=3600.0)
+
+            if result['status'] == 'success':
+                display_result(result)
+                if result['corrupted']:
+                    exit_code = 1
+            else:
+                display_error_result(result)
+                exit_code = 1
+
+        except queue.Empty:
+            print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+            exit_code = 1
+
+        finally:
+            submit_command(command_queue, 'exit', None)
+            io_thread.join(timeout=5.0)
+
+    return exit_code
+
+
+def cmd_clone(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'clone' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue, read_only=True)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'clone', {
+            'dest_path': args.destination,
+            'overwrite': args.force
+        })
+
+        # Copiar una imagen grande puede tardar más que otros comandos
+        result = wait_for_result(result_queue, timeout=3600.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
+def cmd_discard(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'discard' usando arquitectura de threading.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = éxito, 1 = error)
+    """
+    command_queue = queue.Queue()
+    result_queue = queue.Queue()
+
+    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread.start()
+
+    try:
+        submit_command(command_queue, 'discard', {})
+
+        # Sin soporte de perforación se escriben ceros: puede tardar
+        result = wait_for_result(result_queue, timeout=3600.0)
+
+        if result['status'] == 'success':
+            display_result(result)
+            return 0
+        else:
+            display_error_result(result)
+            return 1
+
+    except queue.Empty:
+        print("\n❌ Error: Timeout esperando respuesta del filesystem", file=sys.stderr)
+        return 1
+
+    finally:
+        submit_command(command_queue, 'exit', None)
+        io_thread.join(timeout=5.0)
+
+
+def cmd_fsck(args: argparse.Namespace) -> int:
+    """
+    Ejecuta el comando 'fsck' usando arquitectura de threading.
+
+    Cada imagen se revisa con su propio hilo de E/S (en solo lectura salvo
+    con --repair). Con --batch se imprime una línea por imagen.
+
+    Args:
+        args: Argumentos parseados de argparse
+
+    Returns:
+        Código de salida (0 = sin errores pendientes, 1 = errores sin
+        reparar o imágenes que no se pudieron abrir)
+    """
+    exit_code = 0
+
+    for fs_path in args.filesystem:
+        command_queue = queue.Queue()
+        result_queue = queue.Queue()
+
+        io_thread = IOThread(fs_path, command_queue, result_queue, read_only=not args.repair)
+        io_thread.start()
+
+        try:
+            submit_command(command_queue, 'fsck', {'repair': args.repair})
+
+            result = wait_for_result(result_queue, timeout=10.0)
+            result.setdefault('filesystem', fs_path)
+
+            if result['status'] != 'success' or result['errors']:
+                exit_code = 1
+
+            if args.batch:
+                print(format_fsck_line(result))
+            elif result['status'] == 'success':
+                display_result(result)
+            else:
+                display_error_result(result)
+
+        except queue.Empty:
+            print(f"\n❌ Error: Timeout esperando respuesta del filesystem ({fs_path})",
+                  file=sys.stderr)
+            exit_code = 1
+
+        finally:
+            submit_command(command_queue, 'exit', None)
+            io_thread.join(timeout=5.0)
+
+    return exit_code
+
+
 def cmd_delete(args: argparse.Namespace) -> int:
     """
     Ejecuta el comando 'delete' usando arquitectura de threading.
@@ -211,7 +579,7 @@ def cmd_delete(args: argparse.Namespace) -> int:
     command_queue = queue.Queue()
     result_queue = queue.Queue()
 
-    io_thread = IOThread(args.filesystem, command_queue, result_queue)
+    io_thread = IOThread(args.filesystem, command_queue, result_queue, discard=args.discard)
     io_thread.start()
 
     try:
@@ -275,15 +643,61 @@ def main():
         required=True
     )
 
+    # Comando: format
+    parser_format = subparsers.add_parser(
+        'format',
+        help='Crea una imagen vacía con geometría configurable (versión 26-3)'
+    )
+    parser_format.add_argument(
+        'filesystem',
+        help='Ruta de la imagen a crear (.img)'
+    )
+    parser_format.add_argument(
+        '--size',
+        type=parse_size,
+        required=True,
+        help='Tamaño total de la imagen (acepta sufijos K, M y G, por ejemplo 512M)'
+    )
+    parser_format.add_argument(
+        '--cluster-size',
+        dest='cluster_size',
+        type=parse_size,
+        default=4096,
+        help='Tamaño de cluster en bytes, potencia de 2 entre 512 y 1M (default: 4096)'
+    )
+    parser_format.add_argument(
+        '--entries',
+        type=int,
+        default=1024,
+        help='Entradas de directorio mínimas (default: 1024)'
+    )
+    parser_format.add_argument(
+        '--label',
+        default='FiUnamFS',
+        help='Etiqueta del volumen, hasta 16 caracteres (default: FiUnamFS)'
+    )
+    parser_format.add_argument(
+        '--force',
+        action='store_true',
+        help='Reemplazar la imagen si ya existe'
+    )
+    parser_format.set_defaults(func=cmd_format)
+
     # Comando: list
     parser_list = subparsers.add_parser(
         'list',
-        help='Lista todos los archivos del filesystem'
+        help='Lista los archivos de un directorio del filesystem'
     )
     parser_list.add_argument(
         'filesystem',
         help='Ruta a la imagen del filesystem (.img)'
     )
+    parser_list.add_argument(
+        'path',
+        nargs='?',
+        default='',
+        help='Directorio a listar (opcional, por defecto la raíz)'
+    )
     parser_list.set_defaults(func=cmd_list)
 
     # Comando: export
@@ -297,12 +711,17 @@ def main():
     )
     parser_export.add_argument(
         'filename',
-        help='Nombre del archivo a exportar (dentro del filesystem)'
+        help='Nombre o ruta del archivo a exportar (dentro del filesystem)'
     )
     parser_export.add_argument(
         'destination',
         help='Ruta destino donde guardar el archivo'
     )
+    parser_export.add_argument(
+        '--verify',
+        action='store_true',
+        help='Verificar el CRC32 del archivo al exportarlo'
+    )
     parser_export.set_defaults(func=cmd_export)
 
     # Comando: import
@@ -322,10 +741,40 @@ def main():
         '--name',
         dest='name',
         default=None,
-        help='Nombre para el archivo en FiUnamFS (opcional, usa nombre del archivo fuente por defecto)'
+        help='Nombre o ruta para el archivo en FiUnamFS, e.g. docs/a.txt (opcional, usa nombre del archivo fuente por defecto)'
+    )
+    parser_import.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Si la imagen ya tiene un archivo idéntico, compartir sus clusters en vez de copiar'
+    )
+    parser_import.add_argument(
+        '--compress',
+        choices=['zlib', 'lzma'],
+        default=None,
+        help='Guardar el archivo comprimido (se omite si sus datos no se reducen)'
     )
     parser_import.set_defaults(func=cmd_import)
 
+    # Comando: copy
+    parser_copy = subparsers.add_parser(
+        'copy',
+        help='Copia un archivo dentro del filesystem (sin pasar por el sistema local)'
+    )
+    parser_copy.add_argument(
+        'filesystem',
+        help='Ruta a la imagen del filesystem (.img)'
+    )
+    parser_copy.add_argument(
+        'source',
+        help='Nombre del archivo a copiar (dentro del filesystem)'
+    )
+    parser_copy.add_argument(
+        'destination',
+        help='Nombre de la copia (dentro del filesystem)'
+    )
+    parser_copy.set_defaults(func=cmd_copy)
+
     # Comando: delete
     parser_delete = subparsers.add_parser(
         'delete',
@@ -339,8 +788,114 @@ def main():
         'filename',
         help='Nombre del archivo a eliminar (dentro del filesystem)'
     )
+    parser_delete.add_argument(
+        '--discard',
+        action='store_true',
+        help='Perforar en la imagen los clusters liberados (la imagen ocupa menos disco en el host)'
+    )
     parser_delete.set_defaults(func=cmd_delete)
 
+    # Comando: mkdir
+    parser_mkdir = subparsers.add_parser(
+        'mkdir',
+        help='Crea un subdirectorio en el filesystem'
+    )
+    parser_mkdir.add_argument(
+        'filesystem',
+        help='Ruta a la imagen del filesystem (.img)'
+    )
+    parser_mkdir.add_argument(
+        'path',
+        help='Ruta del subdirectorio a crear (su directorio padre debe existir)'
+    )
+    parser_mkdir.set_defaults(func=cmd_mkdir)
+
+    # Comando: rmdir
+    parser_rmdir = subparsers.add_parser(
+        'rmdir',
+        help='Elimina un subdirectorio vacío del filesystem'
+    )
+    parser_rmdir.add_argument(
+        'filesystem',
+        help='Ruta a la imagen del filesystem (.img)'
+    )
+    parser_rmdir.add_argument(
+        'path',
+        help='Ruta del subdirectorio a eliminar'
+    )
+    parser_rmdir.set_defaults(func=cmd_rmdir)
+
+    # Comando: scrub
+    parser_scrub = subparsers.add_parser(
+        'scrub',
+        help='Verifica el CRC32 de todos los archivos de una o varias imágenes'
+    )
+    parser_scrub.add_argument(
+        'filesystem',
+        nargs='+',
+        help='Rutas de las imágenes a verificar (.img)'
+    )
+    parser_scrub.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Hilos de verificación por imagen (default: 4)'
+    )
+    parser_scrub.set_defaults(func=cmd_scrub)
+
+    # Comando: fsck
+    parser_fsck = subparsers.add_parser(
+        'fsck',
+        help='Verifica (y opcionalmente repara) la consistencia de una o varias imágenes'
+    )
+    parser_fsck.add_argument(
+        'filesystem',
+        nargs='+',
+        help='Rutas de las imágenes a revisar (.img)'
+    )
+    parser_fsck.add_argument(
+        '--repair',
+        action='store_true',
+        help='Reparar los errores seguros (tamaños que exceden su espacio, reservas traslapadas)'
+    )
+    parser_fsck.add_argument(
+        '--batch',
+        action='store_true',
+        help='Una línea por imagen (para revisar muchas imágenes)'
+    )
+    parser_fsck.set_defaults(func=cmd_fsck)
+
+    # Comando: clone
+    parser_clone = subparsers.add_parser(
+        'clone',
+        help='Copia una imagen completa sin escribir sus bloques vacíos (copia dispersa)'
+    )
+    parser_clone.add_argument(
+        'filesystem',
+        help='Ruta de la imagen a copiar (.img)'
+    )
+    parser_clone.add_argument(
+        'destination',
+        help='Ruta de la copia'
+    )
+    parser_clone.add_argument(
+        '--force',
+        action='store_true',
+        help='Reemplazar la copia si ya existe'
+    )
+    parser_clone.set_defaults(func=cmd_clone)
+
+    # Comando: discard
+    parser_discard = subparsers.add_parser(
+        'discard',
+        help='Perfora en la imagen todos los clusters libres (devuelve su espacio al host)'
+    )
+    parser_discard.add_argument(
+        'filesystem',
+        help='Ruta a la imagen del filesystem (.img)'
+    )
+    parser_discard.set_defaults(func=cmd_discard)
+
     # Parsear argumentos
     args = parser.parse_args()
 
@@ -10,21 +10,60 @@ OPERACIONES IMPLEMENTADAS:
 Lectura:
 - getattr(): Obtener atributos de archivos/directorios
 - readdir(): Listar contenidos del directorio
-- read(): Leer contenido de un archivo
+- open()/release(): Abrir y cerrar file handles
+- read(): Leer contenido de un archivo (con read-ahead secuencial)
 
 Escritura:
-- write(): Escribir datos a un archivo
+- write(): Escribir datos a un archivo (en sitio cuando es posible)
 - create(): Crear un nuevo archivo
-- truncate(): Truncar archivo (para sobrescritura)
+- truncate(): Truncar o extender un archivo a cualquier longitud
+- fallocate(): Preasignar espacio contiguo (con o sin FALLOC_FL_KEEP_SIZE)
+
+Metadatos:
+- rename(): Renombrar o mover un archivo o directorio (reemplazo atómico
+  del destino)
+- utimens(): Actualizar el tiempo de modificación
+
+Directorios:
+- mkdir(): Crear un subdirectorio
+- rmdir(): Eliminar un subdirectorio vacío
 
 Eliminación:
 - unlink(): Eliminar un archivo
 
+Con -o ro la imagen se abre con O_RDONLY y las operaciones de escritura
+responden EROFS.
+
+CAMBIOS EXTERNOS Y BLOQUEOS:
+
+Cada operación se ejecuta con el bloqueo advisory compartido de la imagen
+(utils/locking.py); las que escriben lo elevan a exclusivo solo mientras
+modifican el directorio, así que la CLI puede leer en paralelo y sus
+escrituras nunca asignan los mismos clusters que el montaje.
+
+Antes de cada operación se compara la firma de la imagen (un fstat). Si
+otro proceso la modificó (e.g., la CLI con el filesystem montado), solo se
+relee la región de directorio y se actualizan los slots que cambiaron;
+el cache de atributos y el de clusters se invalidan por generación y por
+rango. fusepy no expone las notificaciones de invalidación del kernel, así
+que el montaje usa la opción auto_cache (el page cache se descarta al
+abrir un archivo cuyo mtime o tamaño cambió) y el tiempo de vida por
+defecto de atributos y entradas (1 segundo).
+
+MÉTRICAS:
+
+Cada operación se mide en __call__() (llamadas, bytes, errores e histograma
+de latencias). Las métricas se exponen en el archivo virtual de solo
+lectura /.fiunamfs_stats (JSON) y pueden volcarse a un archivo al desmontar.
+
 ARQUITECTURA:
 
 El módulo usa la clase Filesystem existente para todas las operaciones,
-manteniendo la consistencia con la CLI. No requiere threading adicional
-ya que FUSE maneja las llamadas en su propio contexto de hilos.
+manteniendo la consistencia con la CLI. Las operaciones se ejecutan en el
+hilo de FUSE; los hilos adicionales son ReadAheadThread, que precarga en
+el cache de clusters los datos siguientes de las lecturas secuenciales, y
+DiscardThread (solo con discard), que perfora en lote en la imagen los
+clusters que se liberan.
 
 Autor: PaoGo (pao.gonzma@gmail.com)
 """
@@ -34,7 +73,7 @@ import sys
 import errno
 import stat
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 try:
     from fusepy import FUSE, FuseOSError, Operations
@@ -44,13 +83,50 @@ except ImportError:
     sys.exit(1)
 
 from models.filesystem import Filesystem
+from models.cluster_cache import DEFAULT_CACHE_BYTES
+from services.discard import DiscardThread
+from services.readahead import ReadAheadThread, SequentialDetector
+from utils.metrics import OperationMetrics, estimate_size
+from utils.binary_utils import parsear_timestamp
 from utils.exceptions import (
     FileNotFoundInFilesystemError,
     FilenameConflictError,
     NoSpaceError,
-    DirectoryFullError
+    DirectoryFullError,
+    DirectoryNotEmptyError,
+    CompressionError,
+    EntryTypeError,
+    ReadOnlyFilesystemError
+)
+
+
+# Archivo virtual de métricas en la raíz del montaje. Su nombre tiene 15
+# caracteres, así que nunca puede chocar con un archivo real (máximo 14)
+STATS_FILENAME = '.fiunamfs_stats'
+STATS_PATH = '/' + STATS_FILENAME
+
+# Operaciones del archivo virtual de métricas; cualquier otra se rechaza
+STATS_OPERATIONS = ('getattr', 'open', 'read', 'release', 'access', 'flush')
+
+# Operaciones que modifican el filesystem (EROFS si se montó con -o ro)
+WRITE_OPERATIONS = (
+    'create', 'write', 'truncate', 'fallocate', 'rename',
+    'utimens', 'unlink', 'mkdir', 'rmdir', 'mknod', 'symlink', 'link',
+    'chmod', 'chown', 'setxattr', 'removexattr',
 )
 
+# Rutas viejas que el cache de atributos tolera antes de sincronizarse
+# (además del doble de las entradas activas)
+ATTR_CACHE_SLACK = 64
+
+# Modo de fallocate(2): reservar sin cambiar el tamaño visible
+FALLOC_FL_KEEP_SIZE = 0x01
+
+# Valores especiales de tv_nsec en utimensat(2). libfuse los pasa con
+# tv_sec = 0; fusepy entrega segundos (float) o, con use_ns, nanosegundos
+UTIME_NOW = (1 << 30) - 1
+UTIME_OMIT = (1 << 30) - 2
+
 
 class FiUnamFSMount(Operations):
     """
@@ -62,21 +138,289 @@ class FiUnamFSMount(Operations):
     Atributos:
         fs: Instancia de Filesystem (maneja operaciones de bajo nivel)
         fs_path: Ruta al archivo .img del filesystem
+        _attr_cache: Tuplas (entrada, atributos) por ruta. getattr() y
+            readdir() consultan una ruta a la vez: los atributos siguen
+            vigentes si la DirectoryEntry del slot es el mismo objeto.
+            unlink(), rename() y rmdir() descartan las rutas que eliminan;
+            las que desaparecen por otros medios (otro proceso, mover un
+            directorio) se descartan al sincronizarlo con el índice de
+            nombres cuando crece al doble de las entradas activas
+        _handles: Detector de acceso secuencial por file handle abierto
+        _reservations: Archivo con espacio reservado por fallocate(), por
+            file handle; la reserva se confirma en release()
+        readahead: Hilo de read-ahead (se inicia en init(), después de que
+            FUSE pasa a segundo plano)
+        discard: Hilo de discard diferido (solo si el Filesystem se abrió
+            con discard=True; se inicia en init())
+        metrics: Métricas por operación (llamadas, bytes, errores, latencia)
+        show_stats: Si True, /.fiunamfs_stats aparece en readdir()
+        stats_json: Ruta donde volcar las métricas al desmontar (o None)
+        startup: Reporte de warm_up() (tiempo hasta estar listo y memoria)
     """
 
-    def __init__(self, fs_path: str):
+    def __init__(
+        self,
+        fs_path: str,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        show_stats: bool = False,
+        stats_json: Optional[str] = None,
+        filesystem: Optional[Filesystem] = None
+    ):
         """
         Inicializa el mount point de FUSE.
 
         Args:
             fs_path: Ruta al archivo .img del filesystem FiUnamFS
+            cache_bytes: Presupuesto del cache de clusters en bytes
+            show_stats: Listar /.fiunamfs_stats en readdir() (default: False)
+            stats_json: Ruta del volcado JSON de métricas al desmontar
+            filesystem: Filesystem ya abierto y validado (opcional). Si no
+                se da, se abre fs_path con cache_bytes
         """
         self.fs_path = fs_path
-        self.fs = Filesystem(fs_path)
+        self.fs = filesystem if filesystem is not None else Filesystem(fs_path, cache_bytes=cache_bytes)
+
+        # Métricas de operaciones
+        self.metrics = OperationMetrics()
+        self.show_stats = show_stats
+        self.stats_json = stats_json
+        self._stats_snapshot = b''
+        self._stats_handles: Dict[int, bytes] = {}
 
         # Timestamp de montaje (usado para directorio raíz)
         self.mount_time = int(time.time())
 
+        # Cache de atributos (compartido por getattr y readdir)
+        self._attr_cache: Dict[str, tuple] = {}
+
+        # File handles abiertos y read-ahead
+        self._handles: Dict[int, SequentialDetector] = {}
+        self._reservations: Dict[int, str] = {}
+        self._next_fh = 1
+        self.readahead: Optional[ReadAheadThread] = None
+        self.discard: Optional[DiscardThread] = None
+        self.startup: Dict = {}
+
+    def __call__(self, op: str, *args):
+        """
+        Despacha una operación FUSE registrando sus métricas.
+
+        fusepy invoca todas las operaciones a través de este método, por lo
+        que aquí se mide cada llamada (latencia, bytes y errores), se
+        detectan modificaciones externas de la imagen y se atienden las
+        operaciones sobre el archivo virtual de métricas.
+
+        Args:
+            op: Nombre de la operación (e.g., 'read', 'getattr')
+            *args: Argumentos de la operación (el primero suele ser el path)
+
+        Returns:
+            Resultado de la operación
+        """
+        start = time.perf_counter()
+        nbytes = 0
+        error = True
+
+        try:
+            if op in ('init', 'destroy'):
+                result = super().__call__(op, *args)
+            elif self.fs.read_only and op in WRITE_OPERATIONS:
+                raise FuseOSError(errno.EROFS)
+            else:
+                # Bloqueo compartido de la imagen durante la operación (las
+                # escrituras lo elevan a exclusivo); al tomarlo se aplican
+                # los cambios que otro proceso (e.g., la CLI) haya hecho
+                with self.fs.read_lock():
+                    if args and args[0] == STATS_PATH:
+                        result = self._stats_operation(op, *args)
+                    else:
+                        result = super().__call__(op, *args)
+
+            if op == 'read':
+                nbytes = len(result)
+            elif op == 'write':
+                nbytes = result
+
+            if self.discard is not None and op in WRITE_OPERATIONS:
+                # Adelantar el discard si la operación completó un lote
+                self.discard.notify()
+
+            error = False
+            return result
+
+        except ReadOnlyFilesystemError:
+            raise FuseOSError(errno.EROFS)
+        except EntryTypeError as e:
+            # Un directorio usado como archivo o viceversa
+            raise FuseOSError(errno.EISDIR if e.es_directorio else errno.ENOTDIR)
+        except DirectoryNotEmptyError:
+            raise FuseOSError(errno.ENOTEMPTY)
+        except CompressionError:
+            # Datos comprimidos dañados en la imagen
+            raise FuseOSError(errno.EIO)
+
+        finally:
+            self.metrics.record(op, time.perf_counter() - start, nbytes, error)
+
+    def _stats_operation(self, op: str, path: str, *args):
+        """
+        Atiende una operación sobre el archivo virtual /.fiunamfs_stats.
+
+        El contenido se genera en getattr() y cada open() fija esa misma
+        versión para el handle, de modo que el tamaño reportado y los datos
+        leídos coinciden.
+
+        Args:
+            op: Nombre de la operación
+            path: STATS_PATH
+            *args: Resto de argumentos de la operación
+
+        Returns:
+            Resultado de la operación
+
+        Raises:
+            FuseOSError: EACCES para cualquier operación de escritura
+        """
+        if op not in STATS_OPERATIONS:
+            raise FuseOSError(errno.EACCES)
+
+        if op == 'getattr':
+            self._stats_snapshot = self._render_stats()
+            return {
+                'st_mode': stat.S_IFREG | 0o444,  # Solo lectura
+                'st_nlink': 1,
+                'st_size': len(self._stats_snapshot),
+                'st_ctime': self.mount_time,
+                'st_mtime': time.time(),
+                'st_atime': time.time(),
+            }
+
+        if op == 'open':
+            flags = args[0]
+            if flags & (os.O_WRONLY | os.O_RDWR):
+                raise FuseOSError(errno.EACCES)
+            fh = self._new_handle()
+            self._stats_handles[fh] = self._stats_snapshot or self._render_stats()
+            return fh
+
+        if op == 'read':
+            size, offset, fh = args
+            data = self._stats_handles.get(fh, self._stats_snapshot)
+            return data[offset:offset + size]
+
+        if op == 'release':
+            self._stats_handles.pop(args[0], None)
+            return self.release(path, args[0])
+
+        # access, flush
+        return 0
+
+    def warm_up(self, prefetch_data: bool = False, started: Optional[float] = None) -> Dict:
+        """
+        Construye antes de montar todas las estructuras en memoria.
+
+        Tras esta llamada el primer getattr/readdir/lookup no paga ningún
+        costo de construcción: el índice de nombres y el mapa de clusters
+        ya existen (los crea Filesystem), se genera el cache de atributos y
+        se precalcula el bloque libre más grande. Opcionalmente precarga en
+        el cache de clusters los datos de los archivos, hasta el
+        presupuesto del cache.
+
+        Args:
+            prefetch_data: Precargar los clusters de datos de los archivos
+            started: Instante (time.perf_counter()) desde el cual medir el
+                tiempo hasta estar listo; default: el inicio de esta llamada
+
+        Returns:
+            Diccionario con 'ready_ms', 'clusters_prefetched' y 'memory'
+            ({estructura: bytes})
+        """
+        if started is None:
+            started = time.perf_counter()
+
+        self._sync_attr_cache()
+        self.fs.cluster_map.largest_contiguous_block()
+
+        prefetched = 0
+        if prefetch_data:
+            budget = self.fs.cache.max_bytes // self.fs.superblock.cluster_size
+            entries = [self.fs.directory_entries[i] for i in self.fs.name_index.values()]
+            extents = sorted(
+                extent for entry in entries for extent in self.fs._file_extents(entry)
+            )
+            for start, count in extents:
+                n = min(count, budget - prefetched)
+                if n <= 0:
+                    break
+                prefetched += self.fs.prefetch(start, n)
+
+        memory = self.fs.memory_footprint()
+        memory['attr_cache'] = estimate_size(self._attr_cache)
+
+        self.startup = {
+            'ready_ms': round((time.perf_counter() - started) * 1000, 2),
+            'clusters_prefetched': prefetched,
+            'memory': memory
+        }
+        return self.startup
+
+    def _render_stats(self) -> bytes:
+        """
+        Genera el contenido JSON de las métricas actuales.
+
+        Returns:
+            JSON codificado con operaciones, cache, read-ahead y arranque
+        """
+        return self.metrics.to_json(
+            startup=self.startup,
+            space=self.fs.space_stats(),
+            cache=self.fs.cache.stats(),
+            image={
+                'external_refreshes': self.fs.external_refreshes,
+                'generation': self.fs.generation,
+            },
+            readahead={
+                'clusters_prefetched': self.readahead.clusters_prefetched if self.readahead else 0,
+                'open_handles': len(self._handles),
+            },
+            discard={
+                'enabled': self.fs.discard,
+                'pending_clusters': self.fs.discard_pending_clusters,
+                'passes': self.discard.passes if self.discard else 0,
+                'clusters_discarded': self.discard.clusters_discarded if self.discard else 0,
+                'method': self.discard.method if self.discard else None,
+            }
+        )
+
+    def _dump_stats(self) -> None:
+        """Vuelca las métricas en JSON a stats_json (si se configuró)."""
+        if not self.stats_json:
+            return
+
+        try:
+            with open(self.stats_json, 'wb') as f:
+                f.write(self._render_stats())
+        except OSError as e:
+            print(f"Error al volcar métricas en {self.stats_json}: {e}", file=sys.stderr)
+
+    def init(self, path):
+        """
+        Inicialización después de montar.
+
+        Los hilos de read-ahead y de discard se crean aquí y no en
+        __init__() porque al montar en segundo plano FUSE hace fork() y los
+        hilos creados antes no sobreviven.
+
+        Args:
+            path: Path del punto de montaje (ignorado)
+        """
+        self.readahead = ReadAheadThread(self.fs)
+        self.readahead.start()
+
+        if self.fs.discard:
+            self.discard = DiscardThread(self.fs)
+            self.discard.start()
+
     def destroy(self, path):
         """
         Limpieza al desmontar el filesystem.
@@ -84,9 +428,78 @@ class FiUnamFSMount(Operations):
         Args:
             path: Path del punto de montaje (ignorado)
         """
+        # Volcar métricas antes de detener el read-ahead (incluye sus contadores)
+        self._dump_stats()
+
+        if self.readahead:
+            self.readahead.stop()
+            self.readahead.join(timeout=5.0)
+            self.readahead = None
+
+        if self.discard:
+            self.discard.stop()
+            self.discard.join(timeout=5.0)
+            self.discard = None
+
         if self.fs:
+            # Perfora también lo liberado después de la última pasada
             self.fs.close()
 
+    def _new_handle(self) -> int:
+        """
+        Asigna un file handle nuevo con su detector de acceso secuencial.
+
+        Returns:
+            Número de file handle
+        """
+        fh = self._next_fh
+        self._next_fh += 1
+        self._handles[fh] = SequentialDetector()
+        return fh
+
+    def open(self, path: str, flags: int) -> int:
+        """
+        Abre un archivo existente.
+
+        Args:
+            path: Ruta del archivo
+            flags: Flags de apertura (ignorados)
+
+        Returns:
+            File handle asignado
+
+        Raises:
+            FuseOSError: Si el archivo no existe (ENOENT)
+        """
+        if path[1:] not in self.fs.name_index:
+            raise FuseOSError(errno.ENOENT)
+
+        return self._new_handle()
+
+    def release(self, path: str, fh) -> int:
+        """
+        Cierra un file handle, descarta su estado de read-ahead y confirma
+        la reserva de espacio que haya hecho fallocate() con este handle.
+
+        Args:
+            path: Ruta del archivo
+            fh: File handle a liberar
+
+        Returns:
+            0 (éxito)
+        """
+        self._handles.pop(fh, None)
+
+        filename = self._reservations.pop(fh, None)
+        if filename is not None and filename not in self._reservations.values():
+            try:
+                self.fs.commit_reservation(filename)
+            except FileNotFoundInFilesystemError:
+                # El archivo se borró o renombró mientras estaba abierto
+                pass
+
+        return 0
+
     # ========== OPERACIONES DE LECTURA ==========
 
     def getattr(self, path: str, fh=None) -> Dict:
@@ -117,73 +530,165 @@ class FiUnamFSMount(Operations):
                 'st_atime': self.mount_time,
             }
 
-        # Archivo individual
-        # Remover el '/' inicial para buscar en el filesystem
-        filename = path[1:]
+        # Archivo individual: consultar el cache de atributos
+        # (Remover el '/' inicial para buscar en el filesystem)
+        attrs = self._lookup_attrs(path[1:])
 
-        try:
-            # Buscar el archivo en el directorio
-            entry = self.fs._find_file(filename)
+        if attrs is None:
+            # Archivo no existe
+            raise FuseOSError(errno.ENOENT)
 
-            # Convertir timestamp de FiUnamFS a Unix timestamp
-            # Formato FiUnamFS: AAAAMMDDHHMMSS
-            created = entry.created_timestamp
-            modified = entry.modified_timestamp
+        return attrs
 
-            # Parsear timestamp (AAAAMMDDHHMMSS)
-            try:
-                created_time = time.mktime(time.strptime(created, '%Y%m%d%H%M%S'))
-                modified_time = time.mktime(time.strptime(modified, '%Y%m%d%H%M%S'))
-            except (ValueError, OverflowError):
-                # Si el timestamp es inválido, usar el tiempo de montaje
-                created_time = self.mount_time
-                modified_time = self.mount_time
+    def readdir(self, path: str, fh) -> List[tuple]:
+        """
+        Lista el contenido de un directorio (la raíz o un subdirectorio).
 
-            return {
-                'st_mode': stat.S_IFREG | 0o644,  # Archivo regular con permisos 644
-                'st_nlink': 1,                     # Un solo link
-                'st_size': entry.file_size,        # Tamaño del archivo
-                'st_ctime': created_time,          # Tiempo de creación
-                'st_mtime': modified_time,         # Tiempo de modificación
-                'st_atime': modified_time,         # Último acceso = última modificación
-            }
+        Solo se recorren las entradas activas del directorio pedido (el
+        índice de hijos de Filesystem, sin leer su tabla). Cada elemento
+        incluye sus atributos, tomados del mismo cache que usa getattr(),
+        así que un 'ls -l' cuesta un solo recorrido del directorio.
+
+        Args:
+            path: Ruta del directorio (e.g., "/" o "/docs")
+            fh: File handle (no usado)
 
+        Returns:
+            Lista de tuplas (nombre, atributos, offset), incluyendo '.' y '..'
+
+        Raises:
+            FuseOSError: Si el directorio no existe (ENOENT) o es un
+                archivo (ENOTDIR)
+        """
+        try:
+            directory = self.fs._directory_table(path[1:]).path
         except FileNotFoundInFilesystemError:
-            # Archivo no existe
             raise FuseOSError(errno.ENOENT)
 
-    def readdir(self, path: str, fh) -> List[str]:
+        # FUSE requiere '.' y '..' en la lista
+        dir_attrs = self.getattr(path)
+        entries = [('.', dir_attrs, 0), ('..', dir_attrs, 0)]
+
+        # Agregar las entradas activas del directorio con sus atributos
+        for child, _ in self.fs._children(directory):
+            entries.append((child.rpartition('/')[2], self._lookup_attrs(child), 0))
+
+        # El archivo virtual de métricas solo se lista en la raíz y si se
+        # pidió al montar
+        if self.show_stats and not directory:
+            entries.append((STATS_FILENAME, self._stats_operation('getattr', STATS_PATH), 0))
+
+        return entries
+
+    def _sync_attr_cache(self) -> None:
+        """
+        Reconstruye el cache de atributos a partir del índice de rutas.
+
+        Reutiliza los atributos de las entradas que no cambiaron y descarta
+        las rutas que ya no existen. Cuesta un recorrido de las entradas
+        activas: se usa en warm_up() y cuando el cache acumula rutas viejas
+        (ver _lookup_attrs).
         """
-        Lista el contenido de un directorio.
+        entries = self.fs.directory_entries
+        cache = {}
+        for name, index in self.fs.name_index.items():
+            cached = self._attr_cache.get(name)
+            entry = entries[index]
+            if cached is None or cached[0] is not entry:
+                cached = (entry, self._entry_attrs(entry))
+            cache[name] = cached
+        self._attr_cache = cache
+
+    def _evict_attrs(self, path: str, tree: bool = False) -> None:
+        """
+        Descarta del cache de atributos una ruta que ya no existe.
 
-        En FiUnamFS solo hay un directorio (raíz), por lo que siempre
-        retorna la lista completa de archivos activos.
+        Args:
+            path: Ruta sin '/' inicial
+            tree: También descartar las rutas debajo de ella (directorio
+                movido)
+        """
+        self._attr_cache.pop(path, None)
+        if tree:
+            prefix = path + '/'
+            for name in [name for name in self._attr_cache if name.startswith(prefix)]:
+                del self._attr_cache[name]
+
+    def _lookup_attrs(self, filename: str) -> Optional[Dict]:
+        """
+        Retorna los atributos de un archivo o directorio sin recorrer el
+        directorio.
 
         Args:
-            path: Ruta del directorio (debe ser "/")
-            fh: File handle (no usado)
+            filename: Ruta sin '/' inicial
 
         Returns:
-            Lista de nombres de archivos (incluyendo '.' y '..')
+            Diccionario de atributos, o None si el archivo no existe
+        """
+        index = self.fs.name_index.get(filename)
+        if index is None:
+            return None
 
-        Raises:
-            FuseOSError: Si el path no es "/" (ENOENT)
+        entry = self.fs.directory_entries[index]
+        cached = self._attr_cache.get(filename)
+        if cached is None or cached[0] is not entry:
+            cached = (entry, self._entry_attrs(entry))
+            self._attr_cache[filename] = cached
+
+            # Rutas eliminadas fuera de unlink()/rename()/rmdir(): la
+            # sincronización es O(entradas) y solo ocurre después de que
+            # se acumularon otras tantas, así que su costo se amortiza
+            if len(self._attr_cache) > 2 * self.fs.active_entries + ATTR_CACHE_SLACK:
+                self._sync_attr_cache()
+
+        return cached[1]
+
+    def _entry_attrs(self, entry) -> Dict:
         """
-        # Solo soportamos el directorio raíz
-        if path != '/':
-            raise FuseOSError(errno.ENOENT)
+        Construye los atributos FUSE de una entrada de directorio.
 
-        # Obtener lista de archivos del filesystem
-        result = self.fs.list_files()
+        Args:
+            entry: DirectoryEntry activa
 
-        # FUSE requiere '.' y '..' en la lista
-        files = ['.', '..']
+        Returns:
+            Diccionario con atributos del archivo (st_mode, st_size, etc.);
+            un subdirectorio se reporta como directorio y su tamaño es el
+            de su tabla de entradas
+        """
+        # Convertir timestamp de FiUnamFS (AAAAMMDDHHMMSS) a Unix timestamp
+        created = parsear_timestamp(entry.created_timestamp)
+        modified = parsear_timestamp(entry.modified_timestamp)
+
+        try:
+            created_time = created.timestamp() if created else self.mount_time
+            modified_time = modified.timestamp() if modified else self.mount_time
+        except (ValueError, OverflowError, OSError):
+            # Si el timestamp es inválido, usar el tiempo de montaje
+            created_time = self.mount_time
+            modified_time = self.mount_time
+
+        if entry.is_directory():
+            # Permisos 755 (555 si se montó en solo lectura)
+            return {
+                'st_mode': stat.S_IFDIR | (0o555 if self.fs.read_only else 0o755),
+                'st_nlink': 2,                     # . y la entrada en su padre
+                'st_size': entry.file_size,
+                'st_ctime': created_time,
+                'st_mtime': modified_time,
+                'st_atime': modified_time,
+            }
 
-        # Agregar todos los archivos activos
-        for file_info in result['files']:
-            files.append(file_info['filename'])
+        # Permisos 644 (444 si se montó en solo lectura)
+        permisos = 0o444 if self.fs.read_only else 0o644
 
-        return files
+        return {
+            'st_mode': stat.S_IFREG | permisos,  # Archivo regular
+            'st_nlink': 1,                     # Un solo link
+            'st_size': entry.content_size(),   # Tamaño del archivo (sin comprimir)
+            'st_ctime': created_time,          # Tiempo de creación
+            'st_mtime': modified_time,         # Tiempo de modificación
+            'st_atime': modified_time,         # Último acceso = última modificación
+        }
 
     def read(self, path: str, size: int, offset: int, fh) -> bytes:
         """
@@ -193,7 +698,7 @@ class FiUnamFSMount(Operations):
             path: Ruta del archivo (e.g., "/archivo.txt")
             size: Número de bytes a leer
             offset: Posición desde donde leer
-            fh: File handle (no usado)
+            fh: File handle (su detector decide el read-ahead)
 
         Returns:
             Bytes leídos del archivo
@@ -208,15 +713,48 @@ class FiUnamFSMount(Operations):
             # Buscar el archivo
             entry = self.fs._find_file(filename)
 
-            # Leer todos los datos del archivo
-            data = self.fs._read_file_data(entry)
-
-            # Retornar el slice solicitado
-            return data[offset:offset + size]
+            # Leer solo el rango solicitado (pasa por el cache de clusters)
+            data = self.fs._read_file_data(entry, offset, size)
 
         except FileNotFoundInFilesystemError:
             raise FuseOSError(errno.ENOENT)
 
+        self._schedule_readahead(fh, entry, offset, len(data))
+
+        return data
+
+    def _schedule_readahead(self, fh, entry, offset: int, size: int) -> None:
+        """
+        Registra una lectura y, si el acceso es secuencial, pide al hilo de
+        read-ahead que precargue la siguiente ventana del archivo.
+
+        Args:
+            fh: File handle de la lectura
+            entry: DirectoryEntry del archivo leído
+            offset: Offset de la lectura
+            size: Bytes efectivamente leídos
+        """
+        detector = self._handles.get(fh)
+        if detector is None or self.readahead is None or entry.is_compressed():
+            # Un archivo comprimido se descomprime completo en la primera
+            # lectura: no hay clusters que precargar
+            return
+
+        detector.record_read(offset, size)
+
+        cluster_size = self.fs.superblock.cluster_size
+        window = detector.next_window(entry.file_size, cluster_size)
+        if window is None:
+            return
+
+        # En un archivo fragmentado la ventana puede abarcar varios extents
+        for cluster, skip, nbytes in self.fs._map_range(entry, window[0], window[1] - window[0]):
+            self.readahead.request(
+                cluster,
+                (skip + nbytes - 1) // cluster_size + 1,
+                self.fs.generation
+            )
+
     # ========== OPERACIONES DE ESCRITURA ==========
 
     def create(self, path: str, mode: int, fi=None) -> int:
@@ -232,7 +770,7 @@ class FiUnamFSMount(Operations):
             fi: File info (no usado)
 
         Returns:
-            0 (éxito)
+            File handle del archivo creado
 
         Raises:
             FuseOSError: Si hay error en la creación
@@ -241,23 +779,9 @@ class FiUnamFSMount(Operations):
         filename = path[1:]
 
         try:
-            # Crear archivo vacío en el filesystem
-            # Usamos import_file con un archivo temporal vacío
-            import tempfile
-            import os as os_module
-
-            # Crear archivo temporal vacío
-            with tempfile.NamedTemporaryFile(mode='w', delete=False) as tmp:
-                tmp_path = tmp.name
-
-            try:
-                # Importar el archivo vacío con el nombre deseado
-                self.fs.import_file(tmp_path, filename)
-            finally:
-                # Limpiar archivo temporal
-                os_module.unlink(tmp_path)
-
-            return 0
+            # Crear la entrada vacía directamente en el directorio
+            self.fs.create_file(filename)
+            return self._new_handle()
 
         except FilenameConflictError:
             raise FuseOSError(errno.EEXIST)
@@ -265,6 +789,12 @@ class FiUnamFSMount(Operations):
             raise FuseOSError(errno.ENOSPC)
         except DirectoryFullError:
             raise FuseOSError(errno.ENOSPC)
+        except FileNotFoundInFilesystemError:
+            # El directorio padre no existe
+            raise FuseOSError(errno.ENOENT)
+        except EntryTypeError:
+            # Un componente de la ruta es un archivo
+            raise FuseOSError(errno.ENOTDIR)
         except ValueError as e:
             # Nombre inválido
             raise FuseOSError(errno.EINVAL)
@@ -277,8 +807,11 @@ class FiUnamFSMount(Operations):
         """
         Escribe datos a un archivo.
 
-        IMPORTANTE: Debido a la naturaleza de asignación contigua de FiUnamFS,
-        solo soportamos escritura completa del archivo (no modificación parcial).
+        Las escrituras que caben en los clusters que ya ocupa el archivo se
+        hacen en sitio. Las que pasan del final (incluido el append en
+        offset == file_size, el caso típico de logs) extienden el extent
+        hacia los clusters libres contiguos y solo reubican el archivo
+        cuando éstos están ocupados.
 
         Args:
             path: Ruta del archivo
@@ -290,61 +823,88 @@ class FiUnamFSMount(Operations):
             Número de bytes escritos
 
         Raises:
-            FuseOSError: Si la operación no es soportada o hay error
+            FuseOSError: Si el archivo no existe o no hay espacio
         """
         # Remover el '/' inicial
         filename = path[1:]
 
-        # FiUnamFS solo soporta asignación contigua, por lo que no podemos
-        # modificar archivos in-place. Solo soportamos escribir archivos completos.
+        try:
+            return self.fs.write_file_data(filename, data, offset)
+
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+        except NoSpaceError:
+            raise FuseOSError(errno.ENOSPC)
+        except ValueError:
+            # Offset o tamaño inválido
+            raise FuseOSError(errno.EINVAL)
+
+    def fallocate(self, path: str, mode: int, offset: int, length: int, fh=None) -> int:
+        """
+        Preasigna espacio contiguo para un archivo (posix_fallocate/fallocate).
+
+        Con mode 0 el archivo crece (relleno con ceros) hasta offset + length,
+        igual que truncate(). Con FALLOC_FL_KEEP_SIZE el tamaño visible no
+        cambia: los clusters se reservan en la entrada de directorio para
+        que las escrituras siguientes se hagan en sitio, y lo que no se
+        llegue a escribir se libera al cerrar el file handle.
+
+        Args:
+            path: Ruta del archivo
+            mode: Modo de fallocate(2) (0 o FALLOC_FL_KEEP_SIZE)
+            offset: Inicio del rango a preasignar
+            length: Longitud del rango
+            fh: File handle del archivo
 
-        # Para simplificar, vamos a rechazar escrituras con offset != 0
-        # El flujo correcto es: truncate() seguido de write() con offset=0
+        Returns:
+            0 (éxito)
 
-        if offset != 0:
-            # No soportamos escritura parcial
+        Raises:
+            FuseOSError: Si el modo no está soportado (EOPNOTSUPP), el
+                archivo no existe (ENOENT) o no hay espacio (ENOSPC)
+        """
+        filename = path[1:]
+
+        if mode & ~FALLOC_FL_KEEP_SIZE:
+            # Punch hole, collapse, zero range...: no aplican a un extent único
             raise FuseOSError(errno.EOPNOTSUPP)
 
-        try:
-            # Primero eliminar el archivo existente si existe
-            try:
-                self.fs.delete_file(filename)
-            except FileNotFoundInFilesystemError:
-                pass  # El archivo no existía, está bien
+        if offset < 0 or length <= 0:
+            raise FuseOSError(errno.EINVAL)
 
-            # Escribir el nuevo contenido
-            import tempfile
-            import os as os_module
+        try:
+            entry = self.fs._find_file(filename)
+            end = offset + length
 
-            # Crear archivo temporal con el contenido
-            with tempfile.NamedTemporaryFile(mode='wb', delete=False) as tmp:
-                tmp.write(data)
-                tmp_path = tmp.name
+            if mode & FALLOC_FL_KEEP_SIZE:
+                self.fs.reserve(filename, max(end, entry.content_size()))
+                if fh is not None:
+                    self._reservations[fh] = filename
+            elif end > entry.content_size():
+                self.fs.truncate_file(filename, end)
 
-            try:
-                # Importar el archivo con el nuevo contenido
-                self.fs.import_file(tmp_path, filename)
-                return len(data)
-            finally:
-                # Limpiar archivo temporal
-                os_module.unlink(tmp_path)
+            return 0
 
-        except FilenameConflictError:
-            raise FuseOSError(errno.EEXIST)
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
         except NoSpaceError:
             raise FuseOSError(errno.ENOSPC)
-        except DirectoryFullError:
-            raise FuseOSError(errno.ENOSPC)
+        except ValueError:
+            # Rango mayor a la capacidad del filesystem
+            raise FuseOSError(errno.EFBIG)
 
     def truncate(self, path: str, length: int, fh=None):
         """
-        Trunca un archivo a una longitud específica.
+        Trunca o extiende un archivo a una longitud específica.
 
-        Esta operación es llamada antes de sobrescribir un archivo.
+        Esta operación es llamada antes de sobrescribir un archivo (O_TRUNC)
+        y por herramientas como 'truncate' o la rotación de logs. Solo se
+        actualiza la entrada de directorio mientras el archivo quepa en su
+        extent o en los clusters libres que le siguen.
 
         Args:
             path: Ruta del archivo
-            length: Nueva longitud (típicamente 0 para sobrescritura)
+            length: Nueva longitud en bytes
             fh: File handle (no usado)
 
         Raises:
@@ -353,17 +913,90 @@ class FiUnamFSMount(Operations):
         # Remover el '/' inicial
         filename = path[1:]
 
-        # Para truncar a 0 (caso común antes de write), simplemente
-        # eliminamos el archivo. write() lo recreará.
-        if length == 0:
-            try:
-                self.fs.delete_file(filename)
-            except FileNotFoundInFilesystemError:
-                # Si el archivo no existe, está bien (será creado en write)
-                pass
-        else:
-            # No soportamos truncate a longitud != 0 debido a asignación contigua
-            raise FuseOSError(errno.EOPNOTSUPP)
+        try:
+            self.fs.truncate_file(filename, length)
+
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+        except NoSpaceError:
+            raise FuseOSError(errno.ENOSPC)
+        except ValueError:
+            # Longitud negativa o mayor a la capacidad del filesystem
+            raise FuseOSError(errno.EINVAL)
+
+    def rename(self, old: str, new: str):
+        """
+        Renombra o mueve un archivo o directorio (comando 'mv' o escritura
+        a temporal + rename).
+
+        Solo se reescriben entradas de directorio; los datos no se mueven.
+        Si el destino existe se reemplaza atómicamente, como exige POSIX
+        (un directorio solo reemplaza a otro directorio vacío).
+
+        Args:
+            old: Ruta actual
+            new: Nueva ruta
+
+        Raises:
+            FuseOSError: Si el origen no existe, el nuevo nombre es
+                inválido o el directorio destino no tiene espacio
+        """
+        try:
+            self.fs.rename(old[1:], new[1:], overwrite=True)
+            index = self.fs.name_index.get(new[1:])
+            moved_directory = index is not None and self.fs.directory_entries[index].is_directory()
+            self._evict_attrs(old[1:], tree=moved_directory)
+
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+        except (NoSpaceError, DirectoryFullError):
+            raise FuseOSError(errno.ENOSPC)
+        except ValueError:
+            # Nombre inválido (más de 14 caracteres, no-ASCII, etc.) o un
+            # directorio movido dentro de sí mismo
+            raise FuseOSError(errno.EINVAL)
+
+    def utimens(self, path: str, times=None):
+        """
+        Actualiza los tiempos de acceso/modificación (comando 'touch').
+
+        FiUnamFS solo guarda el tiempo de modificación, por lo que el
+        tiempo de acceso se ignora. Un mtime UTIME_NOW usa la hora actual y
+        UTIME_OMIT deja el archivo sin cambios.
+
+        Args:
+            path: Ruta del archivo
+            times: Tupla (atime, mtime), o None para usar el tiempo actual
+
+        Raises:
+            FuseOSError: Si el archivo no existe (ENOENT) o el tiempo no se
+                puede representar (EINVAL)
+        """
+        if path == '/':
+            return
+
+        filename = path[1:]
+        modified = times[1] if times is not None else None
+
+        try:
+            if modified in (UTIME_OMIT, UTIME_OMIT / 1e9):
+                # Solo validar que el archivo exista
+                self.fs._find_file(filename)
+                return
+
+            if modified in (UTIME_NOW, UTIME_NOW / 1e9):
+                modified = None
+            elif isinstance(modified, int):
+                # Montado con use_ns: fusepy entrega nanosegundos
+                modified = modified / 1e9
+
+            self.fs.update_timestamps(filename, modified)
+
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+        except ValueError:
+            # Tiempo fuera del rango de datetime o de AAAAMMDDHHMMSS
+            raise FuseOSError(errno.EINVAL)
 
     # ========== OPERACIONES DE ELIMINACIÓN ==========
 
@@ -385,15 +1018,66 @@ class FiUnamFSMount(Operations):
         try:
             # Eliminar el archivo
             self.fs.delete_file(filename)
+            self._evict_attrs(filename)
 
         except FileNotFoundInFilesystemError:
             # El archivo no existe
             raise FuseOSError(errno.ENOENT)
+        except EntryTypeError:
+            # Los directorios se eliminan con rmdir
+            raise FuseOSError(errno.EISDIR)
         except Exception as e:
             # Log de excepción no capturada para debugging
             print(f"Error en unlink({path}): {type(e).__name__}: {e}", file=sys.stderr)
             raise FuseOSError(errno.EIO)
 
+    # ========== OPERACIONES DE DIRECTORIOS ==========
+
+    def mkdir(self, path: str, mode: int):
+        """
+        Crea un subdirectorio (comando 'mkdir').
+
+        Args:
+            path: Ruta del subdirectorio (e.g., "/docs")
+            mode: Permisos (ignorado, FiUnamFS no soporta permisos)
+
+        Raises:
+            FuseOSError: Si ya existe (EEXIST), el padre no existe (ENOENT),
+                no hay espacio (ENOSPC) o el nombre es inválido (EINVAL)
+        """
+        try:
+            self.fs.mkdir(path[1:])
+
+        except FilenameConflictError:
+            raise FuseOSError(errno.EEXIST)
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+        except (NoSpaceError, DirectoryFullError):
+            raise FuseOSError(errno.ENOSPC)
+        except ValueError:
+            raise FuseOSError(errno.EINVAL)
+
+    def rmdir(self, path: str):
+        """
+        Elimina un subdirectorio vacío (comando 'rmdir').
+
+        Args:
+            path: Ruta del subdirectorio
+
+        Raises:
+            FuseOSError: Si no existe (ENOENT), no está vacío (ENOTEMPTY)
+                o es un archivo (ENOTDIR)
+        """
+        if path == '/':
+            raise FuseOSError(errno.EBUSY)
+
+        try:
+            self.fs.rmdir(path[1:])
+            self._evict_attrs(path[1:])
+
+        except FileNotFoundInFilesystemError:
+            raise FuseOSError(errno.ENOENT)
+
     # ========== OPERACIONES AUXILIARES ==========
 
     def statfs(self, path: str) -> Dict:
@@ -408,26 +1092,20 @@ class FiUnamFSMount(Operations):
         Returns:
             Diccionario con estadísticas del filesystem
         """
-        result = self.fs.list_files()
-
-        total_clusters = self.fs.superblock.total_clusters
+        # Contadores mantenidos por Filesystem: no recorre el directorio
         cluster_size = self.fs.superblock.cluster_size
-
-        # Clusters usados por datos (result tiene bytes, convertir a clusters)
-        used_bytes = result['used_space']
-        used_clusters = (used_bytes + cluster_size - 1) // cluster_size
-
-        # Clusters libres
-        free_clusters = total_clusters - used_clusters - 5  # 5 = superblock + directorio
+        free_clusters = self.fs.cluster_map.free_count
+        total_entries = len(self.fs.directory_entries)
+        free_entries = total_entries - self.fs.active_entries
 
         return {
-            'f_bsize': cluster_size,           # Tamaño de bloque
-            'f_frsize': cluster_size,          # Tamaño de fragmento
-            'f_blocks': total_clusters,        # Total de bloques
-            'f_bfree': free_clusters,          # Bloques libres
-            'f_bavail': free_clusters,         # Bloques disponibles para no-root
-            'f_files': 64,                     # Total de inodos (entradas de directorio)
-            'f_ffree': 64 - result['total_files'],  # Inodos libres
-            'f_favail': 64 - result['total_files'], # Inodos disponibles
-            'f_namemax': 14,                   # Longitud máxima de nombre
+            'f_bsize': cluster_size,                       # Tamaño de bloque
+            'f_frsize': cluster_size,                      # Tamaño de fragmento
+            'f_blocks': self.fs.superblock.total_clusters, # Total de bloques
+            'f_bfree': free_clusters,                      # Bloques libres
+            'f_bavail': free_clusters,                     # Bloques disponibles para no-root
+            'f_files': total_entries,                      # Total de inodos (entradas de directorio)
+            'f_ffree': free_entries,                       # Inodos libres
+            'f_favail': free_entries,                      # Inodos disponibles
+            'f_namemax': 14,                               # Longitud máxima de nombre
         }
@@ -4,5 +4,9 @@ Modelos de datos para FiUnamFS
 Este módulo contiene las estructuras de datos binarias del sistema de archivos:
 - Superblock: Metadatos del filesystem
 - DirectoryEntry: Entradas de directorio (64 bytes cada una)
+- ExtentBlock: Lista de extents de un archivo fragmentado
+- compression: Compresión por archivo (zlib/lzma)
+- DedupIndex: Hashes de contenido para deduplicar importaciones
 - Filesystem: Operaciones de alto nivel sobre el filesystem
+- fsck: Verificación de consistencia del directorio y los clusters
 """
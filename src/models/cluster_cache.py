@@ -0,0 +1,165 @@
+"""
+Cache LRU de clusters para FiUnamFS
+
+Mantiene en memoria los clusters leídos más recientemente, indexados por
+número de cluster, con un presupuesto máximo en bytes. Lo usa Filesystem
+para todas las lecturas de datos, por lo que lo aprovechan tanto el
+montaje FUSE como export_file().
+
+Es seguro usarlo desde varios hilos (el hilo de read-ahead del montaje
+FUSE lo llena en segundo plano).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+# Presupuesto por defecto: 4 MB (más que una imagen completa de 1.44 MB)
+DEFAULT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+class ClusterCache:
+    """
+    Cache LRU de clusters con presupuesto en bytes.
+
+    Atributos:
+        max_bytes: Presupuesto máximo en bytes (0 = cache deshabilitado)
+        current_bytes: Bytes actualmente en cache
+        hits: Lecturas servidas desde el cache
+        misses: Lecturas que tuvieron que ir a la imagen
+        evictions: Clusters expulsados por falta de presupuesto
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Inicializa el cache vacío.
+
+        Args:
+            max_bytes: Presupuesto máximo en bytes (default: 4 MB)
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clusters: 'OrderedDict[int, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cluster: int) -> Optional[bytes]:
+        """
+        Obtiene un cluster del cache y lo marca como usado recientemente.
+
+        Args:
+            cluster: Número de cluster
+
+        Returns:
+            Contenido del cluster, o None si no está en cache
+        """
+        with self._lock:
+            data = self._clusters.get(cluster)
+
+            if data is None:
+                self.misses += 1
+                return None
+
+            self._clusters.move_to_end(cluster)
+            self.hits += 1
+            return data
+
+    def contains(self, cluster: int) -> bool:
+        """
+        Verifica si un cluster está en cache sin afectar contadores ni orden LRU.
+
+        Args:
+            cluster: Número de cluster
+
+        Returns:
+            True si el cluster está en cache
+        """
+        return cluster in self._clusters
+
+    def put(self, cluster: int, data: bytes) -> None:
+        """
+        Guarda un cluster en el cache, expulsando los menos usados si
+        se excede el presupuesto.
+
+        Args:
+            cluster: Número de cluster
+            data: Contenido del cluster
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._clusters.pop(cluster, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+
+            self._clusters[cluster] = data
+            self.current_bytes += len(data)
+
+            # Expulsar los clusters menos usados (inicio del OrderedDict)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._clusters.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, start_cluster: int, num_clusters: int) -> None:
+        """
+        Elimina del cache un rango de clusters (tras escribir, borrar o
+        reubicar un archivo).
+
+        Args:
+            start_cluster: Cluster inicial del rango
+            num_clusters: Cantidad de clusters del rango
+        """
+        with self._lock:
+            if not self._clusters:
+                return
+
+            # Recorrer el lado más pequeño: el rango o el contenido del cache
+            if num_clusters <= len(self._clusters):
+                candidates = range(start_cluster, start_cluster + num_clusters)
+            else:
+                end = start_cluster + num_clusters
+                candidates = [c for c in self._clusters if start_cluster <= c < end]
+
+            for cluster in candidates:
+                data = self._clusters.pop(cluster, None)
+                if data is not None:
+                    self.current_bytes -= len(data)
+
+    def clear(self) -> None:
+        """Vacía el cache (los contadores se conservan)."""
+        with self._lock:
+            self._clusters.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Retorna estadísticas del cache.
+
+        Returns:
+            Diccionario con hits, misses, evictions, bytes, clusters,
+            max_bytes y hit_ratio
+        """
+        total = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'bytes': self.current_bytes,
+            'clusters': len(self._clusters),
+            'max_bytes': self.max_bytes,
+            'hit_ratio': self.hits / total if total else 0.0
+        }
+
+    def __str__(self) -> str:
+        """Representación en string para debugging."""
+        return (
+            f"ClusterCache(clusters={len(self._clusters)}, "
+            f"bytes={self.current_bytes}/{self.max_bytes}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
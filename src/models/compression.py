@@ -0,0 +1,119 @@
+"""
+Compresión por archivo de FiUnamFS
+
+Un archivo importado con compresión lleva FLAG_COMPRESSED; el byte 53 de
+su entrada indica el método (COMPRESSION_ZLIB o COMPRESSION_LZMA) y aux su
+tamaño sin comprimir. file_size y los clusters son los de los datos
+comprimidos, así que el mapa de clusters, fsck y scrub los tratan igual
+que a cualquier otro archivo (y el CRC32 es el de los bytes guardados).
+
+Los datos son un flujo zlib (con Adler-32) o xz (con CRC64): el propio
+formato detecta contenido dañado al descomprimir.
+
+Antes de comprimir se prueba una muestra del inicio del archivo; si no se
+reduce al menos MIN_SAVINGS, el archivo se guarda sin comprimir.
+"""
+
+import lzma
+import zlib
+from typing import Optional
+
+
+# Métodos (byte 53 de la entrada de directorio)
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+
+# Nombres aceptados por import --compress
+METHODS = {
+    'zlib': COMPRESSION_ZLIB,
+    'lzma': COMPRESSION_LZMA
+}
+
+# Bytes del inicio del archivo con que se estima si vale la pena comprimir
+SAMPLE_SIZE = 64 * 1024
+
+# Fracción mínima que debe reducirse la muestra
+MIN_SAVINGS = 0.10
+
+# Errores que lanzan los descompresores con datos dañados
+DECOMPRESSION_ERRORS = (zlib.error, lzma.LZMAError, EOFError)
+
+
+def method_name(method: int) -> Optional[str]:
+    """
+    Nombre de un método de compresión.
+
+    Args:
+        method: Método (COMPRESSION_*)
+
+    Returns:
+        'zlib' o 'lzma', o None si el archivo no está comprimido
+    """
+    for name, value in METHODS.items():
+        if value == method:
+            return name
+    return None
+
+
+def compressor(method: int):
+    """
+    Crea un compresor incremental.
+
+    Args:
+        method: COMPRESSION_ZLIB o COMPRESSION_LZMA
+
+    Returns:
+        Objeto con compress(datos) y flush()
+
+    Raises:
+        ValueError: Si el método no es válido
+    """
+    if method == COMPRESSION_ZLIB:
+        return zlib.compressobj()
+    if method == COMPRESSION_LZMA:
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ)
+    raise ValueError(f"Método de compresión inválido: {method}")
+
+
+def decompressor(method: int):
+    """
+    Crea un descompresor incremental.
+
+    Args:
+        method: COMPRESSION_ZLIB o COMPRESSION_LZMA
+
+    Returns:
+        Objeto con decompress(datos) y el atributo eof
+
+    Raises:
+        ValueError: Si el método no es válido
+    """
+    if method == COMPRESSION_ZLIB:
+        return zlib.decompressobj()
+    if method == COMPRESSION_LZMA:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    raise ValueError(f"Método de compresión inválido: {method}")
+
+
+def worth_compressing(method: int, sample: bytes) -> bool:
+    """
+    Estima con una muestra si comprimir un archivo reduce su tamaño.
+
+    Los datos ya comprimidos (imágenes, archivos zip, binarios cifrados)
+    no se reducen: comprimirlos solo costaría tiempo al leerlos.
+
+    Args:
+        method: COMPRESSION_ZLIB o COMPRESSION_LZMA
+        sample: Primeros bytes del archivo (hasta SAMPLE_SIZE)
+
+    Returns:
+        True si la muestra se reduce al menos MIN_SAVINGS
+    """
+    if not sample:
+        return False
+
+    engine = compressor(method)
+    compressed = len(engine.compress(sample)) + len(engine.flush())
+
+    return compressed <= len(sample) * (1 - MIN_SAVINGS)
@@ -0,0 +1,136 @@
+"""
+Índice de contenido para deduplicar importaciones en FiUnamFS
+
+Guarda el hash BLAKE2b del contenido de los archivos de una imagen en un
+archivo auxiliar junto a ella ('<imagen>.dedup', JSON). Cada hash se
+asocia a la identidad de la entrada (cluster inicial, tamaño, CRC32 y
+fecha de modificación), así que una entrada que cambió o se eliminó
+simplemente deja de coincidir.
+
+El índice es solo un cache: si falta, está dañado o no tiene una entrada,
+el hash se calcula leyendo el archivo de la imagen y se agrega. Nunca se
+usa sin confirmar antes que tamaño y CRC32 coinciden.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+
+# Extensión del archivo auxiliar (se agrega a la ruta de la imagen)
+DEDUP_SUFFIX = '.dedup'
+
+# Bytes del hash BLAKE2b
+DIGEST_SIZE = 32
+
+
+def new_hasher():
+    """
+    Crea el hash usado para identificar contenidos.
+
+    Returns:
+        Objeto hashlib.blake2b de DIGEST_SIZE bytes
+    """
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def entry_key(entry) -> str:
+    """
+    Identidad de una entrada en el índice.
+
+    Args:
+        entry: DirectoryEntry con FLAG_CHECKSUM
+
+    Returns:
+        Clave 'cluster:tamaño:crc32:modificado'
+    """
+    return (f"{entry.start_cluster}:{entry.file_size}:{entry.checksum:08x}:"
+            f"{entry.modified_timestamp}")
+
+
+class DedupIndex:
+    """
+    Hashes de contenido de los archivos de una imagen.
+
+    Atributos:
+        path: Ruta del archivo auxiliar
+        digests: Diccionario {entry_key: hash hexadecimal}
+        dirty: True si hay cambios sin guardar
+    """
+
+    def __init__(self, image_path: str):
+        """
+        Carga el índice de una imagen (vacío si no existe o está dañado).
+
+        Args:
+            image_path: Ruta de la imagen FiUnamFS
+        """
+        self.path = image_path + DEDUP_SUFFIX
+        self.digests: Dict[str, str] = {}
+        self.dirty = False
+
+        try:
+            with open(self.path, 'r', encoding='ascii') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict):
+            self.digests = {
+                key: value for key, value in data.items()
+                if isinstance(key, str) and isinstance(value, str)
+            }
+
+    def get(self, entry) -> Optional[str]:
+        """
+        Hash guardado de una entrada.
+
+        Args:
+            entry: DirectoryEntry
+
+        Returns:
+            Hash hexadecimal, o None si no está en el índice
+        """
+        return self.digests.get(entry_key(entry))
+
+    def put(self, entry, digest: str) -> None:
+        """
+        Registra el hash de una entrada.
+
+        Args:
+            entry: DirectoryEntry
+            digest: Hash hexadecimal de su contenido
+        """
+        key = entry_key(entry)
+        if self.digests.get(key) != digest:
+            self.digests[key] = digest
+            self.dirty = True
+
+    def save(self, live_entries: Iterable) -> None:
+        """
+        Guarda el índice, descartando las entradas que ya no existen.
+
+        La escritura es atómica (archivo temporal + rename). Si no se puede
+        escribir (directorio de solo lectura) se ignora: el índice se
+        reconstruye la próxima vez.
+
+        Args:
+            live_entries: Entradas activas de la imagen
+        """
+        live = {entry_key(entry) for entry in live_entries}
+        stale = [key for key in self.digests if key not in live]
+        for key in stale:
+            del self.digests[key]
+
+        if not (self.dirty or stale):
+            return
+
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                json.dump(self.digests, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            pass
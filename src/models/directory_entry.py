@@ -2,11 +2,33 @@
 Modelo de DirectoryEntry para FiUnamFS
 
 Cada entrada de directorio ocupa 64 bytes y describe un archivo en el filesystem.
-El directorio ocupa los clusters 1-4 (bytes 1024-5119), permitiendo hasta 64 archivos.
+El directorio ocupa los clusters 1-4 (bytes 1024-5119), permitiendo hasta 64 archivos
+(versiones 26-1/26-2). En la versión 26-3 el tamaño del directorio lo define el
+superblock.
+
+Un subdirectorio es una entrada con FLAG_DIRECTORY cuya tabla de entradas (mismo
+formato de 64 bytes) ocupa un extent en el área de datos: start_cluster es el
+inicio de la tabla y file_size su tamaño en bytes.
+
+Un archivo fragmentado (FLAG_EXTENTS) ocupa varios extents; su start_cluster
+apunta al cluster con la lista de extents (ver extent_block.py).
+
+Con FLAG_CHECKSUM la entrada guarda el CRC32 del contenido del archivo. Se
+calcula al importar (o se hereda al copiar) y se descarta cuando el
+contenido cambia por otra vía.
+
+Varias entradas con FLAG_SHARED y el mismo start_cluster comparten sus
+clusters (archivos idénticos deduplicados al importar). El número de
+referencias no se guarda: es el número de entradas que comparten el
+cluster inicial.
+
+Con FLAG_COMPRESSED los datos están comprimidos (ver compression.py): el
+byte 53 indica el método, aux el tamaño sin comprimir y file_size el de
+los datos guardados.
 """
 
 import struct
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 from utils.binary_utils import timestamp_actual
 from utils.validation import calcular_clusters_necesarios
@@ -22,9 +44,26 @@ DIRECTORY_ENTRY_FORMAT = (
     'I'    # file_size (bytes 20-23): tamaño en bytes
     '14s'  # created_timestamp (bytes 24-37): AAAAMMDDHHMMSS
     '14s'  # modified_timestamp (bytes 38-51): AAAAMMDDHHMMSS
-    '12x'  # reserved (bytes 52-63): reservado para uso futuro
+    'B'    # flags (byte 52): banderas de la entrada (FLAG_*)
+    'B'    # compression (byte 53): método de compresión (con FLAG_COMPRESSED)
+    '2x'   # reserved (bytes 54-55): reservado para uso futuro
+    'I'    # checksum (bytes 56-59): CRC32 del contenido (con FLAG_CHECKSUM)
+    'I'    # aux (bytes 60-63): dato auxiliar, su significado depende de flags
 )
 
+# Struct precompilado (el directorio de una imagen 26-3 puede tener miles
+# de entradas)
+DIRECTORY_ENTRY_STRUCT = struct.Struct(DIRECTORY_ENTRY_FORMAT)
+
+# Banderas de la entrada (byte 52). Una entrada con flags == 0 es un
+# archivo normal, idéntico al formato original
+FLAG_RESERVED = 0x01  # Espacio reservado: aux = clusters asignados al archivo
+FLAG_DIRECTORY = 0x02  # Subdirectorio: el extent contiene su tabla de entradas
+FLAG_EXTENTS = 0x04  # Archivo fragmentado: start_cluster apunta a su ExtentBlock
+FLAG_CHECKSUM = 0x08  # checksum contiene el CRC32 del contenido
+FLAG_SHARED = 0x10  # Clusters compartidos con otras entradas idénticas (dedup)
+FLAG_COMPRESSED = 0x20  # Datos comprimidos: aux = tamaño sin comprimir
+
 
 class DirectoryEntry(NamedTuple):
     """
@@ -34,9 +73,14 @@ class DirectoryEntry(NamedTuple):
         file_type: Tipo de entrada (b'.' = archivo activo, b'-' = vacío)
         filename: Nombre del archivo (hasta 14 caracteres ASCII)
         start_cluster: Cluster inicial donde comienza el archivo (5-1439)
-        file_size: Tamaño del archivo en bytes
+        file_size: Tamaño del archivo en bytes (comprimido, con FLAG_COMPRESSED)
         created_timestamp: Timestamp de creación (formato AAAAMMDDHHMMSS)
         modified_timestamp: Timestamp de última modificación (AAAAMMDDHHMMSS)
+        flags: Banderas de la entrada (FLAG_*, 0 = archivo normal)
+        checksum: CRC32 del contenido (válido solo con FLAG_CHECKSUM)
+        aux: Dato auxiliar según flags (con FLAG_RESERVED: clusters
+            reservados; con FLAG_COMPRESSED: tamaño sin comprimir)
+        compression: Método de compresión (válido solo con FLAG_COMPRESSED)
     """
     file_type: bytes
     filename: str
@@ -44,6 +88,10 @@ class DirectoryEntry(NamedTuple):
     file_size: int
     created_timestamp: str
     modified_timestamp: str
+    flags: int = 0
+    checksum: int = 0
+    aux: int = 0
+    compression: int = 0
 
     @classmethod
     def from_bytes(cls, data: bytes) -> 'DirectoryEntry':
@@ -59,15 +107,46 @@ class DirectoryEntry(NamedTuple):
         Raises:
             struct.error: Si los datos no tienen 64 bytes
         """
-        fields = struct.unpack(DIRECTORY_ENTRY_FORMAT, data)
+        return cls._from_fields(DIRECTORY_ENTRY_STRUCT.unpack(data))
+
+    @classmethod
+    def parse_many(cls, data: bytes) -> List['DirectoryEntry']:
+        """
+        Parsea varias entradas consecutivas de una región de directorio.
 
+        Args:
+            data: Datos binarios (múltiplo de 64 bytes)
+
+        Returns:
+            Lista de DirectoryEntry, en orden
+
+        Raises:
+            struct.error: Si la longitud no es múltiplo de 64 bytes
+        """
+        return [cls._from_fields(fields) for fields in DIRECTORY_ENTRY_STRUCT.iter_unpack(data)]
+
+    @classmethod
+    def _from_fields(cls, fields: tuple) -> 'DirectoryEntry':
+        """
+        Construye una entrada a partir de los campos desempaquetados.
+
+        Args:
+            fields: Tupla devuelta por DIRECTORY_ENTRY_STRUCT.unpack()
+
+        Returns:
+            Instancia de DirectoryEntry
+        """
         return cls(
             file_type=fields[0],
             filename=fields[1].rstrip(b'\x00').decode('ascii', errors='ignore'),
             start_cluster=fields[2],
             file_size=fields[3],
             created_timestamp=fields[4].decode('ascii', errors='ignore'),
-            modified_timestamp=fields[5].decode('ascii', errors='ignore')
+            modified_timestamp=fields[5].decode('ascii', errors='ignore'),
+            flags=fields[6],
+            compression=fields[7],
+            checksum=fields[8],
+            aux=fields[9]
         )
 
     def to_bytes(self) -> bytes:
@@ -84,14 +163,17 @@ class DirectoryEntry(NamedTuple):
         filename_bytes = self.filename.encode('ascii')[:14]  # Máximo 14 chars
         filename_bytes = filename_bytes.ljust(15, b'\x00')
 
-        return struct.pack(
-            DIRECTORY_ENTRY_FORMAT,
+        return DIRECTORY_ENTRY_STRUCT.pack(
             self.file_type,
             filename_bytes,
             self.start_cluster,
             self.file_size,
             self.created_timestamp.encode('ascii'),
-            self.modified_timestamp.encode('ascii')
+            self.modified_timestamp.encode('ascii'),
+            self.flags,
+            self.compression,
+            self.checksum,
+            self.aux
         )
 
     def is_active(self) -> bool:
@@ -112,14 +194,90 @@ class DirectoryEntry(NamedTuple):
         """
         return self.file_type == b'-' or self.filename == '.' * 14 or self.filename == ''
 
-    def num_clusters_needed(self) -> int:
+    def is_directory(self) -> bool:
+        """
+        Verifica si esta entrada es un subdirectorio.
+
+        Returns:
+            True si la entrada está activa y tiene FLAG_DIRECTORY
+        """
+        return self.is_active() and bool(self.flags & FLAG_DIRECTORY)
+
+    def is_fragmented(self) -> bool:
+        """
+        Verifica si el archivo está repartido en varios extents.
+
+        Returns:
+            True si la entrada tiene FLAG_EXTENTS
+        """
+        return bool(self.flags & FLAG_EXTENTS)
+
+    def has_checksum(self) -> bool:
+        """
+        Verifica si la entrada guarda el CRC32 de su contenido.
+
+        Returns:
+            True si la entrada tiene FLAG_CHECKSUM
+        """
+        return bool(self.flags & FLAG_CHECKSUM)
+
+    def is_shared(self) -> bool:
+        """
+        Verifica si el archivo comparte sus clusters con otras entradas.
+
+        Returns:
+            True si la entrada tiene FLAG_SHARED
+        """
+        return bool(self.flags & FLAG_SHARED)
+
+    def is_compressed(self) -> bool:
+        """
+        Verifica si los datos del archivo están comprimidos.
+
+        Returns:
+            True si la entrada tiene FLAG_COMPRESSED
+        """
+        return bool(self.flags & FLAG_COMPRESSED)
+
+    def content_size(self) -> int:
+        """
+        Tamaño del contenido del archivo tal como lo ve el usuario.
+
+        Returns:
+            aux (tamaño sin comprimir) si el archivo está comprimido;
+            file_size si no
+        """
+        return self.aux if self.flags & FLAG_COMPRESSED else self.file_size
+
+    def is_reserved(self) -> bool:
+        """
+        Verifica si el archivo tiene espacio reservado pendiente de confirmar.
+
+        Returns:
+            True si la entrada tiene FLAG_RESERVED
+        """
+        return bool(self.flags & FLAG_RESERVED)
+
+    def num_clusters_needed(self, cluster_size: int = 1024) -> int:
         """
         Calcula cuántos clusters ocupa este archivo.
 
+        En un archivo fragmentado es solo lo que cubre file_size: los
+        clusters reales están en su ExtentBlock.
+
+        Args:
+            cluster_size: Bytes por cluster de la imagen (default: 1024)
+
         Returns:
-            Número de clusters necesarios para el tamaño del archivo
+            Número de clusters necesarios para el tamaño del archivo, o los
+            clusters reservados si son más
         """
-        return calcular_clusters_necesarios(self.file_size)
+        clusters = calcular_clusters_necesarios(self.file_size, cluster_size)
+
+        if self.flags & FLAG_RESERVED:
+            clusters = max(clusters, self.aux)
+
+        return clusters
 
     @staticmethod
     def create_empty() -> 'DirectoryEntry':
@@ -166,6 +324,23 @@ class DirectoryEntry(NamedTuple):
             modified_timestamp=timestamp
         )
 
+    @staticmethod
+    def create_directory(name: str, start_cluster: int, table_size: int) -> 'DirectoryEntry':
+        """
+        Crea la entrada de un subdirectorio.
+
+        Args:
+            name: Nombre del subdirectorio (máximo 14 caracteres)
+            start_cluster: Cluster inicial de su tabla de entradas
+            table_size: Tamaño de la tabla en bytes (entradas × 64)
+
+        Returns:
+            DirectoryEntry con FLAG_DIRECTORY y timestamps actuales
+        """
+        return DirectoryEntry.create_file(name, start_cluster, table_size)._replace(
+            flags=FLAG_DIRECTORY
+        )
+
     def __str__(self) -> str:
         """Representación en string para debugging."""
         tipo = 'ACTIVO' if self.is_active() else 'VACIO'
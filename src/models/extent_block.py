@@ -0,0 +1,114 @@
+"""
+Modelo del bloque de extents de FiUnamFS
+
+Un archivo que no cabe en un solo espacio contiguo se guarda en varios
+extents (tramos de clusters consecutivos). Su entrada de directorio lleva
+FLAG_EXTENTS y su start_cluster apunta a un cluster con la lista de
+extents, en el orden en que forman el archivo:
+
+    bytes 0-3   magic: b'FXT1'
+    bytes 4-7   count: número de extents (uint32 little-endian)
+    bytes 8-... count × (inicio uint32, longitud uint32)
+
+El resto del cluster queda en ceros. Los archivos contiguos no usan
+bloque de extents (formato original).
+"""
+
+import struct
+from typing import List, NamedTuple, Tuple
+
+from utils.exceptions import InvalidFilesystemError
+
+
+# Firma del bloque de extents
+EXTENT_BLOCK_MAGIC = b'FXT1'
+
+# Encabezado (magic + count) y cada extent (inicio + longitud)
+EXTENT_HEADER = struct.Struct('<4sI')
+EXTENT_STRUCT = struct.Struct('<II')
+
+
+class ExtentBlock(NamedTuple):
+    """
+    Lista de extents de un archivo fragmentado.
+
+    Atributos:
+        extents: Tuplas (cluster_inicial, clusters), en orden del archivo
+    """
+    extents: Tuple[Tuple[int, int], ...]
+
+    @staticmethod
+    def max_extents(cluster_size: int) -> int:
+        """
+        Extents que caben en un bloque de un cluster.
+
+        Args:
+            cluster_size: Bytes por cluster de la imagen
+
+        Returns:
+            Máximo de extents por archivo (127 con clusters de 1024 bytes)
+        """
+        return (cluster_size - EXTENT_HEADER.size) // EXTENT_STRUCT.size
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ExtentBlock':
+        """
+        Parsea un bloque de extents.
+
+        Args:
+            data: Bytes del cluster del bloque
+
+        Returns:
+            ExtentBlock con los extents leídos
+
+        Raises:
+            InvalidFilesystemError: Si la firma o el número de extents no
+                son válidos
+        """
+        if len(data) < EXTENT_HEADER.size:
+            raise InvalidFilesystemError("Bloque de extents truncado")
+
+        magic, count = EXTENT_HEADER.unpack_from(data)
+        if magic != EXTENT_BLOCK_MAGIC:
+            raise InvalidFilesystemError(
+                f"Firma de bloque de extents inválida: {magic!r}"
+            )
+
+        if EXTENT_HEADER.size + count * EXTENT_STRUCT.size > len(data):
+            raise InvalidFilesystemError(
+                f"Número de extents inválido: {count} no caben en {len(data)} bytes"
+            )
+
+        return cls(tuple(
+            EXTENT_STRUCT.unpack_from(data, EXTENT_HEADER.size + i * EXTENT_STRUCT.size)
+            for i in range(count)
+        ))
+
+    def to_bytes(self, cluster_size: int) -> bytes:
+        """
+        Serializa el bloque a un cluster completo.
+
+        Args:
+            cluster_size: Bytes por cluster de la imagen
+
+        Returns:
+            cluster_size bytes (encabezado + extents + ceros)
+
+        Raises:
+            ValueError: Si los extents no caben en un cluster
+        """
+        if len(self.extents) > self.max_extents(cluster_size):
+            raise ValueError(
+                f"{len(self.extents)} extents no caben en un cluster de "
+                f"{cluster_size} bytes (máximo: {self.max_extents(cluster_size)})"
+            )
+
+        parts: List[bytes] = [EXTENT_HEADER.pack(EXTENT_BLOCK_MAGIC, len(self.extents))]
+        parts.extend(EXTENT_STRUCT.pack(start, length) for start, length in self.extents)
+
+        return b''.join(parts).ljust(cluster_size, b'\x00')
+
+    @property
+    def total_clusters(self) -> int:
+        """Clusters de datos del archivo (sin contar el bloque)."""
+        return sum(length for _, length in self.extents)
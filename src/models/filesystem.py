@@ -6,38 +6,154 @@ incluyendo gestión de clusters, lectura/escritura de archivos y
 operaciones de directorio.
 """
 
-from typing import Optional
+import bisect
+import functools
+import heapq
+import os
+import struct
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .cluster_cache import ClusterCache, DEFAULT_CACHE_BYTES
+from utils.locking import ImageLock
+from utils import positional_io
+
+
+# Tamaño de bloque para leer flujos de datos (append desde streams)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Tamaño de bloque para copias dentro de la imagen
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# Bytes de directorio que se comparan de una vez al buscar cambios externos
+# (64 entradas); solo los bloques distintos se comparan entrada por entrada
+DIRECTORY_COMPARE_BLOCK = 4096
+
+# Slots intermedios que _write_directory_entries() reescribe para unir dos
+# cambios en una sola escritura (más separados, se escriben por separado)
+DIRECTORY_WRITE_GAP = 64
+
+# Entradas iniciales de la tabla de un subdirectorio (se duplica al llenarse)
+SUBDIRECTORY_SLOTS = 64
+
+# Hilos de verificación de scrub() (pread y crc32 liberan el GIL)
+SCRUB_WORKERS = 4
+
+# Rangos liberados pendientes de discard antes de fusionar los contiguos
+DISCARD_PENDING_MAX = 4096
 
 
 class ClusterMap:
     """
     Mapa de clusters para gestionar espacio libre y ocupado en el filesystem.
 
-    El ClusterMap mantiene un registro de qué clusters están ocupados
-    y proporciona métodos para encontrar espacio contiguo libre.
+    Los clusters libres se guardan como extents (inicio, longitud) ordenados
+    por inicio, así que la memoria y el costo de las operaciones dependen
+    del número de huecos y no del total de clusters de la imagen.
 
     Atributos:
-        total_clusters: Total de clusters en el filesystem (1440)
-        allocated: Lista booleana indicando si cada cluster está ocupado
+        total_clusters: Total de clusters en el filesystem
+        first_data_cluster: Primer cluster de datos (los anteriores son
+            superblock y directorio, siempre ocupados)
+        free_count: Clusters de datos libres (se mantiene en cada cambio)
     """
 
-    def __init__(self, total_clusters: int = 1440):
+    def __init__(self, total_clusters: int = 1440, first_data_cluster: int = 5):
         """
-        Inicializa el mapa de clusters.
+        Inicializa el mapa con toda el área de datos libre.
+
+        Filesystem pasa la geometría de su superblock; los defaults son los
+        de 26-1/26-2.
 
         Args:
             total_clusters: Total de clusters en el filesystem (default: 1440)
+            first_data_cluster: Primer cluster de datos (default: 5)
         """
         self.total_clusters = total_clusters
-        self.allocated = [False] * total_clusters
+        self.first_data_cluster = first_data_cluster
+
+        # Extents libres: _starts[i] es el inicio y _lengths[i] la longitud
+        self._starts: List[int] = []
+        self._lengths: List[int] = []
+
+        if total_clusters > first_data_cluster:
+            self._starts.append(first_data_cluster)
+            self._lengths.append(total_clusters - first_data_cluster)
+
+        self.free_count = max(total_clusters - first_data_cluster, 0)
+
+        # Bloque libre contiguo más grande (None = recalcular al consultarlo)
+        self._largest_free: Optional[int] = None
+
+    def copy(self) -> 'ClusterMap':
+        """
+        Crea una copia independiente del mapa (para simular asignaciones).
 
-        # Reservar clusters 0-4 (superblock + directorio)
-        # Cluster 0: Superblock
-        # Clusters 1-4: Directorio
-        for i in range(5):
-            self.allocated[i] = True
+        Returns:
+            Nuevo ClusterMap con el mismo estado
+        """
+        new_map = ClusterMap.__new__(ClusterMap)
+        new_map.total_clusters = self.total_clusters
+        new_map.first_data_cluster = self.first_data_cluster
+        new_map._starts = list(self._starts)
+        new_map._lengths = list(self._lengths)
+        new_map.free_count = self.free_count
+        new_map._largest_free = self._largest_free
+        return new_map
+
+    def _remove_range(self, start: int, end: int) -> int:
+        """
+        Quita el rango [start, end) de los extents libres.
+
+        Args:
+            start: Primer cluster del rango
+            end: Cluster siguiente al último del rango
+
+        Returns:
+            Cuántos clusters del rango estaban libres
+        """
+        starts = self._starts
+        lengths = self._lengths
+
+        # Primer extent que puede traslaparse con el rango
+        i = bisect.bisect_right(starts, start) - 1
+        if i < 0 or starts[i] + lengths[i] <= start:
+            i += 1
+
+        removed = 0
+        while i < len(starts) and starts[i] < end:
+            extent_start = starts[i]
+            extent_end = extent_start + lengths[i]
+            lo = max(extent_start, start)
+            hi = min(extent_end, end)
+            removed += hi - lo
+
+            # Quedan (posiblemente) un pedazo a la izquierda y otro a la derecha
+            left = lo - extent_start
+            right = extent_end - hi
+            if left and right:
+                lengths[i] = left
+                starts.insert(i + 1, hi)
+                lengths.insert(i + 1, right)
+                break
+            elif left:
+                lengths[i] = left
+                i += 1
+            elif right:
+                starts[i] = hi
+                lengths[i] = right
+                break
+            else:
+                del starts[i]
+                del lengths[i]
+
+        if removed:
+            self._largest_free = None
 
-    def allocate_file(self, start_cluster: int, num_clusters: int) -> None:
+        return removed
+
+    def allocate_file(self, start_cluster: int, num_clusters: int) -> int:
         """
         Marca un rango de clusters como ocupados por un archivo.
 
@@ -45,37 +161,128 @@ class ClusterMap:
             start_cluster: Cluster inicial
             num_clusters: Cantidad de clusters a marcar
 
+        Returns:
+            Clusters del rango que ya estaban ocupados (0 salvo que el
+            rango se traslape con otro archivo; ver fsck())
+
         Raises:
-            ValueError: Si algún cluster está fuera de rango
+            ValueError: Si algún cluster está fuera de rango (la parte del
+                rango que sí cabe queda marcada)
         """
-        for i in range(start_cluster, start_cluster + num_clusters):
-            if i >= self.total_clusters:
-                raise ValueError(
-                    f"Cluster {i} fuera de rango (máximo: {self.total_clusters - 1})"
-                )
-            self.allocated[i] = True
+        end = start_cluster + num_clusters
+        valid_end = min(end, self.total_clusters)
+        removed = self._remove_range(start_cluster, valid_end)
+        self.free_count -= removed
+
+        if end > self.total_clusters:
+            raise ValueError(
+                f"Cluster {max(start_cluster, self.total_clusters)} fuera de rango "
+                f"(máximo: {self.total_clusters - 1})"
+            )
+
+        return max(valid_end - start_cluster, 0) - removed
 
     def free_file(self, start_cluster: int, num_clusters: int) -> None:
         """
         Marca un rango de clusters como libres (después de eliminar archivo).
 
+        Los clusters fuera de rango o anteriores al área de datos se ignoran.
+
         Args:
             start_cluster: Cluster inicial
             num_clusters: Cantidad de clusters a liberar
         """
-        for i in range(start_cluster, start_cluster + num_clusters):
-            if i >= self.total_clusters:
-                continue  # Ignorar clusters fuera de rango
-            if i < 5:
-                continue  # No liberar clusters reservados
-            self.allocated[i] = False
+        start = max(start_cluster, self.first_data_cluster)
+        end = min(start_cluster + num_clusters, self.total_clusters)
+        if start >= end:
+            return
+
+        # Quitar primero la parte que ya estaba libre para no contarla dos veces
+        already_free = self._remove_range(start, end)
+        self.free_count += (end - start) - already_free
+
+        # Insertar el extent fusionándolo con sus vecinos
+        starts = self._starts
+        lengths = self._lengths
+        i = bisect.bisect_left(starts, start)
+
+        if i < len(starts) and starts[i] == end:
+            end += lengths[i]
+            del starts[i]
+            del lengths[i]
+
+        if i > 0 and starts[i - 1] + lengths[i - 1] == start:
+            lengths[i - 1] = end - starts[i - 1]
+            merged = lengths[i - 1]
+        else:
+            starts.insert(i, start)
+            lengths.insert(i, end - start)
+            merged = end - start
+
+        # Liberar solo puede hacer crecer el bloque más grande
+        if self._largest_free is not None:
+            self._largest_free = max(self._largest_free, merged)
+
+    def is_free(self, start_cluster: int, num_clusters: int) -> bool:
+        """
+        Verifica si un rango de clusters está completamente libre.
+
+        Args:
+            start_cluster: Cluster inicial
+            num_clusters: Cantidad de clusters
+
+        Returns:
+            True si todos los clusters del rango están libres
+        """
+        i = bisect.bisect_right(self._starts, start_cluster) - 1
+        return i >= 0 and self._starts[i] + self._lengths[i] >= start_cluster + num_clusters
+
+    def free_extents(self) -> List[tuple]:
+        """
+        Retorna los extents libres ordenados por inicio.
+
+        Returns:
+            Lista de tuplas (cluster_inicial, num_clusters)
+        """
+        return list(zip(self._starts, self._lengths))
+
+    def free_parts(self, start_cluster: int, num_clusters: int) -> List[tuple]:
+        """
+        Retorna las partes libres de un rango de clusters.
+
+        Args:
+            start_cluster: Cluster inicial
+            num_clusters: Cantidad de clusters
+
+        Returns:
+            Lista de tuplas (cluster_inicial, num_clusters) ordenadas por
+            inicio (vacía si todo el rango está ocupado)
+        """
+        starts = self._starts
+        lengths = self._lengths
+        end = start_cluster + num_clusters
+
+        i = bisect.bisect_right(starts, start_cluster) - 1
+        if i < 0 or starts[i] + lengths[i] <= start_cluster:
+            i += 1
+
+        parts = []
+        while i < len(starts) and starts[i] < end:
+            lo = max(starts[i], start_cluster)
+            hi = min(starts[i] + lengths[i], end)
+            parts.append((lo, hi - lo))
+            i += 1
+
+        return parts
 
     def find_contiguous_space(self, num_clusters: int) -> Optional[int]:
         """
         Encuentra el primer espacio contiguo libre usando algoritmo first-fit.
 
-        Busca secuencialmente desde el cluster 5 (primer cluster de datos)
-        hasta encontrar una secuencia de clusters libres del tamaño necesario.
+        Recorre los extents libres (ordenados por inicio) hasta encontrar
+        uno del tamaño necesario: el costo depende del número de huecos, no
+        del total de clusters. Si el bloque libre más grande ya se conoce y
+        es menor, responde sin recorrer nada.
 
         Args:
             num_clusters: Cantidad de clusters contiguos necesarios
@@ -83,37 +290,74 @@ class ClusterMap:
         Returns:
             Número del cluster inicial, o None si no hay espacio contiguo suficiente
 
-        Ejemplo:
-            >>> cmap = ClusterMap()
-            >>> cmap.allocate_file(5, 10)  # Ocupar clusters 5-14
-            >>> cmap.find_contiguous_space(5)  # Buscar 5 clusters libres
-            15  # Primer espacio libre después de cluster 14
+        Ejemplo (imagen 26-3 de 65536 clusters, datos desde el cluster 257):
+            >>> cmap = ClusterMap(65536, 257)
+            >>> cmap.allocate_file(257, 1000)
+            0
+            >>> cmap.allocate_file(2000, 63536)
+            0
+            >>> cmap.free_extents()
+            [(1257, 743)]
+            >>> cmap.find_contiguous_space(500)
+            1257
+            >>> cmap.find_contiguous_space(800) is None
+            True
         """
         if num_clusters == 0:
             return None
 
-        consecutive = 0  # Contador de clusters consecutivos libres
-        start = None     # Cluster inicial del espacio libre encontrado
+        # Descarte rápido si ya se sabe que no hay un bloque tan grande
+        if self._largest_free is not None and self._largest_free < num_clusters:
+            return None
+
+        for start, length in zip(self._starts, self._lengths):
+            if length >= num_clusters:
+                return start
+
+        # No se encontró espacio contiguo suficiente
+        return None
+
+    def find_extents(self, num_clusters: int, max_extents: int) -> Optional[List[tuple]]:
+        """
+        Reparte num_clusters entre varios huecos libres (archivo fragmentado).
+
+        Toma primero los huecos más grandes (el menor número de extents) y
+        el último pedazo del hueco más chico en el que cabe completo, para
+        no partir un hueco grande. Los extents se devuelven ordenados por
+        inicio, así el archivo se lee hacia adelante en la imagen.
 
-        # Comenzar búsqueda desde cluster 5 (primer cluster de datos)
-        for i in range(5, self.total_clusters):
-            if not self.allocated[i]:
-                # Cluster libre encontrado
-                if consecutive == 0:
-                    start = i  # Marcar inicio de secuencia libre
+        Args:
+            num_clusters: Clusters totales necesarios
+            max_extents: Máximo de extents permitidos
 
-                consecutive += 1
+        Returns:
+            Lista de tuplas (cluster_inicial, num_clusters), o None si no
+            hay suficientes clusters libres en max_extents huecos
+        """
+        if num_clusters <= 0 or num_clusters > self.free_count:
+            return None
 
-                # ¿Tenemos suficientes clusters consecutivos?
-                if consecutive == num_clusters:
-                    return start
+        holes = sorted(zip(self._starts, self._lengths), key=lambda h: -h[1])
+        neg_lengths = [-length for _, length in holes]
+
+        chosen = []
+        remaining = num_clusters
+        i = 0
+        while remaining > 0 and len(chosen) < max_extents and i < len(holes):
+            if holes[i][1] >= remaining:
+                # Último hueco (de mayor a menor) donde cabe el resto
+                j = bisect.bisect_right(neg_lengths, -remaining, lo=i) - 1
+                chosen.append((holes[j][0], remaining))
+                remaining = 0
             else:
-                # Cluster ocupado - reiniciar búsqueda
-                consecutive = 0
-                start = None
+                chosen.append(holes[i])
+                remaining -= holes[i][1]
+                i += 1
 
-        # No se encontró espacio contiguo suficiente
-        return None
+        if remaining > 0:
+            return None
+
+        return sorted(chosen)
 
     def available_clusters(self) -> int:
         """
@@ -123,10 +367,11 @@ class ClusterMap:
             Número total de clusters no ocupados
 
         Nota:
-            Este conteo incluye clusters fragmentados. Para importar archivos
-            se necesita espacio CONTIGUO, usar find_contiguous_space().
+            Este conteo incluye clusters fragmentados. Un archivo contiguo
+            necesita find_contiguous_space(); uno que no cabe en ningún
+            hueco se reparte con find_extents().
         """
-        return sum(1 for i in range(5, self.total_clusters) if not self.allocated[i])
+        return self.free_count
 
     def largest_contiguous_block(self) -> int:
         """
@@ -134,18 +379,15 @@ class ClusterMap:
 
         Returns:
             Número de clusters en el bloque contiguo más grande
-        """
-        max_consecutive = 0
-        current_consecutive = 0
 
-        for i in range(5, self.total_clusters):
-            if not self.allocated[i]:
-                current_consecutive += 1
-                max_consecutive = max(max_consecutive, current_consecutive)
-            else:
-                current_consecutive = 0
+        Nota:
+            El resultado se guarda y solo se recalcula después de que
+            cambie el mapa.
+        """
+        if self._largest_free is None:
+            self._largest_free = max(self._lengths, default=0)
 
-        return max_consecutive
+        return self._largest_free
 
     def __str__(self) -> str:
         """Representación en string para debugging."""
@@ -154,10 +396,79 @@ class ClusterMap:
         return (
             f"ClusterMap(total={self.total_clusters}, "
             f"libre={total_libre}, "
-            f"max_contiguo={max_contiguo})"
+            f"max_contiguo={max_contiguo}, "
+            f"huecos={len(self._starts)})"
         )
 
 
+class DirectoryTable(NamedTuple):
+    """
+    Ubicación de la tabla de entradas de un directorio.
+
+    Las entradas de todas las tablas (la raíz y cada subdirectorio) se
+    guardan juntas en Filesystem.directory_entries; cada tabla ocupa el
+    rango [first_slot, first_slot + slots) de ese arreglo.
+
+    Atributos:
+        path: Ruta del directorio ('' = raíz, 'a/b' = subdirectorio)
+        first_slot: Índice global de su primera entrada
+        slots: Número de entradas de la tabla
+        offset: Offset en bytes de la tabla dentro de la imagen
+    """
+    path: str
+    first_slot: int
+    slots: int
+    offset: int
+
+
+def _join_path(parent: str, name: str) -> str:
+    """
+    Une la ruta de un directorio y un nombre ('' es la raíz).
+
+    Args:
+        parent: Ruta del directorio padre
+        name: Nombre de la entrada
+
+    Returns:
+        Ruta sin '/' inicial (e.g., 'docs/a.txt')
+    """
+    return f"{parent}/{name}" if parent else name
+
+
+def _reader(method):
+    """
+    Ejecuta un método de Filesystem bajo read_lock().
+
+    Args:
+        method: Método que solo lee la imagen
+
+    Returns:
+        Método envuelto
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.read_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _writer(method):
+    """
+    Ejecuta un método de Filesystem bajo write_lock().
+
+    Args:
+        method: Método que modifica el directorio o los datos
+
+    Returns:
+        Método envuelto
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.write_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Filesystem:
     """
     Clase principal para operaciones sobre filesystem FiUnamFS.
@@ -167,35 +478,134 @@ class Filesystem:
 
     Atributos:
         fs_path: Ruta al archivo de imagen del filesystem
-        file_handle: File handle abierto en modo lectura/escritura binario
+        fd: Descriptor de archivo de la imagen. Toda la E/S es posicional
+            (pread/pwrite), sin offset compartido ni buffer intermedio
         superblock: Objeto Superblock parseado y validado
-        directory_entries: Lista de todas las entradas de directorio (64 entradas)
+        directory_entries: Entradas de todas las tablas de directorio: primero
+            las de la raíz (64 en 26-1/26-2) y después las de cada
+            subdirectorio (ver DirectoryTable)
+        generation: Contador que se incrementa con cada cambio al directorio
+            (permite a las capas superiores invalidar sus caches)
+        cache: Cache LRU de clusters usado por todas las lecturas de datos
+        lock: RLock que serializa el acceso al file handle (el hilo de
+            read-ahead del montaje FUSE lee en paralelo a las operaciones)
+        cluster_map: ClusterMap persistente, actualizado en cada escritura
+            de una entrada de directorio
+        active_entries: Número de entradas de directorio activas
+        name_index: Diccionario {ruta: índice de entrada} de los archivos y
+            directorios activos (búsquedas por ruta en O(1), sin recorrer
+            los directorios intermedios)
+        _child_index: Diccionario {ruta de directorio: {ruta: índice}} con
+            las entradas activas de cada directorio (listar un directorio
+            cuesta lo que tiene, no el total de slots de la imagen)
+        _tables: DirectoryTable de la raíz y de cada subdirectorio, en el
+            orden de sus slots
+        _table_index: Diccionario {ruta de directorio: posición en _tables}
+        _free_slots: Heap por directorio con los índices de slots vacíos
+            (el menor es el siguiente slot a usar; los que se ocuparon se
+            descartan al llegar a la cima)
+        _directory_raw: Copia de los bytes de todas las tablas de
+            directorio tal como están en disco (para detectar cambios
+            externos sin parsear todas las entradas)
+        _extents: Extents de los archivos fragmentados, por cluster de su
+            ExtentBlock (se leen una vez y se descartan al liberar el bloque)
+        _shared: Referencias a los clusters compartidos (FLAG_SHARED), por
+            cluster inicial; se derivan de las entradas al leer el
+            directorio
+        _inflated: (clave, contenido) del último archivo comprimido leído
+            con _read_file_data() (las lecturas por rangos de FUSE no lo
+            descomprimen una vez por llamada)
+        external_refreshes: Veces que se detectó y aplicó una modificación
+            externa de la imagen (ver refresh_if_changed)
+        _change_counter: Último valor visto (o escrito) del contador de
+            cambios del superblock
+        _modified: True si este proceso escribió en la imagen desde el
+            último incremento del contador
+        image_lock: Bloqueo advisory de la imagen entre procesos
+            (compartido para lectores, exclusivo para escritores)
+        read_only: Si True, la imagen se abrió con O_RDONLY: toda operación
+            de escritura lanza ReadOnlyFilesystemError y las lecturas no
+            toman bloqueos
+        discard: Si True, los rangos de clusters que se liberan se anotan
+            en _discard_pending y discard_freed() los perfora en la imagen
+            (siempre False en solo lectura)
+        _discard_pending: Rangos (cluster_inicial, num_clusters) liberados
+            desde el último discard_freed()
+        discard_pending_clusters: Clusters en _discard_pending (puede
+            contar dos veces un rango liberado, reasignado y liberado de
+            nuevo)
     """
 
-    def __init__(self, fs_path: str):
+    def __init__(self, fs_path: str, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 read_only: bool = False, discard: bool = False):
         """
         Inicializa el filesystem y valida la estructura.
 
         Args:
             fs_path: Ruta al archivo de imagen FiUnamFS (.img)
+            cache_bytes: Presupuesto del cache de clusters en bytes
+                (default: 4 MB, 0 = sin cache)
+            read_only: Abrir en modo solo lectura (default: False). Funciona
+                con imágenes en almacenamiento de solo lectura
+            discard: Anotar los clusters que se liberan para perforarlos
+                con discard_freed() (default: False; se ignora en solo
+                lectura)
 
         Raises:
             FileNotFoundError: Si el archivo no existe
             InvalidFilesystemError: Si la estructura no es válida
         """
         self.fs_path = fs_path
-        self.file_handle = None
+        self.fd = None
         self.superblock = None
         self.directory_entries = []
-
-        # Abrir archivo en modo lectura/escritura binario
-        self.file_handle = open(fs_path, 'r+b')
-
-        # Leer y validar superblock
-        self._read_superblock()
-
-        # Leer directorio
-        self._read_directory()
+        self.generation = 0
+        self.cache = ClusterCache(cache_bytes)
+        self.lock = threading.RLock()
+        self.cluster_map = None
+        self.active_entries = 0
+        self.name_index: Dict[str, int] = {}
+        self._child_index: Dict[str, Dict[str, int]] = {}
+        self._tables: List[DirectoryTable] = []
+        self._table_starts: List[int] = []
+        self._table_index: Dict[str, int] = {}
+        self._free_slots: Dict[str, List[int]] = {}
+        self._directory_raw = bytearray()
+        self._extents: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+        self._shared: Dict[int, int] = {}
+        self._dedup_index = None
+        self._inflated = None
+        self.external_refreshes = 0
+        self._change_counter = 0
+        self._modified = False
+        self.read_only = read_only
+        self.discard = discard and not read_only
+        self._discard_pending: List[Tuple[int, int]] = []
+        self.discard_pending_clusters = 0
+
+        # Abrir descriptor crudo (O_RDONLY o O_RDWR)
+        flags = os.O_RDONLY if read_only else os.O_RDWR
+        self.fd = os.open(fs_path, flags | getattr(os, 'O_BINARY', 0))
+        self.image_lock = ImageLock(self.fd)
+
+        # Leer bajo bloqueo compartido para no ver a medias la escritura
+        # de otro proceso
+        try:
+            with nullcontext() if read_only else self.image_lock.hold(exclusive=False):
+                # Firma de la imagen (antes de leerla, para no perder cambios
+                # que ocurran mientras se lee)
+                self._image_signature = self._stat_image()
+
+                # Leer y validar superblock
+                self._read_superblock()
+                self._change_counter = self._read_change_counter()
+
+                # Leer directorio
+                self._read_directory()
+        except BaseException:
+            # Un descriptor crudo no se cierra solo al recolectarse
+            self.close()
+            raise
 
     def _read_superblock(self) -> None:
         """
@@ -207,8 +617,7 @@ class Filesystem:
         from .superblock import Superblock
 
         # Leer cluster 0 (bytes 0-1023)
-        self.file_handle.seek(0)
-        superblock_data = self.file_handle.read(1024)
+        superblock_data = self._read_at(0, 1024)
 
         # Parsear superblock
         self.superblock = Superblock.from_bytes(superblock_data)
@@ -218,345 +627,3125 @@ class Filesystem:
 
     def _read_directory(self) -> None:
         """
-        Lee todas las entradas de directorio (clusters 1-4).
+        Lee el árbol de directorios completo y reconstruye el mapa de
+        clusters, el índice de rutas, los slots libres y los contadores.
 
-        Lee los 64 entries de 64 bytes cada uno desde los clusters 1-4
-        (bytes 1024-5119) y los parsea como DirectoryEntry objects.
+        Recorre los directorios por niveles a partir de la raíz. Un
+        subdirectorio cuya tabla queda fuera del área de datos o apunta a
+        una tabla ya visitada (imagen dañada) se trata como vacío.
         """
         from .directory_entry import DirectoryEntry
 
-        # Leer clusters 1-4 (bytes 1024-5119)
-        self.file_handle.seek(1024)
-        directory_data = self.file_handle.read(4096)  # 4 clusters × 1024 bytes
+        root = DirectoryTable('', 0, self.superblock.directory_slots,
+                              self.superblock.directory_offset)
+        tables = [root]
+        raw = self._read_directory_region(root)
+        entries = DirectoryEntry.parse_many(raw)
+        visited = set()
+
+        pos = 0
+        while pos < len(tables):
+            table = tables[pos]
+            pos += 1
+            for index in range(table.first_slot, table.first_slot + table.slots):
+                entry = entries[index]
+                if not entry.is_directory() or entry.start_cluster in visited:
+                    continue
+                sub = self._subdirectory_table(table.path, entry, len(entries))
+                if sub is None:
+                    continue
+                visited.add(entry.start_cluster)
+                data = self._read_directory_region(sub)
+                raw += data
+                entries.extend(DirectoryEntry.parse_many(data))
+                tables.append(sub)
+
+        self._tables = tables
+        self._table_starts = [table.first_slot for table in tables]
+        self._table_index = {table.path: n for n, table in enumerate(tables)}
+        self._directory_raw = raw
+        self.directory_entries = entries
+        self._extents = {}
+        self._shared = {}
+        self.cluster_map = self._build_cluster_map()
+
+        self.name_index = {}
+        self._child_index = {}
+        self._free_slots = {}
+        for table in tables:
+            # Lista ordenada: ya es un heap válido
+            free = self._free_slots[table.path] = []
+            children = self._child_index[table.path] = {}
+            for index in range(table.first_slot, table.first_slot + table.slots):
+                entry = entries[index]
+                if entry.is_active():
+                    path = _join_path(table.path, entry.filename.strip())
+                    self.name_index[path] = index
+                    children[path] = index
+                elif entry.is_empty():
+                    free.append(index)
+
+        self.active_entries = sum(1 for entry in entries if entry.is_active())
+        self.generation += 1
+
+    def _subdirectory_table(self, parent: str, entry, first_slot: int) -> Optional[DirectoryTable]:
+        """
+        Calcula la tabla de un subdirectorio a partir de su entrada.
 
-        # Parsear las 64 entradas de directorio (64 entries × 64 bytes)
-        self.directory_entries = []
-        for i in range(64):
-            offset = i * 64
-            entry_data = directory_data[offset:offset + 64]
-            entry = DirectoryEntry.from_bytes(entry_data)
-            self.directory_entries.append(entry)
+        Args:
+            parent: Ruta del directorio que contiene la entrada
+            entry: DirectoryEntry con FLAG_DIRECTORY
+            first_slot: Índice global que tendrá su primera entrada
 
-    def list_files(self) -> dict:
+        Returns:
+            DirectoryTable, o None si la tabla no es válida
         """
-        Lista todos los archivos activos en el filesystem.
+        superblock = self.superblock
+        slots = entry.file_size // 64
+        end = entry.start_cluster + self._entry_clusters(entry)
 
-        Returns:
-            Diccionario con:
-                - 'files': Lista de diccionarios con info de cada archivo
-                - 'total_files': Número total de archivos activos
-                - 'used_space': Bytes ocupados
-                - 'free_space': Bytes disponibles
+        if (slots == 0 or entry.start_cluster < superblock.first_data_cluster
+                or end > superblock.total_clusters):
+            return None
 
-        Ejemplo de retorno:
-            {
-                'files': [
-                    {
-                        'filename': 'README.txt',
-                        'size': 1024,
-                        'created': '2025-11-07 14:30:00',
-                        'modified': '2025-11-07 14:30:00',
-                        'start_cluster': 5,
-                        'num_clusters': 1
-                    },
-                    ...
-                ],
-                'total_files': 3,
-                'used_space': 5120,
-                'free_space': 1469440
-            }
+        return DirectoryTable(
+            _join_path(parent, entry.filename.strip()),
+            first_slot,
+            slots,
+            entry.start_cluster * superblock.cluster_size
+        )
+
+    def _read_directory_region(self, table: DirectoryTable) -> bytearray:
         """
-        from utils.binary_utils import timestamp_legible
+        Lee los bytes de una tabla de directorio sin modificar el estado.
 
-        files = []
-        used_space = 0
+        La tabla raíz empieza en el cluster 1 (en 26-1/26-2: 64 entradas en
+        los clusters 1-4, bytes 1024-5119; en 26-3 la define el superblock);
+        la de un subdirectorio ocupa su extent en el área de datos. Cada
+        entrada mide 64 bytes.
 
-        # Filtrar entradas activas y construir lista de archivos
-        for entry in self.directory_entries:
-            if entry.is_active():
-                files.append({
-                    'filename': entry.filename.strip(),  # Remover espacios de padding
-                    'size': entry.file_size,
-                    'created': timestamp_legible(entry.created_timestamp),
-                    'modified': timestamp_legible(entry.modified_timestamp),
-                    'start_cluster': entry.start_cluster,
-                    'num_clusters': entry.num_clusters_needed()
-                })
-                used_space += entry.file_size
-
-        # Calcular espacio libre
-        # Total de espacio de datos: 1435 clusters × 1024 bytes = 1,469,440 bytes
-        total_data_space = 1435 * 1024
-        free_space = total_data_space - used_space
+        Args:
+            table: Tabla a leer
 
-        return {
-            'files': files,
-            'total_files': len(files),
-            'used_space': used_space,
-            'free_space': free_space
-        }
+        Returns:
+            table.slots × 64 bytes (completados con ceros si la imagen está
+            truncada)
+        """
+        size = table.slots * 64
+        data = bytearray(self._read_at(table.offset, size))
+        if len(data) < size:
+            data.extend(bytes(size - len(data)))
 
-    def _find_file(self, filename: str):
+        return data
+
+    def _table_of(self, index: int) -> DirectoryTable:
         """
-        Busca un archivo en el directorio por nombre.
+        Tabla de directorio a la que pertenece un slot.
 
         Args:
-            filename: Nombre del archivo a buscar
+            index: Índice global del slot
 
         Returns:
-            DirectoryEntry del archivo encontrado
+            DirectoryTable que contiene el slot
+        """
+        return self._tables[bisect.bisect_right(self._table_starts, index) - 1]
 
-        Raises:
-            FileNotFoundInFilesystemError: Si el archivo no existe
+    def _slot_offset(self, index: int) -> int:
         """
-        from utils.exceptions import FileNotFoundInFilesystemError
+        Offset en bytes de un slot dentro de la imagen.
 
-        # Buscar en las entradas de directorio
-        # Comparar sin espacios de padding (los nombres se guardan en campo fijo de 14 chars)
-        for entry in self.directory_entries:
-            if entry.is_active() and entry.filename.strip() == filename:
-                return entry
-
-        # Archivo no encontrado - construir lista de archivos disponibles
-        archivos_disponibles = [
-            entry.filename.strip()
-            for entry in self.directory_entries
-            if entry.is_active()
-        ]
+        Args:
+            index: Índice global del slot
 
-        raise FileNotFoundInFilesystemError(filename, archivos_disponibles)
+        Returns:
+            Offset de sus 64 bytes
+        """
+        table = self._table_of(index)
+        return table.offset + (index - table.first_slot) * 64
 
-    def _read_file_data(self, entry) -> bytes:
+    def _entry_path(self, index: int, entry) -> str:
         """
-        Lee los datos de un archivo desde el filesystem.
+        Ruta completa de una entrada según el directorio de su slot.
 
         Args:
-            entry: DirectoryEntry del archivo a leer
+            index: Índice global del slot
+            entry: DirectoryEntry del slot
 
         Returns:
-            Bytes del contenido del archivo
+            Ruta sin '/' inicial
         """
-        # Calcular offset en bytes: cluster × 1024
-        offset = entry.start_cluster * 1024
+        return _join_path(self._table_of(index).path, entry.filename.strip())
 
-        # Posicionarse en el inicio del archivo
-        self.file_handle.seek(offset)
+    @staticmethod
+    def _changes_tree(old_entry, new_entry) -> bool:
+        """
+        Indica si reemplazar una entrada cambia el árbol de directorios
+        (se crea, elimina, renombra, mueve o redimensiona un subdirectorio).
 
-        # Leer exactamente file_size bytes
-        data = self.file_handle.read(entry.file_size)
+        Cambiar solo los timestamps de un subdirectorio no cuenta.
 
-        return data
+        Args:
+            old_entry: Entrada que había en el slot
+            new_entry: Entrada que la reemplaza
 
-    def export_file(self, filename: str, dest_path: str) -> dict:
+        Returns:
+            True si las tablas de directorio deben recalcularse
         """
-        Exporta un archivo del filesystem al sistema local.
+        if not (old_entry.is_directory() or new_entry.is_directory()):
+            return False
+
+        return not (
+            old_entry.is_directory() and new_entry.is_directory()
+            and old_entry.filename == new_entry.filename
+            and old_entry.start_cluster == new_entry.start_cluster
+            and old_entry.file_size == new_entry.file_size
+        )
+
+    @staticmethod
+    def _split_path(path: str) -> Tuple[str, str]:
+        """
+        Separa una ruta en directorio padre y nombre, validando el nombre.
 
         Args:
-            filename: Nombre del archivo en FiUnamFS
-            dest_path: Ruta destino en el sistema local
+            path: Ruta dentro de la imagen (e.g., 'docs/a.txt' o '/a.txt')
 
         Returns:
-            Diccionario con resultado:
-                - 'filename': Nombre del archivo
-                - 'bytes_copied': Bytes copiados
-                - 'dest_path': Ruta destino
+            Tupla (ruta_padre, nombre); la raíz es ''
 
         Raises:
-            FileNotFoundInFilesystemError: Si el archivo no existe
-            IOError: Si hay error al escribir el archivo destino
+            ValueError: Si algún componente de la ruta es inválido
         """
-        import os
+        from utils.validation import validar_nombre_archivo
 
-        # Buscar el archivo
-        entry = self._find_file(filename)
+        parts = path.strip('/').split('/')
+        for part in parts:
+            validar_nombre_archivo(part)
+            if part in ('.', '..'):
+                raise ValueError(f"Componente de ruta no permitido: '{part}'")
 
-        # Leer los datos del archivo
-        data = self._read_file_data(entry)
+        return '/'.join(parts[:-1]), parts[-1]
 
-        # Crear directorio padre si no existe
-        dest_dir = os.path.dirname(dest_path)
-        if dest_dir and not os.path.exists(dest_dir):
-            os.makedirs(dest_dir)
+    def _directory_table(self, path: str) -> DirectoryTable:
+        """
+        Tabla de entradas de un directorio.
 
-        # Escribir archivo destino
-        with open(dest_path, 'wb') as f:
-            f.write(data)
+        Args:
+            path: Ruta del directorio ('' = raíz)
 
-        return {
-            'filename': filename,
-            'bytes_copied': len(data),
-            'dest_path': dest_path
-        }
+        Returns:
+            DirectoryTable del directorio
 
-    def _build_cluster_map(self) -> ClusterMap:
+        Raises:
+            FileNotFoundInFilesystemError: Si el directorio no existe
+            EntryTypeError: Si la ruta es un archivo
         """
-        Construye un mapa de clusters ocupados/libres basado en el directorio.
+        from utils.exceptions import FileNotFoundInFilesystemError
 
-        Returns:
-            ClusterMap con todos los archivos activos marcados
-        """
-        cluster_map = ClusterMap(self.superblock.total_clusters)
+        path = path.strip('/')
+        if path:
+            self._find_file_index(path, directory=True)
 
-        # Marcar clusters ocupados por cada archivo activo
-        for entry in self.directory_entries:
-            if entry.is_active():
-                cluster_map.allocate_file(
-                    entry.start_cluster,
-                    entry.num_clusters_needed()
-                )
+        position = self._table_index.get(path)
+        if position is None:
+            # Subdirectorio cuya tabla no es legible (imagen dañada)
+            raise FileNotFoundInFilesystemError(path, [])
 
-        return cluster_map
+        return self._tables[position]
 
-    def _find_empty_directory_slot(self) -> int:
+    def _children(self, path: str):
         """
-        Encuentra la primera entrada de directorio vacía.
+        Recorre las entradas activas de un directorio, en orden de slot.
 
-        Returns:
-            Índice de la entrada vacía (0-63)
-
-        Raises:
-            DirectoryFullError: Si no hay entradas disponibles
-        """
-        from utils.exceptions import DirectoryFullError
+        Usa el índice de hijos: el costo depende de las entradas del
+        directorio y no del tamaño de su tabla.
 
-        for i, entry in enumerate(self.directory_entries):
-            if entry.is_empty():
-                return i
+        Args:
+            path: Ruta del directorio ('' = raíz)
 
-        raise DirectoryFullError()
+        Yields:
+            Tuplas (ruta, índice) de cada entrada activa
+        """
+        children = self._child_index.get(path)
+        if children:
+            yield from sorted(children.items(), key=lambda item: item[1])
 
-    def _write_directory_entry(self, index: int, entry) -> None:
+    def _add_table(self, path: str, entry) -> None:
         """
-        Escribe una entrada de directorio en el filesystem.
+        Registra la tabla (vacía) de un subdirectorio recién creado al
+        final de las entradas en memoria, sin releer el árbol.
 
         Args:
-            index: Índice de la entrada (0-63)
-            entry: DirectoryEntry a escribir
+            path: Ruta del subdirectorio
+            entry: Su DirectoryEntry (ya escrita en el directorio padre)
         """
-        # Calcular offset: 1024 (superblock) + index × 64
-        offset = 1024 + (index * 64)
+        from .directory_entry import DirectoryEntry
 
-        # Posicionarse en el offset
-        self.file_handle.seek(offset)
+        parent = path.rpartition('/')[0]
+        table = self._subdirectory_table(parent, entry, len(self.directory_entries))
+        if table is None:
+            return
 
-        # Escribir los 64 bytes de la entrada
-        self.file_handle.write(entry.to_bytes())
+        self._tables.append(table)
+        self._table_starts.append(table.first_slot)
+        self._table_index[path] = len(self._tables) - 1
+        self._child_index[path] = {}
+        self._free_slots[path] = list(range(table.first_slot, table.first_slot + table.slots))
+        self.directory_entries.extend([DirectoryEntry.create_empty()] * table.slots)
+        self._directory_raw += self._read_directory_region(table)
 
-        # Flush para asegurar escritura
-        self.file_handle.flush()
+    def _stat_image(self) -> tuple:
+        """
+        Obtiene la firma de la imagen en disco con un solo fstat().
 
-        # Actualizar cache local
-        self.directory_entries[index] = entry
+        Returns:
+            Tupla (mtime_ns, tamaño, inodo)
+        """
+        st = os.fstat(self.fd)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
 
-    def _write_file_data(self, start_cluster: int, data: bytes) -> None:
+    def refresh_if_changed(self, force: bool = False) -> List[str]:
         """
-        Escribe datos de archivo en el área de datos.
+        Detecta si otro proceso modificó la imagen y aplica los cambios.
+
+        La comprobación cuesta un fstat(): solo si cambió la firma
+        (mtime/tamaño), o si force es True, se relee la región de
+        directorio y se compara slot por slot con las entradas en memoria. Para cada slot distinto se
+        actualizan el mapa de clusters, el índice de nombres y los
+        contadores, y se invalidan en el cache los clusters de la entrada
+        vieja y de la nueva. Las escrituras propias también cambian el
+        mtime; en ese caso la comparación no encuentra diferencias (al
+        cerrar su ventana exclusiva, un escritor guarda la firma nueva).
 
         Args:
-            start_cluster: Cluster inicial donde escribir
-            data: Bytes a escribir
-        """
-        # Calcular offset: start_cluster × 1024
-        offset = start_cluster * 1024
+            force: Releer el directorio aunque la firma no haya cambiado
+                (cambió el contador de cambios del superblock: la
+                resolución del mtime puede ocultar dos escrituras seguidas)
 
-        # Posicionarse en el offset
-        self.file_handle.seek(offset)
+        Returns:
+            Rutas afectadas (las de las entradas viejas y nuevas de los
+            slots que cambiaron); lista vacía si no hubo cambios. Si cambió
+            un subdirectorio, el árbol se relee completo
+        """
+        with self.lock:
+            signature = self._stat_image()
+            if signature == self._image_signature and not force:
+                return []
+            self._image_signature = signature
+
+            from .directory_entry import DirectoryEntry
+
+            # Comparar los bytes por bloques; solo se parsean las entradas
+            # de los slots que cambiaron
+            raw = bytearray()
+            for table in self._tables:
+                raw += self._read_directory_region(table)
+            old_raw = self._directory_raw
+            updates = {}
+            for block in range(0, len(raw), DIRECTORY_COMPARE_BLOCK):
+                end = block + DIRECTORY_COMPARE_BLOCK
+                if raw[block:end] == old_raw[block:end]:
+                    continue
+                for offset in range(block, min(end, len(raw)), 64):
+                    data = raw[offset:offset + 64]
+                    if data != old_raw[offset:offset + 64]:
+                        updates[offset // 64] = DirectoryEntry.from_bytes(data)
+            self._directory_raw = raw
+
+            changed = []
+            for index, entry in updates.items():
+                old_entry = self.directory_entries[index]
+                for e in (old_entry, entry):
+                    if e.is_active():
+                        changed.append(self._entry_path(index, e))
+                        for start, count in self._entry_ranges(e):
+                            self.cache.invalidate(start, count)
+
+            if any(self._changes_tree(self.directory_entries[index], entry)
+                   for index, entry in updates.items()):
+                # Se creó, movió o eliminó un subdirectorio: las tablas
+                # cambiaron de lugar, releer el árbol completo
+                self._read_directory()
+                self.external_refreshes += 1
+                return changed
+
+            # Igual que _write_directory_entries(): liberar primero todas
+            # las entradas viejas y luego asignar las nuevas
+            empty = DirectoryEntry.create_empty()
+            for index in updates:
+                old_entry = self.directory_entries[index]
+                self._update_space_counters(old_entry, empty)
+                self._update_indexes(index, old_entry, empty)
+
+            for index, entry in updates.items():
+                try:
+                    self._update_space_counters(empty, entry)
+                except ValueError:
+                    # Entrada fuera de rango: no cabe en el mapa, igual
+                    # que en _build_cluster_map()
+                    pass
+                self._update_indexes(index, empty, entry)
+                self.directory_entries[index] = entry
+
+            if updates:
+                self.external_refreshes += 1
+                self.generation += 1
+
+            return changed
+
+    def _read_change_counter(self) -> int:
+        """
+        Lee el contador de cambios del superblock.
 
-        # Escribir los datos
-        self.file_handle.write(data)
+        Returns:
+            Valor del contador (0 en una imagen recién formateada)
+        """
+        from .superblock import CHANGE_COUNTER_FORMAT, CHANGE_COUNTER_OFFSET
 
-        # Flush para asegurar escritura
-        self.file_handle.flush()
+        data = positional_io.pread(self.fd, struct.calcsize(CHANGE_COUNTER_FORMAT),
+                                   CHANGE_COUNTER_OFFSET)
+        return struct.unpack(CHANGE_COUNTER_FORMAT, data)[0]
 
-    def import_file(self, src_path: str, filename: str = None) -> dict:
+    def _refresh_external(self) -> List[str]:
         """
-        Importa un archivo del sistema local al filesystem.
+        Aplica los cambios de otros procesos al tomar un bloqueo.
 
-        Args:
-            src_path: Ruta del archivo local a importar
-            filename: Nombre para el archivo en FiUnamFS (opcional,
-                     usa nombre del archivo fuente si no se especifica)
+        Cuesta un fstat() y una lectura de 8 bytes: el directorio solo se
+        relee si cambió el contador de cambios (otro escritor cerró una
+        ventana exclusiva) o la firma de la imagen (un escritor que no
+        usa el contador).
 
         Returns:
-            Diccionario con resultado:
-                - 'filename': Nombre del archivo
-                - 'bytes_copied': Bytes copiados
-                - 'start_cluster': Cluster inicial asignado
-                - 'num_clusters': Clusters utilizados
+            Rutas afectadas (ver refresh_if_changed)
+        """
+        with self.lock:
+            counter = self._read_change_counter()
+            force = counter != self._change_counter
+            self._change_counter = counter
+            return self.refresh_if_changed(force=force)
 
-        Raises:
-            ValueError: Si el nombre de archivo es inválido
-            FilenameConflictError: Si ya existe un archivo con ese nombre
-            NoSpaceError: Si no hay espacio contiguo suficiente
-            DirectoryFullError: Si el directorio está lleno
+    def _publish_changes(self) -> None:
         """
-        import os
-        from utils.validation import validar_nombre_archivo, calcular_clusters_necesarios
-        from utils.exceptions import FilenameConflictError, NoSpaceError
-        from .directory_entry import DirectoryEntry
+        Incrementa el contador de cambios si este proceso escribió.
 
-        # Determinar nombre de archivo
-        if filename is None:
-            filename = os.path.basename(src_path)
+        Se llama al cerrar la ventana exclusiva, todavía con el bloqueo:
+        también guarda la firma de la imagen, para que las escrituras
+        propias no parezcan externas en la siguiente adquisición.
+        """
+        from .superblock import CHANGE_COUNTER_FORMAT, CHANGE_COUNTER_OFFSET
 
-        # Validar nombre de archivo
-        validar_nombre_archivo(filename)
+        if not self._modified:
+            return
 
-        # Verificar que no exista archivo con ese nombre
-        for entry in self.directory_entries:
-            if entry.is_active() and entry.filename.strip() == filename:
-                raise FilenameConflictError(filename)
+        self._change_counter = (self._change_counter + 1) % (1 << 64)
+        positional_io.pwrite(self.fd, struct.pack(CHANGE_COUNTER_FORMAT, self._change_counter),
+                             CHANGE_COUNTER_OFFSET)
+        self._modified = False
+        self._image_signature = self._stat_image()
 
-        # Leer archivo fuente
-        with open(src_path, 'rb') as f:
-            data = f.read()
+    @contextmanager
+    def read_lock(self):
+        """
+        Context manager para una operación de solo lectura.
 
-        file_size = len(data)
+        Toma el bloqueo compartido de la imagen (otros lectores pueden
+        continuar; los escritores esperan) y aplica los cambios externos
+        pendientes antes de que la operación use el directorio. En modo
+        solo lectura no se toma ningún bloqueo.
+        """
+        if self.read_only:
+            # Sin coordinación con escritores: solo detectar cambios
+            self._refresh_external()
+            yield
+            return
+
+        with self.lock, self.image_lock.hold(exclusive=False) as acquired:
+            if acquired:
+                self._refresh_external()
+            yield
+
+    @contextmanager
+    def write_lock(self):
+        """
+        Context manager para la ventana de commit de un escritor.
+
+        Toma el bloqueo exclusivo de la imagen y aplica los cambios de
+        los demás procesos, de modo que la búsqueda de slots y clusters
+        libres ve sus asignaciones. El directorio solo se relee si otro
+        escritor incrementó el contador de cambios del superblock desde la
+        última vez (pasar de compartido a exclusivo no es atómico); sin
+        otros escritores, la adquisición cuesta un fstat() y una lectura
+        de 8 bytes. Al cerrar la ventana, si se escribió algo, se
+        incrementa el contador. Las adquisiciones anidadas (un método
+        escritor que llama a otro) no vuelven a comprobar.
 
-        # Calcular clusters necesarios
-        clusters_necesarios = calcular_clusters_necesarios(file_size)
+        Raises:
+            ReadOnlyFilesystemError: Si el filesystem es de solo lectura
+        """
+        if self.read_only:
+            from utils.exceptions import ReadOnlyFilesystemError
+            raise ReadOnlyFilesystemError(self.fs_path)
+
+        with self.lock, self.image_lock.hold(exclusive=True) as acquired:
+            if acquired:
+                self._refresh_external()
+            try:
+                yield
+            finally:
+                if acquired:
+                    self._publish_changes()
+
+    @_reader
+    def list_files(self, path: str = '') -> dict:
+        """
+        Lista los archivos y subdirectorios activos de un directorio.
 
-        # Construir mapa de clusters
-        cluster_map = self._build_cluster_map()
+        Args:
+            path: Ruta del directorio (default: '' = raíz)
+
+        Returns:
+            Diccionario con:
+                - 'files': Lista de diccionarios con info de cada archivo
+                - 'total_files': Número total de archivos activos
+                - 'used_space': Bytes ocupados
+                - 'free_space': Bytes disponibles
+
+        Ejemplo de retorno:
+            {
+                'files': [
+                    {
+                        'filename': 'README.txt',
+                        'size': 1024,
+                        'created': '2025-11-07 14:30:00',
+                        'modified': '2025-11-07 14:30:00',
+                        'start_cluster': 5,
+                        'num_clusters': 1,
+                        'extents': 1,
+                        'shared': False,
+                        'compression': None,
+                        'is_directory': False
+                    },
+                    ...
+                ],
+                'total_files': 3,
+                'used_space': 5120,
+                'free_space': 1469440
+            }
+        """
+        from utils.binary_utils import timestamp_legible
+        from .compression import method_name
+
+        files = []
+        used_space = 0
+
+        # Recorrer solo las entradas activas de la tabla, en orden de slot
+        path = self._directory_table(path).path
+        for _, index in self._children(path):
+            entry = self.directory_entries[index]
+            extents = self._file_extents(entry)
+            files.append({
+                'filename': entry.filename.strip(),  # Remover espacios de padding
+                'size': entry.content_size(),
+                'created': timestamp_legible(entry.created_timestamp),
+                'modified': timestamp_legible(entry.modified_timestamp),
+                'start_cluster': extents[0][0] if extents else entry.start_cluster,
+                'num_clusters': self._entry_clusters(entry),
+                'extents': len(extents),
+                'shared': entry.is_shared(),
+                'compression': method_name(entry.compression) if entry.is_compressed() else None,
+                'is_directory': entry.is_directory()
+            })
+            used_space += entry.file_size
+
+        # Calcular espacio libre a partir del mapa de clusters (considera
+        # el redondeo a clusters completos de cada archivo)
+        free_space = self.cluster_map.free_count * self.superblock.cluster_size
+
+        return {
+            'files': files,
+            'total_files': len(files),
+            'used_space': used_space,
+            'free_space': free_space
+        }
+
+    def _find_file(self, filename: str):
+        """
+        Busca un archivo en el directorio por ruta.
+
+        Args:
+            filename: Ruta del archivo a buscar (e.g., 'a.txt' o 'docs/a.txt')
+
+        Returns:
+            DirectoryEntry del archivo encontrado
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            EntryTypeError: Si la ruta es un directorio
+        """
+        return self.directory_entries[self._find_file_index(filename)]
+
+    def _find_file_index(self, filename: str, directory: Optional[bool] = False) -> int:
+        """
+        Busca el índice de la entrada de directorio de un archivo.
+
+        La búsqueda es una sola consulta al índice de rutas, sin importar
+        la profundidad del archivo.
+
+        Args:
+            filename: Ruta del archivo a buscar
+            directory: Tipo esperado: False = archivo (default), True =
+                subdirectorio, None = cualquiera
+
+        Returns:
+            Índice global de la entrada (0-63 en la raíz en 26-1/26-2)
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            EntryTypeError: Si la entrada no es del tipo esperado
+        """
+        from utils.exceptions import EntryTypeError, FileNotFoundInFilesystemError
+
+        # El índice guarda las rutas sin '/' inicial ni espacios de padding
+        path = filename.strip('/')
+        index = self.name_index.get(path)
+        if index is not None:
+            is_directory = self.directory_entries[index].is_directory()
+            if directory is None or is_directory == directory:
+                return index
+            raise EntryTypeError(path, is_directory)
+
+        # Archivo no encontrado - la lista de archivos disponibles en el
+        # directorio donde se buscó solo se construye si se usa el mensaje
+        # (FUSE atrapa el error y responde ENOENT sin leerla)
+        parent = path.rpartition('/')[0]
+        raise FileNotFoundInFilesystemError(filename, lambda: [
+            child.rpartition('/')[2] for child, _ in self._children(parent)
+        ])
+
+    def _io_lock(self):
+        """
+        Lock que deben tomar las lecturas que llenan el cache.
+
+        La E/S posicional no necesita lock; éste solo evita que una lectura
+        guarde en el cache datos que una escritura concurrente acaba de
+        invalidar. En modo solo lectura no hay escrituras propias con las
+        que coordinarse.
+
+        Returns:
+            self.lock, o un contexto nulo en modo solo lectura
+        """
+        return nullcontext() if self.read_only else self.lock
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        """
+        Lee bytes de la imagen en una posición absoluta (pread).
+
+        Args:
+            offset: Posición en bytes dentro de la imagen
+            size: Bytes a leer
+
+        Returns:
+            Bytes leídos
+        """
+        return positional_io.pread(self.fd, size, offset)
+
+    def _read_into(self, offset: int, num_buffers: int, buffer_size: int) -> List[bytearray]:
+        """
+        Lee un tramo contiguo de la imagen directamente en buffers separados
+        (preadv), sin leer a un buffer grande y luego rebanarlo.
+
+        Args:
+            offset: Posición en bytes dentro de la imagen
+            num_buffers: Cantidad de buffers
+            buffer_size: Tamaño de cada buffer (un cluster)
+
+        Returns:
+            Lista de buffers leídos
+        """
+        buffers = [bytearray(buffer_size) for _ in range(num_buffers)]
+        positional_io.preadv(self.fd, buffers, offset)
+        return buffers
+
+    def _read_clusters(self, start_cluster: int, num_clusters: int) -> bytes:
+        """
+        Lee un rango de clusters pasando por el cache LRU.
+
+        Los clusters que no están en cache se agrupan en tramos contiguos
+        y cada tramo se lee de la imagen con una sola lectura.
+
+        Args:
+            start_cluster: Cluster inicial
+            num_clusters: Cantidad de clusters a leer
+
+        Returns:
+            Bytes de los clusters solicitados
+        """
+        cluster_size = self.superblock.cluster_size
+        blocks = [self.cache.get(c) for c in range(start_cluster, start_cluster + num_clusters)]
+
+        i = 0
+        while i < num_clusters:
+            if blocks[i] is not None:
+                i += 1
+                continue
+
+            # Tramo de clusters faltantes [i, j)
+            j = i
+            while j < num_clusters and blocks[j] is None:
+                j += 1
+
+            # Leer y guardar en cache bajo el lock: una escritura concurrente
+            # no puede intercalarse y dejar datos viejos en el cache
+            with self._io_lock():
+                buffers = self._read_into((start_cluster + i) * cluster_size, j - i, cluster_size)
+
+                for k, block in enumerate(buffers, start=i):
+                    blocks[k] = block
+                    self.cache.put(start_cluster + k, block)
+
+            i = j
+
+        return b''.join(blocks)
+
+    def prefetch(self, start_cluster: int, num_clusters: int, generation: Optional[int] = None) -> int:
+        """
+        Carga en el cache un rango de clusters que aún no esté en él.
+
+        Usado por el read-ahead del montaje FUSE. Si se indica generation y
+        el directorio cambió desde entonces, la petición se descarta (el
+        archivo pudo reubicarse o eliminarse).
+
+        Args:
+            start_cluster: Cluster inicial
+            num_clusters: Cantidad de clusters
+            generation: Generación del directorio al pedir el prefetch
+
+        Returns:
+            Número de clusters leídos de la imagen
+        """
+        with self._io_lock():
+            if generation is not None and generation != self.generation:
+                return 0
+
+            cluster_size = self.superblock.cluster_size
+            end = min(start_cluster + num_clusters, self.superblock.total_clusters)
+            missing = [c for c in range(start_cluster, end) if not self.cache.contains(c)]
+            if not missing:
+                return 0
+
+            # Leer desde el primer cluster faltante hasta el último con una
+            # sola lectura (sin pasar por get(): no cuenta como hit/miss)
+            first = missing[0]
+            buffers = self._read_into(first * cluster_size, missing[-1] - first + 1, cluster_size)
+
+            for c in missing:
+                self.cache.put(c, buffers[c - first])
+
+            return len(missing)
+
+    def _read_file_data(self, entry, offset: int = 0, size: Optional[int] = None) -> bytes:
+        """
+        Lee los datos de un archivo desde el filesystem.
+
+        Un archivo contiguo se lee con una sola llamada a _read_clusters();
+        uno fragmentado, con una por cada extent que cubre el rango. Uno
+        comprimido se descomprime completo y se conserva en _inflated
+        para las lecturas siguientes.
+
+        Args:
+            entry: DirectoryEntry del archivo a leer
+            offset: Posición dentro del contenido desde donde leer (default: 0)
+            size: Bytes a leer (default: hasta el final del archivo)
+
+        Returns:
+            Bytes del contenido del archivo
+
+        Raises:
+            CompressionError: Si el contenido comprimido está dañado
+        """
+        if entry.is_compressed():
+            key = (entry.start_cluster, entry.file_size, entry.checksum,
+                   entry.modified_timestamp)
+            inflated = self._inflated
+            if inflated is None or inflated[0] != key:
+                inflated = (key, b''.join(self._iter_content(entry)))
+                self._inflated = inflated
+            end = None if size is None else offset + size
+            return inflated[1][offset:end]
+
+        cluster_size = self.superblock.cluster_size
+
+        # Limitar la lectura al tamaño del archivo
+        end = entry.file_size if size is None else min(entry.file_size, offset + size)
+        if offset >= end:
+            return b''
+
+        if entry.is_fragmented():
+            parts = []
+            for cluster, skip, nbytes in self._map_range(entry, offset, end - offset):
+                data = self._read_clusters(cluster, (skip + nbytes - 1) // cluster_size + 1)
+                parts.append(data[skip:skip + nbytes])
+            return b''.join(parts)
+
+        # Leer solo los clusters que cubren [offset, end)
+        first = offset // cluster_size
+        last = (end - 1) // cluster_size
+        data = self._read_clusters(entry.start_cluster + first, last - first + 1)
+
+        skip = offset - first * cluster_size
+        return data[skip:skip + (end - offset)]
+
+    def _map_range(self, entry, offset: int, length: int):
+        """
+        Traduce un rango de bytes del archivo a tramos dentro de sus extents.
+
+        Args:
+            entry: DirectoryEntry del archivo
+            offset: Posición dentro del archivo
+            length: Bytes del rango
+
+        Yields:
+            Tuplas (cluster, desplazamiento_en_cluster, bytes): cada tramo
+            empieza en ese byte del cluster y es contiguo en la imagen
+        """
+        cluster_size = self.superblock.cluster_size
+        end = offset + length
+        pos = 0
+
+        for start, count in self._file_extents(entry):
+            extent_end = pos + count * cluster_size
+            if extent_end > offset:
+                lo = max(offset, pos)
+                hi = min(end, extent_end)
+                if lo >= hi:
+                    break
+                rel = lo - pos
+                yield start + rel // cluster_size, rel % cluster_size, hi - lo
+            pos = extent_end
+            if pos >= end:
+                break
+
+    @_reader
+    def export_file(self, filename: str, dest_path: str, verify: bool = False) -> dict:
+        """
+        Exporta un archivo del filesystem al sistema local.
+
+        Los bloques del archivo que solo contienen ceros no se escriben:
+        quedan como huecos en el destino (ver utils/sparse.py).
+
+        Args:
+            filename: Nombre del archivo en FiUnamFS
+            dest_path: Ruta destino en el sistema local
+            verify: Comparar el CRC32 de lo exportado con el de la entrada
+                (si la entrada no guarda CRC32 no se verifica nada)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'bytes_copied': Bytes copiados
+                - 'dest_path': Ruta destino
+                - 'verified': True si el CRC32 se verificó
+                - 'sparse_bytes': Bytes en ceros que quedaron como huecos
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            ChecksumError: Si verify es True y el CRC32 no coincide (el
+                archivo destino se elimina)
+            CompressionError: Si el archivo está comprimido y sus datos
+                están dañados (el archivo destino se elimina)
+            IOError: Si hay error al escribir el archivo destino
+        """
+        import os
+        import zlib
+        from utils.exceptions import ChecksumError, CompressionError
+        from utils.sparse import SparseWriter
+
+        # Buscar el archivo
+        entry = self._find_file(filename)
+
+        # Crear directorio padre si no existe
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir and not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+
+        # Escribir archivo destino en bloques (archivos grandes no se
+        # cargan completos en memoria)
+        verify = verify and entry.has_checksum()
+        bytes_copied = 0
+        checksum = 0
+        try:
+            with open(dest_path, 'wb') as f:
+                writer = SparseWriter(f)
+                if entry.is_compressed():
+                    # Se descomprime al vuelo; el CRC32 guardado es el de
+                    # los datos comprimidos y se verifica sobre ellos
+                    for data in self._iter_content(entry):
+                        writer.write(data)
+                        bytes_copied += len(data)
+                    if verify:
+                        checksum = self._entry_checksum(entry)
+                else:
+                    while bytes_copied < entry.file_size:
+                        data = self._read_file_data(entry, bytes_copied, COPY_BLOCK_SIZE)
+                        writer.write(data)
+                        if verify:
+                            checksum = zlib.crc32(data, checksum)
+                        bytes_copied += len(data)
+                writer.finish()
+        except CompressionError:
+            os.remove(dest_path)
+            raise
+
+        if verify and checksum != entry.checksum:
+            os.remove(dest_path)
+            raise ChecksumError(filename, entry.checksum, checksum)
+
+        return {
+            'filename': filename,
+            'bytes_copied': bytes_copied,
+            'dest_path': dest_path,
+            'verified': verify,
+            'sparse_bytes': writer.skipped
+        }
+
+    @_reader
+    def clone(self, dest_path: str, overwrite: bool = False) -> dict:
+        """
+        Copia la imagen completa a otro archivo, conservándola dispersa.
+
+        Solo se leen los rangos con datos de la imagen (SEEK_DATA/
+        SEEK_HOLE) y, dentro de ellos, los bloques en ceros tampoco se
+        escriben: una imagen recién formateada o casi vacía se copia
+        leyendo y escribiendo solo su superblock, su directorio y sus
+        archivos. Se copia bajo el bloqueo de lectura, así que ningún
+        escritor la modifica a medias.
+
+        Args:
+            dest_path: Ruta de la copia
+            overwrite: Reemplazar el destino si ya existe (default: False)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filesystem': Ruta de la imagen original
+                - 'clone_path': Ruta de la copia
+                - 'image_size': Tamaño de la imagen en bytes
+                - 'bytes_read': Bytes leídos de la imagen
+                - 'bytes_written': Bytes escritos en la copia
+                - 'elapsed': Segundos de la copia
+
+        Raises:
+            FileExistsError: Si el destino existe y overwrite es False
+            ValueError: Si el destino es la misma imagen
+        """
+        import time
+        from utils.sparse import SparseWriter, data_ranges
+
+        if os.path.exists(dest_path) and os.path.samefile(dest_path, self.fs_path):
+            raise ValueError(f"El destino '{dest_path}' es la misma imagen")
+
+        started = time.perf_counter()
+        image_size = os.fstat(self.fd).st_size
+        bytes_read = 0
+
+        with open(dest_path, 'wb' if overwrite else 'xb') as f:
+            writer = SparseWriter(f)
+            for start, end in data_ranges(self.fd, image_size):
+                writer.skip_to(start)
+                for offset in range(start, end, COPY_BLOCK_SIZE):
+                    data = positional_io.pread(self.fd, min(COPY_BLOCK_SIZE, end - offset), offset)
+                    writer.write(data)
+                    bytes_read += len(data)
+            writer.skip_to(image_size)
+            writer.finish()
+
+        return {
+            'filesystem': self.fs_path,
+            'clone_path': dest_path,
+            'image_size': image_size,
+            'bytes_read': bytes_read,
+            'bytes_written': image_size - writer.skipped,
+            'elapsed': time.perf_counter() - started
+        }
+
+    def fsck(self, repair: bool = False) -> dict:
+        """
+        Verifica la consistencia del directorio y del uso de clusters.
+
+        Detecta rangos fuera del área de datos, tamaños que exceden el
+        espacio del archivo, bloques de extents o tablas de directorio
+        inválidos, clusters compartidos por varias entradas y rutas
+        duplicadas (ver models/fsck.py). No lee el área de datos.
+
+        Args:
+            repair: Corregir los casos seguros (recortar tamaños, descartar
+                reservas que se traslapan); requiere la imagen en
+                escritura
+
+        Returns:
+            Diccionario con resultado:
+                - 'entries_checked': Entradas activas revisadas
+                - 'issues': Lista de {'kind', 'path', 'detail', 'repaired'}
+                - 'errors': Errores que siguen sin corregir
+                - 'repaired': Errores corregidos
+
+        Raises:
+            ReadOnlyFilesystemError: Si repair es True y la imagen se
+                abrió en solo lectura
+        """
+        from . import fsck
+
+        with (self.write_lock() if repair else self.read_lock()):
+            issues = fsck.check(self, repair)
+            entries_checked = self.active_entries
+
+        repaired = sum(1 for issue in issues if issue.repaired)
+
+        return {
+            'entries_checked': entries_checked,
+            'issues': [issue._asdict() for issue in issues],
+            'errors': len(issues) - repaired,
+            'repaired': repaired
+        }
+
+    def _entry_checksum(self, entry) -> int:
+        """
+        Calcula el CRC32 del contenido de un archivo leyendo la imagen.
+
+        Lee con pread directamente del descriptor, sin pasar por el cache:
+        se verifica lo que hay en disco y el cache no se llena con datos
+        que no se volverán a leer. Se puede llamar desde varios hilos.
+
+        Args:
+            entry: DirectoryEntry del archivo
+
+        Returns:
+            CRC32 de los file_size bytes del archivo
+        """
+        import zlib
+
+        checksum = 0
+        for data in self._iter_raw_data(entry):
+            checksum = zlib.crc32(data, checksum)
+
+        return checksum
+
+    def _iter_raw_data(self, entry):
+        """
+        Recorre el contenido de un archivo leyendo directo de la imagen.
+
+        Args:
+            entry: DirectoryEntry del archivo
+
+        Yields:
+            Bloques de bytes del archivo, en orden (a lo más
+            COPY_BLOCK_SIZE cada uno)
+        """
+        cluster_size = self.superblock.cluster_size
+        for offset in range(0, entry.file_size, COPY_BLOCK_SIZE):
+            length = min(COPY_BLOCK_SIZE, entry.file_size - offset)
+            for cluster, skip, nbytes in self._map_range(entry, offset, length):
+                yield positional_io.pread(self.fd, nbytes, cluster * cluster_size + skip)
+
+    def _iter_content(self, entry):
+        """
+        Recorre el contenido descomprimido de un archivo comprimido.
+
+        Args:
+            entry: DirectoryEntry con FLAG_COMPRESSED
+
+        Yields:
+            Bloques del contenido sin comprimir, en orden
+
+        Raises:
+            CompressionError: Si los datos no se pueden descomprimir o su
+                tamaño no coincide con el de la entrada
+        """
+        from utils.exceptions import CompressionError
+        from .compression import decompressor, DECOMPRESSION_ERRORS
+
+        try:
+            engine = decompressor(entry.compression)
+        except ValueError as e:
+            raise CompressionError(entry.filename, str(e)) from e
+
+        produced = 0
+        try:
+            for raw in self._iter_raw_data(entry):
+                data = engine.decompress(raw)
+                produced += len(data)
+                if produced > entry.aux:
+                    raise CompressionError(entry.filename, "excede su tamaño sin comprimir")
+                if data:
+                    yield data
+        except DECOMPRESSION_ERRORS as e:
+            raise CompressionError(entry.filename, str(e)) from e
+
+        if not engine.eof or produced != entry.aux:
+            raise CompressionError(
+                entry.filename,
+                f"{produced} de {entry.aux} bytes descomprimidos"
+            )
+
+    def _dedup(self):
+        """
+        Índice de hashes de contenido de la imagen (se carga al usarse).
+
+        Returns:
+            DedupIndex de la imagen
+        """
+        if self._dedup_index is None:
+            from .dedup_index import DedupIndex
+            self._dedup_index = DedupIndex(self.fs_path)
+
+        return self._dedup_index
+
+    def _content_digest(self, entry) -> str:
+        """
+        Hash BLAKE2b del contenido de un archivo (del índice si lo tiene).
+
+        Args:
+            entry: DirectoryEntry con FLAG_CHECKSUM
+
+        Returns:
+            Hash hexadecimal
+        """
+        from .dedup_index import new_hasher
+
+        index = self._dedup()
+        digest = index.get(entry)
+        if digest is None:
+            hasher = new_hasher()
+            for data in self._iter_raw_data(entry):
+                hasher.update(data)
+            digest = hasher.hexdigest()
+            index.put(entry, digest)
+
+        return digest
+
+    def _find_duplicate(self, file_size: int, checksum: int, digest: str) -> Optional[int]:
+        """
+        Busca un archivo con exactamente el contenido dado.
+
+        Solo se consideran archivos sin comprimir con CRC32 (cualquier
+        modificación lo descarta, así que su contenido es el que se
+        registró) del mismo tamaño y CRC32; entre ellos se compara el hash
+        BLAKE2b.
+
+        Args:
+            file_size: Tamaño del contenido
+            checksum: CRC32 del contenido
+            digest: Hash BLAKE2b hexadecimal del contenido
+
+        Returns:
+            Índice de la entrada duplicada, o None si no hay
+        """
+        for index in self.name_index.values():
+            entry = self.directory_entries[index]
+            if (entry.file_size == file_size and entry.has_checksum()
+                    and entry.checksum == checksum
+                    and not entry.is_directory() and not entry.is_reserved()
+                    and not entry.is_compressed()
+                    and self._content_digest(entry) == digest):
+                return index
+
+        return None
+
+    def _save_dedup_index(self) -> None:
+        """Guarda el índice de hashes (si se cargó) con las entradas vivas."""
+        if self._dedup_index is not None and not self.read_only:
+            self._dedup_index.save(
+                self.directory_entries[index] for index in self.name_index.values()
+                if self.directory_entries[index].has_checksum()
+            )
+
+    @_writer
+    def _link_duplicate(self, filename: str, file_size: int, checksum: int,
+                        digest: str) -> Optional[dict]:
+        """
+        Crea un archivo que comparte los clusters de un duplicado existente.
+
+        Ambas entradas quedan con FLAG_SHARED; la primera escritura a
+        cualquiera de ellas le da una copia propia (ver _unshare()).
+
+        Args:
+            filename: Ruta del archivo nuevo (ya validada)
+            file_size: Tamaño del contenido
+            checksum: CRC32 del contenido
+            digest: Hash BLAKE2b hexadecimal del contenido
+
+        Returns:
+            Resultado para import_file(), o None si no hay duplicado
+
+        Raises:
+            FilenameConflictError: Si ya existe un archivo con ese nombre
+            DirectoryFullError: Si el directorio está lleno
+        """
+        from .directory_entry import DirectoryEntry, FLAG_SHARED
+
+        self._check_name_available(filename)
+        parent, name = self._split_path(filename)
+
+        # El slot primero: agrandar un subdirectorio relee el directorio
+        slot_index = self._find_empty_directory_slot(parent)
+        index = self._find_duplicate(file_size, checksum, digest)
+        if index is None:
+            self._save_dedup_index()
+            return None
+
+        original = self.directory_entries[index]
+        if not original.is_shared():
+            original = original._replace(flags=original.flags | FLAG_SHARED)
+            self._write_directory_entry(index, original)
+
+        entry = DirectoryEntry.create_file(name, original.start_cluster, file_size)._replace(
+            flags=original.flags,
+            checksum=original.checksum
+        )
+        self._write_directory_entry(slot_index, entry)
+
+        self._dedup().put(entry, digest)
+        self._save_dedup_index()
+
+        extents = self._file_extents(entry)
+        return {
+            'filename': filename,
+            'bytes_copied': file_size,
+            'start_cluster': extents[0][0],
+            'num_clusters': self._clusters_for(file_size),
+            'extents': len(extents),
+            'checksum': checksum,
+            'deduplicated': True,
+            'duplicate_of': self._entry_path(index, original),
+            'bytes_saved': file_size
+        }
+
+    def _unshare(self, index: int):
+        """
+        Da a un archivo compartido sus propios clusters antes de modificarlo.
+
+        Si es la última entrada que usa esos clusters solo se quita
+        FLAG_SHARED; si no, el contenido se copia a espacio nuevo. Un
+        archivo comprimido se descomprime a espacio nuevo (ver _inflate()).
+
+        Args:
+            index: Índice de la entrada
+
+        Returns:
+            DirectoryEntry (la misma si no estaba compartida ni comprimida)
+
+        Raises:
+            NoSpaceError: Si no hay espacio para la copia propia
+            CompressionError: Si el archivo comprimido está dañado
+        """
+        from .directory_entry import FLAG_SHARED, FLAG_EXTENTS
+
+        entry = self.directory_entries[index]
+        if entry.is_compressed():
+            return self._inflate(index)
+
+        if not entry.is_shared():
+            return entry
+
+        if self._shared.get(entry.start_cluster, 0) > 1:
+            extents, block_cluster = self._allocate_extents(
+                self._clusters_for(entry.file_size), entry.file_size
+            )
+            own = self._new_data_entry(entry.filename, extents, block_cluster, entry.file_size)
+            self._copy_entry_data(entry, 0, own, 0, entry.file_size)
+            entry = entry._replace(
+                start_cluster=own.start_cluster,
+                flags=(entry.flags & ~(FLAG_SHARED | FLAG_EXTENTS)) | own.flags
+            )
+        else:
+            entry = entry._replace(flags=entry.flags & ~FLAG_SHARED)
+
+        self._write_directory_entry(index, entry)
+        return entry
+
+    def _inflate(self, index: int):
+        """
+        Reemplaza un archivo comprimido por su contenido sin comprimir.
+
+        Los datos se descomprimen a espacio nuevo y la entrada se actualiza
+        al final (el archivo comprimido sigue intacto si la operación se
+        interrumpe); sus clusters se liberan al escribir la entrada.
+
+        Args:
+            index: Índice de la entrada (con FLAG_COMPRESSED)
+
+        Returns:
+            DirectoryEntry sin comprimir (con el CRC32 del contenido)
+
+        Raises:
+            NoSpaceError: Si no hay espacio para el contenido sin comprimir
+            CompressionError: Si los datos comprimidos están dañados
+        """
+        import zlib
+        from .directory_entry import FLAG_COMPRESSED, FLAG_EXTENTS, FLAG_CHECKSUM, FLAG_SHARED
+
+        entry = self.directory_entries[index]
+        size = entry.content_size()
+
+        extents, block_cluster = self._allocate_extents(self._clusters_for(size), size)
+        plain = self._new_data_entry(entry.filename, extents, block_cluster, size)
+
+        written = 0
+        checksum = 0
+        for data in self._iter_content(entry):
+            self._write_entry_data(plain, data, written)
+            checksum = zlib.crc32(data, checksum)
+            written += len(data)
+
+        entry = entry._replace(
+            start_cluster=plain.start_cluster,
+            file_size=size,
+            flags=((entry.flags & ~(FLAG_COMPRESSED | FLAG_EXTENTS | FLAG_SHARED))
+                   | plain.flags | FLAG_CHECKSUM),
+            checksum=checksum,
+            compression=0,
+            aux=0
+        )
+        self._write_directory_entry(index, entry)
+
+        return entry
+
+    @_reader
+    def scrub(self, workers: int = SCRUB_WORKERS) -> dict:
+        """
+        Verifica el CRC32 de todos los archivos que lo guardan.
+
+        Los archivos se reparten entre un pool de hilos; pread y crc32
+        liberan el GIL, así que la lectura y el cálculo se solapan.
+
+        Args:
+            workers: Hilos de verificación (default: SCRUB_WORKERS)
+
+        Returns:
+            Diccionario con resultado:
+                - 'scrubbed': Archivos verificados
+                - 'unchecked': Archivos sin CRC32 guardado (no se verifican)
+                - 'corrupted': Lista de {'filename', 'expected', 'actual'}
+                - 'bytes_verified': Bytes leídos
+                - 'elapsed': Segundos de la verificación
+                - 'throughput': Bytes por segundo
+        """
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        files = []
+        unchecked = 0
+        for path, index in self.name_index.items():
+            entry = self.directory_entries[index]
+            if entry.is_directory():
+                continue
+            if entry.has_checksum():
+                files.append((path, entry))
+            else:
+                unchecked += 1
+
+        # Los archivos grandes primero: el pool termina más parejo
+        files.sort(key=lambda item: item[1].file_size, reverse=True)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            actual = list(pool.map(lambda item: self._entry_checksum(item[1]), files))
+        elapsed = time.perf_counter() - started
+
+        corrupted = [
+            {'filename': path, 'expected': entry.checksum, 'actual': checksum}
+            for (path, entry), checksum in zip(files, actual)
+            if checksum != entry.checksum
+        ]
+        bytes_verified = sum(entry.file_size for _, entry in files)
+
+        return {
+            'scrubbed': len(files),
+            'unchecked': unchecked,
+            'corrupted': sorted(corrupted, key=lambda item: item['filename']),
+            'bytes_verified': bytes_verified,
+            'elapsed': elapsed,
+            'throughput': bytes_verified / elapsed if elapsed > 0 else 0.0
+        }
+
+    def _build_cluster_map(self) -> ClusterMap:
+        """
+        Construye un mapa de clusters ocupados/libres basado en el directorio.
+
+        Solo se usa al leer el directorio; después el mapa se mantiene
+        incrementalmente en _update_space_counters().
+
+        Returns:
+            ClusterMap con todos los archivos activos marcados
+        """
+        cluster_map = ClusterMap(self.superblock.total_clusters, self.superblock.first_data_cluster)
+
+        # Marcar clusters ocupados por cada archivo activo (los compartidos,
+        # solo una vez)
+        for entry in self.directory_entries:
+            if entry.is_active() and self._track_shared(entry, 1):
+                for start, count in self._entry_ranges(entry):
+                    try:
+                        cluster_map.allocate_file(start, count)
+                    except ValueError:
+                        # Rango que excede el filesystem (imagen dañada):
+                        # se marca la parte válida y se sigue con los demás
+                        continue
+
+        return cluster_map
+
+    def _update_space_counters(self, old_entry, new_entry) -> None:
+        """
+        Actualiza el mapa de clusters y los contadores al reemplazar una
+        entrada de directorio.
+
+        Args:
+            old_entry: Entrada que había en el slot
+            new_entry: Entrada que la reemplaza
+        """
+        released = False
+        freed = ()
+        if old_entry.is_active():
+            self.active_entries -= 1
+            if self._track_shared(old_entry, -1):
+                freed = self._entry_ranges(old_entry)
+                for start, count in freed:
+                    self.cluster_map.free_file(start, count)
+                released = old_entry.is_fragmented()
+
+        if new_entry.is_active():
+            self.active_entries += 1
+            if self._track_shared(new_entry, 1):
+                for start, count in self._entry_ranges(new_entry):
+                    self.cluster_map.allocate_file(start, count)
+
+        if self.discard:
+            # Solo lo que la entrada nueva no volvió a ocupar (e.g., al
+            # confirmar una reserva los clusters siguen siendo del archivo)
+            for start, count in freed:
+                for part in self.cluster_map.free_parts(start, count):
+                    self._queue_discard(*part)
+
+        if released and not (new_entry.is_active() and new_entry.is_fragmented()
+                             and new_entry.start_cluster == old_entry.start_cluster):
+            # El bloque de extents puede reutilizarse para otros datos
+            self._extents.pop(old_entry.start_cluster, None)
+
+    def _queue_discard(self, start_cluster: int, num_clusters: int) -> None:
+        """
+        Anota un rango liberado para el siguiente discard_freed().
+
+        Si se acumulan más de DISCARD_PENDING_MAX rangos (muchos archivos
+        pequeños eliminados entre dos pasadas) se fusionan los contiguos.
+
+        Args:
+            start_cluster: Cluster inicial del rango
+            num_clusters: Clusters del rango
+        """
+        self._discard_pending.append((start_cluster, num_clusters))
+        self.discard_pending_clusters += num_clusters
+
+        if len(self._discard_pending) > DISCARD_PENDING_MAX:
+            self._discard_pending = self._coalesce(self._discard_pending)
+
+    @staticmethod
+    def _coalesce(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Ordena rangos de clusters y fusiona los que se traslapan o tocan.
+
+        Args:
+            ranges: Tuplas (cluster_inicial, num_clusters)
+
+        Returns:
+            Lista de rangos disjuntos ordenados por inicio
+        """
+        merged = []
+        for start, count in sorted(ranges):
+            if merged and start <= merged[-1][0] + merged[-1][1]:
+                last_start, last_count = merged[-1]
+                merged[-1] = (last_start, max(last_count, start + count - last_start))
+            else:
+                merged.append((start, count))
+        return merged
+
+    def _track_shared(self, entry, delta: int) -> bool:
+        """
+        Cuenta una referencia más (o menos) a los clusters de una entrada.
+
+        Args:
+            entry: DirectoryEntry activa
+            delta: 1 al agregar la entrada, -1 al quitarla
+
+        Returns:
+            True si los clusters deben marcarse (o liberarse) en el mapa:
+            siempre para una entrada no compartida; para una compartida,
+            solo con la primera referencia (o al quitar la última)
+        """
+        if not entry.is_shared():
+            return True
+
+        count = self._shared.get(entry.start_cluster, 0) + delta
+        if count > 0:
+            self._shared[entry.start_cluster] = count
+        else:
+            self._shared.pop(entry.start_cluster, None)
+
+        return count == (1 if delta > 0 else 0)
+
+    def _update_indexes(self, index: int, old_entry, new_entry) -> None:
+        """
+        Actualiza el índice de rutas y el heap de slots libres al
+        reemplazar una entrada de directorio.
+
+        Args:
+            index: Índice del slot
+            old_entry: Entrada que había en el slot
+            new_entry: Entrada que la reemplaza
+        """
+        if old_entry.is_active():
+            path = self._entry_path(index, old_entry)
+            if self.name_index.get(path) == index:
+                del self.name_index[path]
+            children = self._child_index.get(self._table_of(index).path)
+            if children is not None and children.get(path) == index:
+                del children[path]
+
+        if new_entry.is_active():
+            path = self._entry_path(index, new_entry)
+            self.name_index[path] = index
+            children = self._child_index.get(self._table_of(index).path)
+            if children is not None:
+                children[path] = index
+
+        if new_entry.is_empty() and not old_entry.is_empty():
+            heapq.heappush(self._free_slots[self._table_of(index).path], index)
+
+    def space_stats(self) -> dict:
+        """
+        Retorna estadísticas de espacio a partir de los contadores mantenidos.
+
+        No recorre el directorio: es O(1) (el bloque libre más grande solo
+        se recalcula si el mapa cambió desde la última consulta).
+
+        Returns:
+            Diccionario con:
+                - 'cluster_size': Tamaño de cluster en bytes
+                - 'total_clusters': Total de clusters del filesystem
+                - 'free_clusters': Clusters de datos libres
+                - 'used_clusters': Clusters ocupados (incluye reservados)
+                - 'largest_free_block': Clusters del bloque libre más grande
+                - 'total_entries': Entradas de directorio
+                - 'active_entries': Entradas ocupadas por archivos
+        """
+        total_clusters = self.superblock.total_clusters
+
+        return {
+            'cluster_size': self.superblock.cluster_size,
+            'total_clusters': total_clusters,
+            'free_clusters': self.cluster_map.free_count,
+            'used_clusters': total_clusters - self.cluster_map.free_count,
+            'largest_free_block': self.cluster_map.largest_contiguous_block(),
+            'total_entries': len(self.directory_entries),
+            'active_entries': self.active_entries
+        }
+
+    def memory_footprint(self) -> dict:
+        """
+        Estima la memoria de las estructuras que Filesystem mantiene en memoria.
+
+        Returns:
+            Diccionario {estructura: bytes} con 'directory_entries',
+            'directory_raw', 'name_index', 'child_index', 'cluster_map' y
+            'cache' (datos en el cache de clusters)
+        """
+        from utils.metrics import estimate_size
+
+        return {
+            'directory_entries': estimate_size(self.directory_entries),
+            'directory_raw': len(self._directory_raw),
+            'name_index': estimate_size(self.name_index),
+            'child_index': estimate_size(self._child_index),
+            'cluster_map': estimate_size(self.cluster_map),
+            'cache': self.cache.current_bytes
+        }
+
+    def _clusters_for(self, size: int) -> int:
+        """
+        Clusters necesarios para size bytes con el tamaño de cluster de la imagen.
+
+        Args:
+            size: Tamaño en bytes
+
+        Returns:
+            Número de clusters (al menos 1)
+        """
+        from utils.validation import calcular_clusters_necesarios
+
+        return calcular_clusters_necesarios(size, self.superblock.cluster_size)
+
+    def _entry_clusters(self, entry) -> int:
+        """
+        Clusters que ocupa una entrada con el tamaño de cluster de la imagen.
+
+        Args:
+            entry: DirectoryEntry
+
+        Returns:
+            Número de clusters (incluye los reservados y, en un archivo
+            fragmentado, el de su bloque de extents)
+        """
+        if entry.is_fragmented():
+            return 1 + sum(count for _, count in self._extent_block(entry.start_cluster))
+
+        return entry.num_clusters_needed(self.superblock.cluster_size)
+
+    def _extent_block(self, block_cluster: int) -> Tuple[Tuple[int, int], ...]:
+        """
+        Extents de un archivo fragmentado (el bloque se lee una sola vez).
+
+        Args:
+            block_cluster: Cluster del ExtentBlock
+
+        Returns:
+            Tuplas (cluster_inicial, clusters) en orden del archivo; vacía
+            si el bloque no es válido (imagen dañada)
+        """
+        extents = self._extents.get(block_cluster)
+        if extents is None:
+            from .extent_block import ExtentBlock
+            from utils.exceptions import InvalidFilesystemError
+
+            superblock = self.superblock
+            extents = ()
+            if superblock.first_data_cluster <= block_cluster < superblock.total_clusters:
+                data = self._read_at(block_cluster * superblock.cluster_size, superblock.cluster_size)
+                try:
+                    extents = ExtentBlock.from_bytes(data).extents
+                except InvalidFilesystemError:
+                    pass
+            self._extents[block_cluster] = extents
+
+        return extents
+
+    def _file_extents(self, entry) -> Tuple[Tuple[int, int], ...]:
+        """
+        Extents de datos de una entrada, en orden del archivo.
+
+        Args:
+            entry: DirectoryEntry activa
+
+        Returns:
+            Un solo extent (start_cluster, clusters) si el archivo es
+            contiguo; los de su bloque si está fragmentado
+        """
+        if entry.is_fragmented():
+            return self._extent_block(entry.start_cluster)
+
+        return ((entry.start_cluster, self._entry_clusters(entry)),)
+
+    def _entry_ranges(self, entry) -> Tuple[Tuple[int, int], ...]:
+        """
+        Rangos de clusters que ocupa una entrada en el mapa de clusters.
+
+        Args:
+            entry: DirectoryEntry activa
+
+        Returns:
+            Los extents de datos más, si está fragmentado, el cluster de su
+            bloque de extents
+        """
+        if entry.is_fragmented():
+            return ((entry.start_cluster, 1),) + self._extent_block(entry.start_cluster)
+
+        return self._file_extents(entry)
+
+    def _find_empty_directory_slot(self, parent: str = '') -> int:
+        """
+        Encuentra la primera entrada vacía de un directorio.
+
+        Usa el heap de slots libres del directorio: O(log n) en vez de
+        recorrerlo, y devuelve el mismo slot que un recorrido lineal. Un
+        subdirectorio lleno se agranda (ver _grow_directory); como eso
+        recalcula los índices globales, el llamador debe volver a resolver
+        los índices que haya obtenido antes.
+
+        Args:
+            parent: Ruta del directorio (default: '' = raíz)
+
+        Returns:
+            Índice global de la entrada vacía (0-63 en la raíz en 26-1/26-2)
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el directorio no existe
+            DirectoryFullError: Si la raíz está llena
+            NoSpaceError: Si un subdirectorio lleno no puede crecer
+        """
+        from utils.exceptions import DirectoryFullError
+
+        table = self._directory_table(parent)
+        heap = self._free_slots[table.path]
+        while heap:
+            if self.directory_entries[heap[0]].is_empty():
+                return heap[0]
+            # Slot ocupado desde que se agregó al heap
+            heapq.heappop(heap)
+
+        if not table.path:
+            raise DirectoryFullError(table.slots)
+
+        self._grow_directory(table.path)
+        return self._find_empty_directory_slot(table.path)
+
+    def _grow_directory(self, path: str) -> None:
+        """
+        Duplica las entradas de la tabla de un subdirectorio.
+
+        La tabla crece en sitio si los clusters siguientes están libres o
+        se reubica como cualquier archivo; las entradas nuevas se escriben
+        vacías antes de actualizar la entrada del subdirectorio.
+
+        Args:
+            path: Ruta del subdirectorio
+
+        Raises:
+            NoSpaceError: Si no hay espacio contiguo para la tabla
+        """
+        from utils.binary_utils import timestamp_actual
+
+        index = self.name_index[path]
+        entry = self.directory_entries[index]
+        cluster_size = self.superblock.cluster_size
+
+        # Aprovechar los clusters completos
+        clusters = self._clusters_for(entry.file_size * 2)
+        table_size = clusters * cluster_size // 64 * 64
+        start_cluster = self._ensure_capacity(entry, clusters)
+
+        self._write_file_data(start_cluster, bytes(table_size - entry.file_size), entry.file_size)
+        self._write_directory_entry(index, entry._replace(
+            start_cluster=start_cluster,
+            file_size=table_size,
+            modified_timestamp=timestamp_actual()
+        ))
+
+    def _write_directory_entry(self, index: int, entry) -> None:
+        """
+        Escribe una entrada de directorio en el filesystem.
+
+        Crear un subdirectorio agrega su tabla al final de las entradas en
+        memoria; cualquier otro cambio a un subdirectorio (eliminarlo,
+        renombrarlo, agrandar su tabla) relee el árbol completo.
+
+        Args:
+            index: Índice global de la entrada (0-63 en la raíz en 26-1/26-2)
+            entry: DirectoryEntry a escribir
+        """
+        # Calcular offset: inicio de la tabla del slot + posición × 64
+        offset = self._slot_offset(index)
+
+        data = entry.to_bytes()
+
+        with self.lock:
+            # Escribir los 64 bytes de la entrada
+            positional_io.pwrite(self.fd, data, offset)
+            self._modified = True
+            self._directory_raw[index * 64:(index + 1) * 64] = data
+
+            old_entry = self.directory_entries[index]
+            if self._changes_tree(old_entry, entry) and not old_entry.is_active():
+                # Subdirectorio nuevo: su tabla ya está escrita
+                self._update_space_counters(old_entry, entry)
+                self._update_indexes(index, old_entry, entry)
+                self.directory_entries[index] = entry
+                self._add_table(self._entry_path(index, entry), entry)
+            elif self._changes_tree(old_entry, entry):
+                self._read_directory()
+                return
+            else:
+                # Actualizar cache local, índice de rutas y contadores de espacio
+                self._update_space_counters(old_entry, entry)
+                self._update_indexes(index, old_entry, entry)
+                self.directory_entries[index] = entry
+            self.generation += 1
+
+    def _write_directory_entries(self, entries: dict) -> None:
+        """
+        Escribe varias entradas de directorio con el mínimo de escrituras.
+
+        Los slots cercanos (a menos de DIRECTORY_WRITE_GAP) se agrupan en
+        un rango contiguo que se escribe de una vez (las entradas
+        intermedias se reescriben con su valor actual), de modo que los
+        cambios llegan al disco juntos; los slots lejanos de un directorio
+        grande se escriben por separado en lugar de reescribir todo lo
+        que hay entre ellos.
+
+        Args:
+            entries: Diccionario {índice: DirectoryEntry} a escribir
+        """
+        from .directory_entry import DirectoryEntry
+
+        # Un rango no cruza de una tabla a otra (no son contiguas en disco)
+        runs = []
+        for index in sorted(entries):
+            if (runs and index - runs[-1][1] <= DIRECTORY_WRITE_GAP
+                    and self._table_of(index) == self._table_of(runs[-1][0])):
+                runs[-1][1] = index
+            else:
+                runs.append([index, index])
+
+        with self.lock:
+            self._modified = True
+            if any(self._changes_tree(self.directory_entries[index], entry)
+                   for index, entry in entries.items()):
+                # Cambia un subdirectorio: escribir y releer el árbol
+                for index, entry in entries.items():
+                    positional_io.pwrite(self.fd, entry.to_bytes(), self._slot_offset(index))
+                self._read_directory()
+                return
+
+            # Liberar primero todas las entradas viejas y luego asignar las
+            # nuevas (una entrada nueva puede reutilizar clusters de otra)
+            empty = DirectoryEntry.create_empty()
+            for index in entries:
+                self._update_space_counters(self.directory_entries[index], empty)
+                self._update_indexes(index, self.directory_entries[index], empty)
+            for index, entry in entries.items():
+                self._update_space_counters(empty, entry)
+                self._update_indexes(index, empty, entry)
+                self.directory_entries[index] = entry
+
+            # Una escritura vectorial por rango con los 64 bytes de cada slot
+            for first, last in runs:
+                buffers = [self.directory_entries[i].to_bytes() for i in range(first, last + 1)]
+                positional_io.pwritev(self.fd, buffers, self._slot_offset(first))
+                self._directory_raw[first * 64:(last + 1) * 64] = b''.join(buffers)
+
+            self.generation += 1
+
+    def _write_file_data(self, start_cluster: int, data: bytes, offset: int = 0) -> None:
+        """
+        Escribe datos de archivo en el área de datos.
+
+        Args:
+            start_cluster: Cluster inicial donde escribir
+            data: Bytes a escribir
+            offset: Desplazamiento en bytes dentro del archivo (default: 0)
+        """
+        cluster_size = self.superblock.cluster_size
+
+        # Calcular offset: start_cluster × cluster_size + desplazamiento dentro del archivo
+        offset = start_cluster * cluster_size + offset
+
+        with self.lock:
+            # Escribir los datos
+            positional_io.pwrite(self.fd, data, offset)
+            self._modified = True
+
+            # Invalidar los clusters modificados en el cache de lectura
+            if data:
+                first = offset // cluster_size
+                self.cache.invalidate(first, (offset + len(data) - 1) // cluster_size - first + 1)
+
+    def _write_entry_data(self, entry, data, offset: int = 0) -> None:
+        """
+        Escribe datos de un archivo repartiéndolos entre sus extents.
+
+        Un archivo contiguo se escribe directo con _write_file_data(). Los
+        bytes que caigan fuera de los extents del archivo se ignoran: el
+        llamador asegura la capacidad antes de escribir.
+
+        Args:
+            entry: DirectoryEntry del archivo
+            data: Bytes a escribir
+            offset: Posición dentro del archivo (default: 0)
+        """
+        if not entry.is_fragmented():
+            self._write_file_data(entry.start_cluster, data, offset)
+            return
+
+        view = memoryview(data)
+        pos = 0
+        for cluster, skip, nbytes in self._map_range(entry, offset, len(view)):
+            self._write_file_data(cluster, view[pos:pos + nbytes], skip)
+            pos += nbytes
+
+    def _copy_bytes(self, src_offset: int, dst_offset: int, nbytes: int) -> None:
+        """
+        Copia bytes entre dos posiciones de la imagen con E/S en bloques grandes.
+
+        Los datos no pasan por el cache de lectura (una copia no debe
+        desplazar los clusters calientes) ni por archivos temporales.
+
+        Args:
+            src_offset: Offset absoluto de origen en la imagen
+            dst_offset: Offset absoluto de destino en la imagen
+            nbytes: Bytes a copiar
+        """
+        cluster_size = self.superblock.cluster_size
+
+        # Bloques (posición, tamaño) a copiar. Si el destino se traslapa
+        # con el origen por delante, copiar de atrás hacia adelante
+        blocks = [
+            (pos, min(COPY_BLOCK_SIZE, nbytes - pos))
+            for pos in range(0, nbytes, COPY_BLOCK_SIZE)
+        ]
+        if src_offset < dst_offset < src_offset + nbytes:
+            blocks.reverse()
+
+        for pos, block in blocks:
+            data = positional_io.pread(self.fd, block, src_offset + pos)
+            positional_io.pwrite(self.fd, data, dst_offset + pos)
+
+        with self.lock:
+            self._modified = True
+            # Invalidar los clusters de destino en el cache de lectura
+            if nbytes:
+                first = dst_offset // cluster_size
+                last = (dst_offset + nbytes - 1) // cluster_size
+                self.cache.invalidate(first, last - first + 1)
+
+    def _copy_entry_data(self, src_entry, src_offset: int, dst_entry,
+                         dst_offset: int, nbytes: int) -> None:
+        """
+        Copia bytes de un archivo a otro (o dentro del mismo) en la imagen.
+
+        Entre archivos contiguos es un solo _copy_bytes(); si alguno está
+        fragmentado se copia por bloques de COPY_BLOCK_SIZE, leyendo de los
+        extents del origen (sin pasar por el cache) y escribiendo en los
+        del destino.
+
+        Args:
+            src_entry: DirectoryEntry del origen
+            src_offset: Posición de lectura en el origen
+            dst_entry: DirectoryEntry del destino (con capacidad suficiente)
+            dst_offset: Posición de escritura en el destino
+            nbytes: Bytes a copiar
+        """
+        cluster_size = self.superblock.cluster_size
+
+        if not (src_entry.is_fragmented() or dst_entry.is_fragmented()):
+            self._copy_bytes(
+                src_entry.start_cluster * cluster_size + src_offset,
+                dst_entry.start_cluster * cluster_size + dst_offset,
+                nbytes
+            )
+            return
+
+        blocks = [
+            (pos, min(COPY_BLOCK_SIZE, nbytes - pos))
+            for pos in range(0, nbytes, COPY_BLOCK_SIZE)
+        ]
+        if (src_entry.start_cluster == dst_entry.start_cluster
+                and src_offset < dst_offset < src_offset + nbytes):
+            # Mismo archivo con el destino por delante: de atrás hacia adelante
+            blocks.reverse()
+
+        for pos, block in blocks:
+            data = b''.join(
+                positional_io.pread(self.fd, length, cluster * cluster_size + skip)
+                for cluster, skip, length in self._map_range(src_entry, src_offset + pos, block)
+            )
+            self._write_entry_data(dst_entry, data, dst_offset + pos)
+
+    def _check_name_available(self, filename: str) -> None:
+        """
+        Verifica que no exista un archivo o directorio activo con la ruta dada.
+
+        Args:
+            filename: Ruta a verificar
+
+        Raises:
+            FilenameConflictError: Si ya existe una entrada con esa ruta
+        """
+        from utils.exceptions import FilenameConflictError
+
+        if filename.strip('/') in self.name_index:
+            raise FilenameConflictError(filename)
+
+    def _allocate_new_file(self, filename: str, num_clusters: int, file_size: int):
+        """
+        Busca un slot vacío en el directorio padre y un extent contiguo
+        para un archivo nuevo.
+
+        No modifica nada (salvo agrandar un subdirectorio lleno): el
+        llamador escribe los datos y la entrada.
+
+        Args:
+            filename: Ruta del archivo (ya validada)
+            num_clusters: Clusters contiguos necesarios
+            file_size: Tamaño en bytes (para el mensaje de error)
+
+        Returns:
+            Tupla (índice_slot, cluster_inicial)
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el directorio padre no existe
+            DirectoryFullError: Si el directorio está lleno
+            NoSpaceError: Si no hay espacio contiguo suficiente
+        """
+        from utils.exceptions import NoSpaceError
+
+        slot_index = self._find_empty_directory_slot(filename.strip('/').rpartition('/')[0])
+        start_cluster = self.cluster_map.find_contiguous_space(num_clusters)
+
+        if start_cluster is None:
+            # No hay espacio contiguo suficiente
+            clusters_disponibles = self.cluster_map.largest_contiguous_block()
+            raise NoSpaceError(
+                bytes_necesarios=file_size,
+                bytes_disponibles=clusters_disponibles * self.superblock.cluster_size,
+                clusters_necesarios=num_clusters,
+                clusters_disponibles=clusters_disponibles
+            )
+
+        return slot_index, start_cluster
+
+    def _allocate_extents(self, num_clusters: int, file_size: int):
+        """
+        Busca espacio para los datos de un archivo nuevo.
+
+        Si hay un espacio contiguo se usa (archivo contiguo, formato
+        original); si no, los datos se reparten en varios huecos libres y
+        se reserva un cluster más para el bloque de extents.
+
+        No modifica nada: el llamador escribe el bloque (ver
+        _new_data_entry) y la entrada.
+
+        Args:
+            num_clusters: Clusters de datos necesarios
+            file_size: Tamaño en bytes (para el mensaje de error)
+
+        Returns:
+            Tupla (extents, cluster_del_bloque): lista de (inicio, clusters)
+            y None si el archivo queda contiguo
+
+        Raises:
+            NoSpaceError: Si no hay clusters libres suficientes (o harían
+                falta más extents de los que caben en un bloque)
+        """
+        from utils.exceptions import NoSpaceError
+        from .extent_block import ExtentBlock
+
+        cluster_map = self.cluster_map
+        cluster_size = self.superblock.cluster_size
+
+        start_cluster = cluster_map.find_contiguous_space(num_clusters)
+        if start_cluster is not None:
+            return [(start_cluster, num_clusters)], None
+
+        block_cluster = None
+        extents = cluster_map.find_extents(num_clusters, ExtentBlock.max_extents(cluster_size))
+        if extents is not None:
+            # El bloque va en el primer cluster que quede libre
+            simulated = cluster_map.copy()
+            for start, count in extents:
+                simulated.allocate_file(start, count)
+            block_cluster = simulated.find_contiguous_space(1)
+
+        if block_cluster is None:
+            raise NoSpaceError(
+                bytes_necesarios=file_size,
+                bytes_disponibles=cluster_map.free_count * cluster_size,
+                clusters_necesarios=num_clusters + 1,
+                clusters_disponibles=cluster_map.free_count
+            )
+
+        return extents, block_cluster
+
+    def _new_data_entry(self, name: str, extents: List[tuple], block_cluster: Optional[int],
+                        file_size: int):
+        """
+        Crea la entrada de un archivo con el espacio de _allocate_extents().
+
+        Si el archivo está fragmentado escribe primero su bloque de extents.
+
+        Args:
+            name: Nombre del archivo (sin ruta)
+            extents: Extents de datos
+            block_cluster: Cluster del bloque de extents (None = contiguo)
+            file_size: Tamaño en bytes
+
+        Returns:
+            DirectoryEntry (aún sin escribir en el directorio)
+        """
+        from .directory_entry import DirectoryEntry, FLAG_EXTENTS
+        from .extent_block import ExtentBlock
+
+        if block_cluster is None:
+            return DirectoryEntry.create_file(name, extents[0][0], file_size)
+
+        block = ExtentBlock(tuple(extents))
+        self._write_file_data(block_cluster, block.to_bytes(self.superblock.cluster_size))
+        self._extents[block_cluster] = block.extents
+
+        return DirectoryEntry.create_file(name, block_cluster, file_size)._replace(
+            flags=FLAG_EXTENTS
+        )
+
+    @_writer
+    def _begin_new_file(self, filename: str, num_clusters: int, file_size: int):
+        """
+        Primera fase de la creación de un archivo con datos.
+
+        Dentro de la ventana exclusiva se verifica el nombre, se asignan
+        slot y extents, y se escribe una entrada reservada (FLAG_RESERVED,
+        tamaño 0) como marcador: los demás procesos ya ven esos clusters
+        ocupados mientras los datos se escriben fuera del bloqueo.
+
+        Args:
+            filename: Ruta del archivo (ya validada)
+            num_clusters: Clusters de datos necesarios
+            file_size: Tamaño final en bytes
+
+        Returns:
+            DirectoryEntry del marcador (sus extents reciben los datos)
+
+        Raises:
+            FilenameConflictError: Si ya existe un archivo con ese nombre
+            NoSpaceError: Si no hay espacio suficiente
+            DirectoryFullError: Si el directorio está lleno
+        """
+        from .directory_entry import FLAG_RESERVED
+
+        self._check_name_available(filename)
+        slot_index = self._find_empty_directory_slot(filename.strip('/').rpartition('/')[0])
+        extents, block_cluster = self._allocate_extents(num_clusters, file_size)
+
+        name = filename.strip('/').rpartition('/')[2]
+        placeholder = self._new_data_entry(name, extents, block_cluster, 0)
+        placeholder = placeholder._replace(
+            flags=placeholder.flags | FLAG_RESERVED,
+            aux=num_clusters
+        )
+        self._write_directory_entry(slot_index, placeholder)
+
+        return placeholder
+
+    @_writer
+    def _finish_new_file(self, filename: str, file_size: int, checksum: int,
+                         compression: int = 0, content_size: int = 0):
+        """
+        Segunda fase: reemplaza el marcador por la entrada definitiva.
+
+        Los clusters asignados que no se usaron (archivo fuente que se
+        acortó, o datos comprimidos) se liberan.
+
+        Args:
+            filename: Nombre del archivo
+            file_size: Bytes escritos en la imagen
+            checksum: CRC32 de los bytes escritos
+            compression: Método de compresión (0 = sin comprimir)
+            content_size: Tamaño sin comprimir (solo con compresión)
+
+        Returns:
+            DirectoryEntry definitiva
+
+        Raises:
+            FileNotFoundInFilesystemError: Si otro proceso borró el marcador
+        """
+        from utils.binary_utils import timestamp_actual
+        from .directory_entry import FLAG_RESERVED, FLAG_CHECKSUM, FLAG_COMPRESSED
+
+        index = self._find_file_index(filename)
+        entry = self.directory_entries[index]
+
+        flags = (entry.flags & ~FLAG_RESERVED) | FLAG_CHECKSUM
+        if compression:
+            flags |= FLAG_COMPRESSED
+
+        entry = entry._replace(
+            file_size=file_size,
+            modified_timestamp=timestamp_actual(),
+            flags=flags,
+            checksum=checksum,
+            compression=compression,
+            aux=content_size if compression else 0
+        )
+
+        if entry.is_fragmented():
+            # Recortar los extents sobrantes (un archivo contiguo los
+            # libera solo al dejar de estar reservado)
+            entry = entry._replace(
+                start_cluster=self._resize_extents(entry, self._clusters_for(file_size))
+            )
+
+        self._write_directory_entry(index, entry)
+
+        return entry
+
+    @_writer
+    def create_file(self, filename: str) -> dict:
+        """
+        Crea un archivo vacío directamente (sin importar un archivo temporal).
+
+        Args:
+            filename: Ruta del archivo (el directorio padre debe existir)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'start_cluster': Cluster asignado
+
+        Raises:
+            ValueError: Si el nombre de archivo es inválido
+            FilenameConflictError: Si ya existe un archivo con ese nombre
+            NoSpaceError: Si no hay espacio libre
+            DirectoryFullError: Si el directorio está lleno
+        """
+        from .directory_entry import DirectoryEntry
+
+        _, name = self._split_path(filename)
+        self._check_name_available(filename)
+
+        slot_index, start_cluster = self._allocate_new_file(
+            filename, self._clusters_for(0), 0
+        )
+        self._write_directory_entry(
+            slot_index, DirectoryEntry.create_file(name, start_cluster, 0)
+        )
+
+        return {
+            'filename': filename,
+            'start_cluster': start_cluster
+        }
+
+    def import_file(self, src_path: str, filename: str = None, dedup: bool = False,
+                    compress: Optional[str] = None) -> dict:
+        """
+        Importa un archivo del sistema local al filesystem.
+
+        Con dedup, el archivo local se lee primero una vez para calcular su
+        CRC32 y su hash BLAKE2b; si la imagen ya tiene un archivo idéntico,
+        el nuevo comparte sus clusters y no se escriben datos.
+
+        Con compress, los datos se comprimen mientras se copian. Si una
+        muestra del inicio no se reduce lo suficiente, o el resultado no
+        ahorra clusters, el archivo se guarda sin comprimir.
+
+        Args:
+            src_path: Ruta del archivo local a importar
+            filename: Nombre para el archivo en FiUnamFS, opcionalmente con
+                     ruta de un directorio existente (e.g., 'docs/a.txt'; usa
+                     nombre del archivo fuente si no se especifica)
+            dedup: Buscar un archivo idéntico antes de escribir (default: False)
+            compress: Método de compresión ('zlib' o 'lzma'; default: None)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'bytes_copied': Bytes copiados
+                - 'start_cluster': Cluster inicial asignado
+                - 'num_clusters': Clusters utilizados
+                - 'extents': Extents del archivo (1 = contiguo; más si no
+                  había un espacio contiguo suficiente)
+                - 'checksum': CRC32 de los datos guardados (queda en la entrada)
+                - 'compression': Método con que se guardó, o None
+                - 'deduplicated': True si comparte clusters con un archivo
+                  idéntico ('duplicate_of' es su ruta)
+                - 'bytes_saved': Bytes que no hubo que escribir (por
+                  deduplicación o compresión)
+
+        Raises:
+            ValueError: Si el nombre de archivo o el método de compresión
+                son inválidos
+            FilenameConflictError: Si ya existe un archivo con ese nombre
+            NoSpaceError: Si no hay espacio libre suficiente
+            DirectoryFullError: Si el directorio está lleno
+        """
+        import zlib
+        from utils.validation import validar_tamanio_archivo
+        from .compression import METHODS, COMPRESSION_NONE, method_name
+
+        # Determinar nombre de archivo
+        if filename is None:
+            filename = os.path.basename(src_path)
+
+        # Validar nombre de archivo (y los componentes de su ruta)
+        self._split_path(filename)
+
+        method = COMPRESSION_NONE
+        if compress is not None:
+            if compress not in METHODS:
+                raise ValueError(
+                    f"Método de compresión inválido: '{compress}' "
+                    f"(opciones: {', '.join(METHODS)})"
+                )
+            method = METHODS[compress]
+
+        digest = None
+        if dedup:
+            from .dedup_index import new_hasher
+
+            hasher = new_hasher()
+            expected_checksum = 0
+            expected_size = 0
+            with open(src_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(COPY_BLOCK_SIZE), b''):
+                    hasher.update(chunk)
+                    expected_checksum = zlib.crc32(chunk, expected_checksum)
+                    expected_size += len(chunk)
+            digest = hasher.hexdigest()
+
+            result = self._link_duplicate(filename, expected_size, expected_checksum, digest)
+            if result is not None:
+                return result
+
+        with open(src_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            validar_tamanio_archivo(file_size, self.superblock.data_capacity)
+
+            # Calcular clusters necesarios (sin comprimir: es el máximo que
+            # vale la pena ocupar)
+            clusters_necesarios = self._clusters_for(file_size)
+
+            if method != COMPRESSION_NONE:
+                from .compression import SAMPLE_SIZE, worth_compressing
+
+                if not worth_compressing(method, f.read(SAMPLE_SIZE)):
+                    method = COMPRESSION_NONE
+                f.seek(0)
+
+            result = self._import_data(f, filename, file_size, clusters_necesarios, method)
+            if result is None:
+                # Comprimido no ahorró clusters: guardarlo sin comprimir
+                f.seek(0)
+                result = self._import_data(f, filename, file_size, clusters_necesarios,
+                                           COMPRESSION_NONE)
+
+        entry, content_size = result
+
+        if (digest is not None and not entry.is_compressed()
+                and (entry.file_size, entry.checksum) == (expected_size, expected_checksum)):
+            # Registrar el hash para las siguientes importaciones (solo si
+            # el archivo local no cambió entre las dos lecturas)
+            with self.write_lock():
+                self._dedup().put(self._find_file(filename), digest)
+                self._save_dedup_index()
+
+        extents = self._file_extents(entry)
+        return {
+            'filename': filename,
+            'bytes_copied': content_size,
+            'start_cluster': extents[0][0],
+            'num_clusters': self._clusters_for(entry.file_size),
+            'extents': len(extents),
+            'checksum': entry.checksum,
+            'compression': method_name(entry.compression) if entry.is_compressed() else None,
+            'deduplicated': False,
+            'bytes_saved': content_size - entry.file_size
+        }
+
+    def _import_data(self, f: BinaryIO, filename: str, file_size: int, num_clusters: int,
+                     method: int):
+        """
+        Copia el contenido de un archivo local a un archivo nuevo.
+
+        Asigna el espacio con _begin_new_file() y copia en bloques fuera
+        de cualquier bloqueo (el archivo no se carga completo en memoria),
+        comprimiendo cada bloque si se pidió. El CRC32 se acumula sobre
+        los bytes que se escriben en la imagen.
+
+        Args:
+            f: Archivo local abierto en modo binario (al inicio)
+            filename: Ruta del archivo nuevo (ya validada)
+            file_size: Tamaño del archivo local
+            num_clusters: Clusters a asignar
+            method: Método de compresión (COMPRESSION_NONE = sin comprimir)
+
+        Returns:
+            Tupla (entrada definitiva, bytes leídos del archivo local), o
+            None si los datos comprimidos no caben en menos clusters que
+            los originales (el archivo nuevo se descarta)
+
+        Raises:
+            FilenameConflictError: Si ya existe un archivo con ese nombre
+            NoSpaceError: Si no hay espacio libre suficiente
+            DirectoryFullError: Si el directorio está lleno
+        """
+        import zlib
+        from .compression import compressor
+
+        # Asignar slot y extents (entrada reservada como marcador)
+        placeholder = self._begin_new_file(filename, num_clusters, file_size)
+        capacity = sum(count for _, count in self._file_extents(placeholder))
+        capacity *= self.superblock.cluster_size
+        engine = compressor(method) if method else None
+
+        try:
+            read = 0
+            written = 0
+            checksum = 0
+            while True:
+                chunk = f.read(min(COPY_BLOCK_SIZE, file_size - read))
+                read += len(chunk)
+                last = not chunk or read >= file_size
+                if engine is not None:
+                    chunk = engine.compress(chunk) + (engine.flush() if last else b'')
+
+                if written + len(chunk) > capacity:
+                    self.abort_reservation(filename)
+                    return None
+
+                if chunk:
+                    self._write_entry_data(placeholder, chunk, written)
+                    checksum = zlib.crc32(chunk, checksum)
+                    written += len(chunk)
+                if last:
+                    break
+        except BaseException:
+            self.abort_reservation(filename)
+            raise
+
+        if engine is not None and self._clusters_for(written) >= num_clusters:
+            self.abort_reservation(filename)
+            return None
+
+        # Si el archivo fuente se acortó mientras se leía, registrar lo escrito
+        entry = self._finish_new_file(filename, written, checksum, method, read)
+        return entry, read
+
+    def _resize_entry(self, index: int, new_size: int, zero_fill_until: Optional[int] = None):
+        """
+        Cambia el tamaño de un archivo, en sitio siempre que sea posible.
+
+        Estrategia (de menor a mayor costo):
+        1. Si los clusters que ya ocupa el archivo alcanzan, solo se
+           actualizan file_size y modified_timestamp.
+        2. Si los clusters inmediatamente posteriores al extent están libres,
+           el archivo crece hacia ellos sin mover datos.
+        3. Si no, el archivo se reubica en otro espacio contiguo.
+
+        Un archivo fragmentado no se reubica: se agregan o recortan extents
+        (ver _resize_extents()).
+
+        Los bytes entre el tamaño anterior y el nuevo se rellenan con ceros,
+        igual que truncate() en POSIX.
+
+        Args:
+            index: Índice de la entrada de directorio del archivo
+            new_size: Nuevo tamaño en bytes
+            zero_fill_until: Limita el relleno con ceros hasta este offset
+                (útil cuando el llamador va a sobrescribir el resto)
+
+        Returns:
+            DirectoryEntry actualizada
+
+        Raises:
+            ValueError: Si el tamaño es inválido
+            NoSpaceError: Si no hay espacio contiguo para crecer
+        """
+        from utils.validation import validar_tamanio_archivo
+        from utils.binary_utils import timestamp_actual
+        from .directory_entry import FLAG_CHECKSUM
+
+        validar_tamanio_archivo(new_size, self.superblock.data_capacity)
+
+        entry = self._unshare(index)
+        old_size = entry.file_size
+        start_cluster = self._ensure_capacity(entry, self._clusters_for(new_size))
+
+        # El contenido cambia: el CRC32 guardado deja de ser válido
+        new_entry = entry._replace(
+            start_cluster=start_cluster,
+            file_size=new_size,
+            modified_timestamp=timestamp_actual(),
+            flags=entry.flags & ~FLAG_CHECKSUM,
+            checksum=0
+        )
+
+        fill_end = new_size if zero_fill_until is None else min(new_size, zero_fill_until)
+        if fill_end > old_size:
+            # Rellenar con ceros el hueco (puede contener datos viejos)
+            self._write_entry_data(new_entry, b'\x00' * (fill_end - old_size), old_size)
+
+        self._write_directory_entry(index, new_entry)
+
+        return new_entry
+
+    def _ensure_capacity(self, entry, new_clusters: int) -> int:
+        """
+        Garantiza que un archivo disponga de new_clusters clusters contiguos.
+
+        Si el extent actual no alcanza, crece hacia los clusters libres que
+        le siguen; si están ocupados, los datos se copian a otro espacio
+        contiguo. No escribe la entrada de directorio: el llamador la
+        actualiza con el cluster inicial retornado.
+
+        Los archivos fragmentados se delegan a _resize_extents().
+
+        Args:
+            entry: DirectoryEntry del archivo
+            new_clusters: Clusters que debe poder ocupar el archivo
+
+        Returns:
+            Cluster inicial del archivo (distinto al actual si se reubicó)
+
+        Raises:
+            NoSpaceError: Si no hay espacio contiguo suficiente
+        """
+        from utils.exceptions import NoSpaceError
+
+        if entry.is_fragmented():
+            return self._resize_extents(entry, new_clusters)
+
+        old_clusters = self._entry_clusters(entry)
+        start_cluster = entry.start_cluster
+
+        if new_clusters <= old_clusters:
+            return start_cluster
+
+        cluster_map = self.cluster_map
+        cluster_size = self.superblock.cluster_size
+        extra = new_clusters - old_clusters
+        siguiente = start_cluster + old_clusters
+
+        # ¿Están libres los clusters justo después del extent?
+        if cluster_map.is_free(siguiente, extra):
+            return start_cluster
+
+        # Reubicar: primero buscar un espacio que no se traslape con el
+        # extent actual (los datos originales siguen intactos si la
+        # escritura se interrumpe); si no hay, permitir traslape
+        new_start = cluster_map.find_contiguous_space(new_clusters)
+        if new_start is None:
+            # Simular la liberación del extent actual en una copia
+            cluster_map = cluster_map.copy()
+            cluster_map.free_file(start_cluster, old_clusters)
+            new_start = cluster_map.find_contiguous_space(new_clusters)
+
+        if new_start is None:
+            clusters_disponibles = cluster_map.largest_contiguous_block()
+            raise NoSpaceError(
+                bytes_necesarios=new_clusters * cluster_size,
+                bytes_disponibles=clusters_disponibles * cluster_size,
+                clusters_necesarios=new_clusters,
+                clusters_disponibles=clusters_disponibles
+            )
+
+        self._copy_bytes(start_cluster * cluster_size, new_start * cluster_size, entry.file_size)
+        self.cache.invalidate(start_cluster, old_clusters)
+
+        return new_start
+
+    def _resize_extents(self, entry, new_clusters: int) -> int:
+        """
+        Ajusta los extents de un archivo fragmentado a new_clusters clusters.
+
+        Al crecer, el último extent se extiende si los clusters que le
+        siguen están libres; si no, se agregan extents en los huecos
+        libres. Al encogerse (sin reserva pendiente) se recortan los
+        extents sobrantes. Los datos no se mueven: la lista nueva se
+        escribe en otro cluster y el bloque anterior se libera cuando el
+        llamador actualiza la entrada (el original sigue intacto si la
+        operación se interrumpe).
+
+        Args:
+            entry: DirectoryEntry fragmentada
+            new_clusters: Clusters de datos que debe tener el archivo
+
+        Returns:
+            Cluster del bloque de extents (distinto al actual si cambió)
+
+        Raises:
+            NoSpaceError: Si no hay clusters libres suficientes
+        """
+        from utils.exceptions import NoSpaceError
+        from .extent_block import ExtentBlock
+
+        extents = list(self._file_extents(entry))
+        current = sum(count for _, count in extents)
+        cluster_map = self.cluster_map
+        cluster_size = self.superblock.cluster_size
+
+        if new_clusters == current or (new_clusters < current and entry.is_reserved()):
+            return entry.start_cluster
+
+        added = []
+        if new_clusters < current:
+            kept = []
+            remaining = new_clusters
+            for start, count in extents:
+                if remaining <= 0:
+                    break
+                kept.append((start, min(count, remaining)))
+                remaining -= count
+            extents = kept
+        else:
+            extra = new_clusters - current
+            last_start, last_count = extents[-1]
+            if cluster_map.is_free(last_start + last_count, extra):
+                extents[-1] = (last_start, last_count + extra)
+                added = [(last_start + last_count, extra)]
+            else:
+                added = cluster_map.find_extents(
+                    extra, ExtentBlock.max_extents(cluster_size) - len(extents)
+                )
+                if added is None:
+                    raise NoSpaceError(
+                        bytes_necesarios=new_clusters * cluster_size,
+                        bytes_disponibles=cluster_map.free_count * cluster_size,
+                        clusters_necesarios=extra + 1,
+                        clusters_disponibles=cluster_map.free_count
+                    )
+                extents.extend(added)
+
+        # El bloque nuevo va en un cluster libre que no usen los extents agregados
+        simulated = cluster_map.copy()
+        for start, count in added:
+            simulated.allocate_file(start, count)
+        block_cluster = simulated.find_contiguous_space(1)
+        if block_cluster is None:
+            raise NoSpaceError(
+                bytes_necesarios=cluster_size,
+                bytes_disponibles=0,
+                clusters_necesarios=1,
+                clusters_disponibles=0
+            )
+
+        block = ExtentBlock(tuple(extents))
+        self._write_file_data(block_cluster, block.to_bytes(cluster_size))
+        self._extents[block_cluster] = block.extents
+
+        return block_cluster
+
+    @_writer
+    def truncate_file(self, filename: str, length: int) -> dict:
+        """
+        Trunca o extiende un archivo a una longitud arbitraria.
 
-        # Buscar espacio contiguo
-        start_cluster = cluster_map.find_contiguous_space(clusters_necesarios)
+        Solo se actualizan file_size y modified_timestamp cuando el nuevo
+        tamaño cabe en el extent actual o en los clusters libres que le
+        siguen; el archivo se reubica únicamente si no puede crecer en sitio.
 
-        if start_cluster is None:
-            # No hay espacio contiguo suficiente
-            clusters_disponibles = cluster_map.largest_contiguous_block()
-            raise NoSpaceError(
-                bytes_necesarios=file_size,
-                bytes_disponibles=clusters_disponibles * 1024,
-                clusters_necesarios=clusters_necesarios,
-                clusters_disponibles=clusters_disponibles
+        Args:
+            filename: Nombre del archivo
+            length: Nueva longitud en bytes
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'size': Nuevo tamaño en bytes
+                - 'start_cluster': Cluster inicial (puede cambiar si se reubicó)
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            ValueError: Si la longitud es inválida
+            NoSpaceError: Si no hay espacio contiguo para crecer
+        """
+        index = self._find_file_index(filename)
+        entry = self._resize_entry(index, length)
+
+        return {
+            'filename': filename,
+            'size': entry.file_size,
+            'start_cluster': entry.start_cluster
+        }
+
+    @_writer
+    def write_file_data(self, filename: str, data: bytes, offset: int = 0) -> int:
+        """
+        Sobrescribe datos de un archivo existente a partir de un offset.
+
+        Si los datos caben en el tamaño actual se escriben directamente sobre
+        los clusters del archivo; si lo exceden, el archivo se extiende
+        primero con las mismas reglas que truncate_file().
+
+        Args:
+            filename: Nombre del archivo
+            data: Bytes a escribir
+            offset: Posición dentro del archivo donde escribir
+
+        Returns:
+            Número de bytes escritos
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            ValueError: Si el offset es inválido
+            NoSpaceError: Si no hay espacio contiguo para crecer
+        """
+        from utils.binary_utils import timestamp_actual
+        from .directory_entry import FLAG_CHECKSUM
+
+        if offset < 0:
+            raise ValueError(f"El offset no puede ser negativo: {offset}")
+
+        index = self._find_file_index(filename)
+        entry = self._unshare(index)
+        end = offset + len(data)
+
+        if end > entry.file_size:
+            entry = self._resize_entry(index, end, zero_fill_until=offset)
+        else:
+            entry = entry._replace(
+                modified_timestamp=timestamp_actual(),
+                flags=entry.flags & ~FLAG_CHECKSUM,
+                checksum=0
             )
+            self._write_directory_entry(index, entry)
 
-        # Escribir datos del archivo
-        self._write_file_data(start_cluster, data)
+        self._write_entry_data(entry, data, offset)
 
-        # Crear entrada de directorio
-        new_entry = DirectoryEntry.create_file(filename, start_cluster, file_size)
+        return len(data)
 
-        # Encontrar slot vacío en directorio
-        slot_index = self._find_empty_directory_slot()
+    @_writer
+    def append(self, filename: str, data_or_stream: Union[bytes, BinaryIO]) -> dict:
+        """
+        Agrega datos al final de un archivo existente.
 
-        # Escribir entrada de directorio
-        self._write_directory_entry(slot_index, new_entry)
+        El extent del archivo se extiende hacia los clusters libres que le
+        siguen sin mover los datos existentes; solo si esos clusters están
+        ocupados el archivo se reubica a otro espacio contiguo.
+
+        Args:
+            filename: Nombre del archivo
+            data_or_stream: Bytes a agregar, o un objeto tipo archivo
+                abierto en modo binario (se lee por bloques)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'bytes_appended': Bytes agregados
+                - 'size': Nuevo tamaño del archivo
+                - 'start_cluster': Cluster inicial (cambia si se reubicó)
+                - 'relocated': True si el archivo tuvo que moverse
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            NoSpaceError: Si no hay espacio contiguo para crecer
+        """
+        index = self._find_file_index(filename)
+        original_start = self._file_extents(self.directory_entries[index])[0][0]
+
+        # Un archivo comprimido se descomprime antes (file_size debe ser
+        # el tamaño de su contenido)
+        self._unshare(index)
+
+        if isinstance(data_or_stream, (bytes, bytearray, memoryview)):
+            chunks = [bytes(data_or_stream)]
+        else:
+            chunks = iter(lambda: data_or_stream.read(STREAM_CHUNK_SIZE), b'')
+
+        bytes_appended = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            offset = self.directory_entries[index].file_size
+            entry = self._resize_entry(index, offset + len(chunk), zero_fill_until=offset)
+            self._write_entry_data(entry, chunk, offset)
+            bytes_appended += len(chunk)
+
+        start_cluster = self._file_extents(self.directory_entries[index])[0][0]
+
+        return {
+            'filename': filename,
+            'bytes_appended': bytes_appended,
+            'size': self.directory_entries[index].file_size,
+            'start_cluster': start_cluster,
+            'relocated': start_cluster != original_start
+        }
+
+    @_writer
+    def reserve(self, filename: str, size: int) -> dict:
+        """
+        Reserva un extent contiguo para un archivo antes de escribirlo.
+
+        Si el archivo no existe se crea vacío con el espacio reservado; si
+        existe, su extent crece (en sitio o reubicándose) hasta cubrir size.
+        La reserva queda registrada en la entrada de directorio
+        (FLAG_RESERVED) y se mantiene hasta commit_reservation() o
+        abort_reservation(), incluso si la imagen se cierra antes.
+
+        Args:
+            filename: Nombre del archivo
+            size: Bytes a reservar (capacidad total del archivo)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'start_cluster': Cluster inicial del extent reservado
+                - 'reserved_clusters': Clusters reservados
+                - 'created': True si el archivo se creó al reservar
+
+        Raises:
+            ValueError: Si el nombre o el tamaño son inválidos
+            NoSpaceError: Si no hay espacio contiguo suficiente
+            DirectoryFullError: Si el directorio está lleno
+        """
+        from utils.validation import validar_tamanio_archivo
+        from utils.exceptions import FileNotFoundInFilesystemError
+        from .directory_entry import DirectoryEntry, FLAG_RESERVED
+
+        validar_tamanio_archivo(size, self.superblock.data_capacity)
+        clusters = self._clusters_for(size)
+
+        try:
+            index = self._find_file_index(filename)
+        except FileNotFoundInFilesystemError:
+            index = None
+
+        if index is None:
+            _, name = self._split_path(filename)
+            index, start_cluster = self._allocate_new_file(filename, clusters, size)
+            entry = DirectoryEntry.create_file(name, start_cluster, 0)
+            created = True
+        else:
+            entry = self._unshare(index)
+            if entry.is_fragmented():
+                # Los extents solo crecen; aux no se usa para su tamaño
+                clusters = max(clusters, self._clusters_for(entry.file_size))
+            start_cluster = self._ensure_capacity(entry, clusters)
+            if not entry.is_fragmented():
+                clusters = max(clusters, self._entry_clusters(entry))
+            created = False
+
+        entry = entry._replace(
+            start_cluster=start_cluster,
+            flags=entry.flags | FLAG_RESERVED,
+            aux=clusters
+        )
+        self._write_directory_entry(index, entry)
 
         return {
             'filename': filename,
-            'bytes_copied': file_size,
             'start_cluster': start_cluster,
-            'num_clusters': clusters_necesarios
+            'reserved_clusters': clusters,
+            'created': created
+        }
+
+    @_writer
+    def commit_reservation(self, filename: str) -> dict:
+        """
+        Confirma la reserva de un archivo: libera los clusters reservados
+        que quedaron más allá de su tamaño final.
+
+        Args:
+            filename: Nombre del archivo
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'size': Tamaño final
+                - 'freed_clusters': Clusters reservados que se liberaron
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+        """
+        from .directory_entry import FLAG_RESERVED
+
+        index = self._find_file_index(filename)
+        entry = self.directory_entries[index]
+
+        if not entry.is_reserved():
+            return {'filename': filename, 'size': entry.file_size, 'freed_clusters': 0}
+
+        reserved = self._entry_clusters(entry)
+        entry = entry._replace(flags=entry.flags & ~FLAG_RESERVED, aux=0)
+        self._write_directory_entry(index, entry)
+
+        return {
+            'filename': filename,
+            'size': entry.file_size,
+            'freed_clusters': reserved - self._entry_clusters(entry)
+        }
+
+    @_writer
+    def abort_reservation(self, filename: str) -> dict:
+        """
+        Cancela la reserva de un archivo.
+
+        Si el archivo sigue vacío (fue creado por reserve() y nunca se
+        escribió) se elimina; si ya tiene datos, se conservan y solo se
+        libera el espacio reservado sobrante.
+
+        Args:
+            filename: Nombre del archivo
+
+        Returns:
+            Diccionario con 'filename', 'removed' y 'freed_clusters'
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+        """
+        entry = self._find_file(filename)
+
+        if entry.is_reserved() and entry.file_size == 0:
+            result = self.delete_file(filename)
+            return {
+                'filename': filename,
+                'removed': True,
+                'freed_clusters': result['freed_clusters']
+            }
+
+        result = self.commit_reservation(filename)
+        return {
+            'filename': filename,
+            'removed': False,
+            'freed_clusters': result['freed_clusters']
+        }
+
+    @_writer
+    def copy(self, src_name: str, dst_name: str) -> dict:
+        """
+        Copia un archivo dentro de la imagen.
+
+        Asigna espacio nuevo (contiguo o, si no hay, en varios extents) y
+        copia los clusters internamente en bloques grandes, sin exportar al
+        sistema local ni usar archivos temporales.
+
+        Args:
+            src_name: Nombre del archivo origen
+            dst_name: Nombre del archivo copia
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre de la copia
+                - 'src_filename': Nombre del archivo origen
+                - 'bytes_copied': Bytes copiados
+                - 'start_cluster': Cluster inicial de la copia
+                - 'num_clusters': Clusters utilizados
+                - 'extents': Extents de la copia
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el origen no existe
+            ValueError: Si el nombre destino es inválido
+            FilenameConflictError: Si ya existe un archivo con el nombre destino
+            NoSpaceError: Si no hay espacio libre suficiente
+            DirectoryFullError: Si el directorio está lleno
+        """
+        from .directory_entry import FLAG_CHECKSUM, FLAG_COMPRESSED
+
+        src_entry = self._find_file(src_name)
+        parent, name = self._split_path(dst_name)
+
+        self._check_name_available(dst_name)
+
+        # Reservar slot y extents antes de copiar datos
+        num_clusters = self._clusters_for(src_entry.file_size)
+        slot_index = self._find_empty_directory_slot(parent)
+        extents, block_cluster = self._allocate_extents(num_clusters, src_entry.file_size)
+
+        new_entry = self._new_data_entry(name, extents, block_cluster, src_entry.file_size)
+        self._copy_entry_data(src_entry, 0, new_entry, 0, src_entry.file_size)
+
+        # Mismos datos: la copia conserva el CRC32 y la compresión del origen
+        new_entry = new_entry._replace(
+            flags=new_entry.flags | (src_entry.flags & (FLAG_CHECKSUM | FLAG_COMPRESSED)),
+            checksum=src_entry.checksum,
+            compression=src_entry.compression,
+            aux=src_entry.aux if src_entry.is_compressed() else 0
+        )
+        self._write_directory_entry(slot_index, new_entry)
+
+        return {
+            'filename': dst_name,
+            'src_filename': src_name,
+            'bytes_copied': src_entry.file_size,
+            'start_cluster': extents[0][0],
+            'num_clusters': num_clusters,
+            'extents': len(extents)
+        }
+
+    @_writer
+    def copy_range(self, src_name: str, src_offset: int, dst_name: str,
+                   dst_offset: int, length: int) -> int:
+        """
+        Copia un rango de bytes de un archivo a otro dentro de la imagen.
+
+        El destino se extiende primero (una sola vez) con las reglas de
+        truncate_file() y luego los datos se copian en bloques grandes.
+        Es parte de la API de Python: el montaje FUSE no lo usa, porque
+        fusepy sobre libfuse 2 nunca despacha copy_file_range ('cp' en el
+        montaje pasa por read/write).
+
+        Args:
+            src_name: Nombre del archivo origen
+            src_offset: Offset de lectura en el origen
+            dst_name: Nombre del archivo destino (debe existir)
+            dst_offset: Offset de escritura en el destino
+            length: Bytes a copiar (se limita al final del origen)
+
+        Returns:
+            Bytes copiados
+
+        Raises:
+            FileNotFoundInFilesystemError: Si algún archivo no existe
+            ValueError: Si algún offset es inválido
+            NoSpaceError: Si el destino no puede crecer
+        """
+        from utils.binary_utils import timestamp_actual
+        from .directory_entry import FLAG_CHECKSUM
+
+        if src_offset < 0 or dst_offset < 0:
+            raise ValueError("Los offsets no pueden ser negativos")
+
+        src_entry = self._find_file(src_name)
+        length = max(0, min(length, src_entry.content_size() - src_offset))
+        if length == 0:
+            return 0
+
+        dst_index = self._find_file_index(dst_name)
+        dst_entry = self._unshare(dst_index)
+        end = dst_offset + length
+
+        if end > dst_entry.file_size:
+            dst_entry = self._resize_entry(dst_index, end, zero_fill_until=dst_offset)
+        else:
+            dst_entry = dst_entry._replace(
+                modified_timestamp=timestamp_actual(),
+                flags=dst_entry.flags & ~FLAG_CHECKSUM,
+                checksum=0
+            )
+            self._write_directory_entry(dst_index, dst_entry)
+
+        # El origen pudo reubicarse si origen y destino son el mismo archivo
+        src_entry = self._find_file(src_name)
+
+        if src_entry.is_compressed():
+            # Los bytes del rango solo existen descomprimidos
+            data = self._read_file_data(src_entry, src_offset, length)
+            self._write_entry_data(dst_entry, data, dst_offset)
+        else:
+            self._copy_entry_data(src_entry, src_offset, dst_entry, dst_offset, length)
+
+        return length
+
+    @_writer
+    def rename(self, old_name: str, new_name: str, overwrite: bool = False) -> dict:
+        """
+        Renombra o mueve un archivo o directorio reescribiendo solo entradas
+        de directorio.
+
+        Los clusters de datos no se mueven. Dentro del mismo directorio se
+        reescribe la entrada en su slot; al mover a otro directorio la
+        entrada pasa a un slot del destino y el slot original se libera.
+        Si overwrite es True y ya existe una entrada con el nuevo nombre,
+        ésta se reemplaza: todas las entradas cambian en una sola operación.
+
+        Args:
+            old_name: Ruta actual
+            new_name: Nueva ruta (su directorio padre debe existir)
+            overwrite: Reemplazar el destino si ya existe (un directorio
+                solo reemplaza a otro directorio vacío)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nueva ruta
+                - 'old_filename': Ruta anterior
+                - 'replaced': True si se reemplazó una entrada existente
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el origen o el directorio
+                destino no existen
+            ValueError: Si la nueva ruta es inválida o mueve un directorio
+                dentro de sí mismo
+            FilenameConflictError: Si el destino existe y overwrite es False
+            EntryTypeError: Si origen y destino son de distinto tipo
+            DirectoryNotEmptyError: Si el destino es un directorio con entradas
+        """
+        from utils.exceptions import (
+            DirectoryNotEmptyError, EntryTypeError, FilenameConflictError
+        )
+        from .directory_entry import DirectoryEntry
+
+        old_path = old_name.strip('/')
+        new_path = new_name.strip('/')
+        index = self._find_file_index(old_path, directory=None)
+        new_parent, name = self._split_path(new_path)
+        is_directory = self.directory_entries[index].is_directory()
+
+        if new_path == old_path:
+            return {'filename': new_name, 'old_filename': old_name, 'replaced': False}
+
+        if is_directory and new_path.startswith(old_path + '/'):
+            raise ValueError(
+                f"No se puede mover el directorio '{old_path}' dentro de sí mismo"
+            )
+
+        self._directory_table(new_parent)
+
+        target_index = self.name_index.get(new_path)
+        if target_index is not None:
+            if not overwrite:
+                raise FilenameConflictError(new_name)
+            target = self.directory_entries[target_index]
+            if target.is_directory() != is_directory:
+                raise EntryTypeError(new_path, target.is_directory())
+            if self._child_index.get(new_path):
+                raise DirectoryNotEmptyError(new_path)
+            dest_index = target_index
+        elif new_parent == old_path.rpartition('/')[0]:
+            dest_index = index
+        else:
+            dest_index = self._find_empty_directory_slot(new_parent)
+            # Agrandar el directorio destino recalcula los índices
+            index = self.name_index[old_path]
+
+        changes = {
+            dest_index: self.directory_entries[index]._replace(filename=name)
+        }
+        if dest_index != index:
+            changes[index] = DirectoryEntry.create_empty()
+
+        self._write_directory_entries(changes)
+
+        return {
+            'filename': new_name,
+            'old_filename': old_name,
+            'replaced': target_index is not None
+        }
+
+    @_writer
+    def update_timestamps(self, filename: str, modified: Optional[float] = None) -> dict:
+        """
+        Actualiza el timestamp de modificación guardado de un archivo.
+
+        Args:
+            filename: Nombre del archivo
+            modified: Tiempo Unix de modificación (None = ahora)
+
+        Returns:
+            Diccionario con resultado:
+                - 'filename': Nombre del archivo
+                - 'modified': Nuevo timestamp (AAAAMMDDHHMMSS)
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el archivo no existe
+            ValueError: Si el tiempo no cabe en el formato AAAAMMDDHHMMSS
+        """
+        from datetime import datetime
+        from utils.binary_utils import formatear_timestamp, timestamp_actual
+
+        index = self._find_file_index(filename)
+
+        if modified is None:
+            timestamp = timestamp_actual()
+        else:
+            try:
+                moment = datetime.fromtimestamp(modified)
+            except (OverflowError, OSError, ValueError) as e:
+                raise ValueError(f"Tiempo de modificación inválido: {modified}") from e
+
+            # strftime no rellena años de menos de 4 dígitos
+            if moment.year < 1000:
+                raise ValueError(f"Tiempo de modificación inválido: {modified}")
+
+            timestamp = formatear_timestamp(moment)
+
+        entry = self.directory_entries[index]._replace(modified_timestamp=timestamp)
+        self._write_directory_entry(index, entry)
+
+        return {
+            'filename': filename,
+            'modified': timestamp
         }
 
+    @_writer
     def delete_file(self, filename: str) -> dict:
         """
-        Elimina un archivo del filesystem.
+        Elimina un archivo del filesystem (los directorios se eliminan con
+        rmdir()).
 
         Args:
-            filename: Nombre del archivo a eliminar
+            filename: Ruta del archivo a eliminar
 
         Returns:
             Diccionario con resultado:
@@ -566,22 +3755,23 @@ class Filesystem:
 
         Raises:
             FileNotFoundInFilesystemError: Si el archivo no existe
+            EntryTypeError: Si la ruta es un directorio
         """
         from .directory_entry import DirectoryEntry
 
-        # Buscar el archivo
-        entry = self._find_file(filename)
+        # Buscar el archivo y su índice en el directorio
+        entry_index = self._find_file_index(filename)
+        entry = self.directory_entries[entry_index]
 
-        # Calcular espacio liberado
-        freed_clusters = entry.num_clusters_needed()
-        freed_bytes = entry.file_size
+        # Calcular espacio liberado (nada si otra entrada comparte los clusters)
+        shared = entry.is_shared() and self._shared.get(entry.start_cluster, 0) > 1
+        freed_clusters = 0 if shared else self._entry_clusters(entry)
+        freed_bytes = 0 if shared else entry.file_size
 
-        # Encontrar índice de la entrada en el directorio
-        entry_index = None
-        for i, e in enumerate(self.directory_entries):
-            if e.is_active() and e.filename == filename:
-                entry_index = i
-                break
+        # Los clusters liberados ya no deben servirse desde el cache
+        if not shared:
+            for start, count in self._entry_ranges(entry):
+                self.cache.invalidate(start, count)
 
         # Crear entrada vacía
         empty_entry = DirectoryEntry.create_empty()
@@ -595,11 +3785,185 @@ class Filesystem:
             'freed_bytes': freed_bytes
         }
 
+    @_writer
+    def mkdir(self, path: str, entries: int = SUBDIRECTORY_SLOTS) -> dict:
+        """
+        Crea un subdirectorio vacío.
+
+        Su tabla de entradas ocupa clusters completos del área de datos (se
+        aprovecha todo el último cluster) y se escribe vacía antes de
+        registrar la entrada en el directorio padre.
+
+        Args:
+            path: Ruta del subdirectorio (el directorio padre debe existir)
+            entries: Entradas iniciales de su tabla (default: 64; crece
+                al llenarse)
+
+        Returns:
+            Diccionario con resultado:
+                - 'directory': Ruta del subdirectorio
+                - 'entries': Entradas de su tabla
+                - 'start_cluster': Cluster inicial de la tabla
+
+        Raises:
+            ValueError: Si la ruta o el número de entradas son inválidos
+            FileNotFoundInFilesystemError: Si el directorio padre no existe
+            FilenameConflictError: Si ya existe una entrada con esa ruta
+            NoSpaceError: Si no hay espacio contiguo para la tabla
+            DirectoryFullError: Si el directorio padre está lleno
+        """
+        from .directory_entry import DirectoryEntry
+
+        if entries < 1:
+            raise ValueError(f"El directorio debe tener al menos una entrada: {entries}")
+
+        _, name = self._split_path(path)
+        self._check_name_available(path)
+
+        clusters = self._clusters_for(entries * 64)
+        table_size = clusters * self.superblock.cluster_size // 64 * 64
+        slot_index, start_cluster = self._allocate_new_file(path, clusters, table_size)
+
+        # Tabla vacía primero: la entrada nunca apunta a datos viejos
+        self._write_file_data(start_cluster, bytes(table_size))
+        self._write_directory_entry(
+            slot_index, DirectoryEntry.create_directory(name, start_cluster, table_size)
+        )
+
+        return {
+            'directory': path.strip('/'),
+            'entries': table_size // 64,
+            'start_cluster': start_cluster
+        }
+
+    @_writer
+    def rmdir(self, path: str) -> dict:
+        """
+        Elimina un subdirectorio vacío y libera su tabla.
+
+        Args:
+            path: Ruta del subdirectorio
+
+        Returns:
+            Diccionario con resultado:
+                - 'directory': Ruta del subdirectorio eliminado
+                - 'freed_clusters': Clusters liberados
+
+        Raises:
+            FileNotFoundInFilesystemError: Si el directorio no existe
+            EntryTypeError: Si la ruta es un archivo
+            DirectoryNotEmptyError: Si el directorio tiene entradas
+        """
+        from utils.exceptions import DirectoryNotEmptyError
+        from .directory_entry import DirectoryEntry
+
+        path = path.strip('/')
+        index = self._find_file_index(path, directory=True)
+        if self._child_index.get(path):
+            raise DirectoryNotEmptyError(path)
+
+        entry = self.directory_entries[index]
+        freed_clusters = self._entry_clusters(entry)
+        self.cache.invalidate(entry.start_cluster, freed_clusters)
+
+        self._write_directory_entry(index, DirectoryEntry.create_empty())
+
+        return {
+            'directory': path,
+            'freed_clusters': freed_clusters
+        }
+
+    @_writer
+    def discard_freed(self, all_free: bool = False) -> dict:
+        """
+        Perfora en la imagen los clusters liberados (discard).
+
+        Eliminar un archivo solo reescribe su entrada: sus clusters
+        conservan los datos viejos y siguen ocupando disco en el host. Esta
+        pasada, que se hace en lote y no en cada eliminación, convierte en
+        huecos los rangos anotados desde la anterior (ver discard) con
+        fallocate(FALLOC_FL_PUNCH_HOLE), o los llena de ceros si el host no
+        lo soporta (ver utils.sparse.discard_range).
+
+        Los rangos anotados se fusionan y se recortan a lo que sigue libre
+        en el mapa de clusters, releído bajo el bloqueo exclusivo: los
+        clusters que otro archivo (o la reserva de otro proceso) ocupó
+        después de liberarse nunca se tocan.
+
+        Args:
+            all_free: Perforar todos los clusters libres de la imagen y no
+                solo los anotados (default: False). Sirve para imágenes con
+                datos viejos de antes de usar discard
+
+        Returns:
+            Diccionario con resultado:
+                - 'filesystem': Ruta de la imagen
+                - 'discarded_ranges': Rangos perforados
+                - 'discarded_clusters': Clusters perforados
+                - 'discarded_bytes': Bytes perforados
+                - 'method': 'punch_hole', 'zero_fill' o None si no había
+                  nada que perforar
+                - 'disk_usage': Bytes que la imagen ocupa en el host
+                - 'elapsed': Segundos de la pasada
+
+        Raises:
+            ReadOnlyFilesystemError: Si el filesystem es de solo lectura
+            OSError: Si falla la perforación o la escritura de ceros
+        """
+        import time
+        from utils.sparse import discard_range
+
+        started = time.perf_counter()
+
+        if all_free:
+            ranges = self.cluster_map.free_extents()
+        else:
+            ranges = [
+                part
+                for start, count in self._coalesce(self._discard_pending)
+                for part in self.cluster_map.free_parts(start, count)
+            ]
+        self._discard_pending = []
+        self.discard_pending_clusters = 0
+
+        cluster_size = self.superblock.cluster_size
+        method = None
+        clusters = 0
+        for start, count in ranges:
+            method = discard_range(self.fd, start * cluster_size, count * cluster_size)
+            self.cache.invalidate(start, count)
+            clusters += count
+            self._modified = True
+
+        return {
+            'filesystem': self.fs_path,
+            'discarded_ranges': len(ranges),
+            'discarded_clusters': clusters,
+            'discarded_bytes': clusters * cluster_size,
+            'method': method,
+            'disk_usage': getattr(os.fstat(self.fd), 'st_blocks', 0) * 512,
+            'elapsed': time.perf_counter() - started
+        }
+
     def close(self):
-        """Cierra el file handle del filesystem."""
-        if self.file_handle:
-            self.file_handle.close()
-            self.file_handle = None
+        """
+        Cierra el descriptor de la imagen.
+
+        Con discard, los rangos liberados que quedaron pendientes se
+        perforan antes (si falla, la imagen solo conserva datos viejos en
+        clusters libres).
+        """
+        if self.fd is not None and self._discard_pending:
+            from utils.exceptions import FiUnamFSError
+
+            try:
+                self.discard_freed()
+            except (OSError, FiUnamFSError):
+                pass
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
 
     def __enter__(self):
         """Soporte para context manager (with statement)."""
@@ -609,3 +3973,85 @@ class Filesystem:
         """Cierre automático al salir del context manager."""
         self.close()
         return False
+
+
+def format_image(fs_path: str, total_clusters: int, cluster_size: int = 4096,
+                 directory_entries: int = 1024, label: str = 'FiUnamFS',
+                 overwrite: bool = False) -> dict:
+    """
+    Crea una imagen FiUnamFS versión 26-3 vacía con la geometría indicada.
+
+    La imagen se crea dispersa (ftruncate): solo se escriben el superblock
+    y la región de directorio, el área de datos no ocupa espacio en disco
+    hasta que se usa.
+
+    Args:
+        fs_path: Ruta de la imagen a crear
+        total_clusters: Total de clusters (incluye superblock y directorio)
+        cluster_size: Bytes por cluster (potencia de 2 entre 512 y 1 MB)
+        directory_entries: Entradas de directorio mínimas (se redondea a
+            clusters completos)
+        label: Etiqueta del volumen (hasta 16 caracteres ASCII)
+        overwrite: Reemplazar la imagen si ya existe (default: False)
+
+    Returns:
+        Diccionario con resultado:
+            - 'filesystem': Ruta de la imagen
+            - 'cluster_size': Bytes por cluster
+            - 'total_clusters': Total de clusters
+            - 'directory_clusters': Clusters de directorio
+            - 'directory_entries': Entradas de directorio
+            - 'capacity': Bytes del área de datos
+
+    Raises:
+        ValueError: Si la etiqueta o el número de entradas son inválidos
+        InvalidFilesystemError: Si la geometría no es válida
+        FileExistsError: Si la imagen existe y overwrite es False
+    """
+    from .directory_entry import DirectoryEntry
+    from .superblock import Superblock, FIUNAMFS_SIGNATURE, GEOMETRY_VERSION
+
+    if len(label) > 16 or not all(ord(c) < 128 for c in label):
+        raise ValueError(f"La etiqueta '{label}' debe tener hasta 16 caracteres ASCII")
+
+    if directory_entries < 1:
+        raise ValueError(f"El directorio necesita al menos una entrada: {directory_entries}")
+
+    directory_clusters = -(-directory_entries * 64 // max(cluster_size, 1))
+    superblock = Superblock(
+        signature=FIUNAMFS_SIGNATURE,
+        version=GEOMETRY_VERSION,
+        volume_label=label.encode('ascii'),
+        cluster_size=cluster_size,
+        directory_clusters=directory_clusters,
+        total_clusters=total_clusters
+    )
+    superblock.validate()
+
+    flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+    flags |= os.O_TRUNC if overwrite else os.O_EXCL
+    fd = os.open(fs_path, flags, 0o644)
+    try:
+        os.ftruncate(fd, total_clusters * cluster_size)
+        positional_io.pwrite(fd, superblock.to_bytes(), 0)
+
+        # Región de directorio: todas las entradas vacías, en bloques
+        empty = DirectoryEntry.create_empty().to_bytes()
+        per_block = COPY_BLOCK_SIZE // len(empty)
+        slots = superblock.directory_slots
+        for first in range(0, slots, per_block):
+            count = min(per_block, slots - first)
+            positional_io.pwrite(
+                fd, empty * count, superblock.directory_offset + first * len(empty)
+            )
+    finally:
+        os.close(fd)
+
+    return {
+        'filesystem': fs_path,
+        'cluster_size': cluster_size,
+        'total_clusters': total_clusters,
+        'directory_clusters': directory_clusters,
+        'directory_entries': slots,
+        'capacity': superblock.data_capacity
+    }
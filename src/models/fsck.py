@@ -0,0 +1,248 @@
+"""
+Verificación de consistencia (fsck) de FiUnamFS
+
+Revisa el directorio y el uso de clusters de una imagen ya abierta, sin
+leer el área de datos (salvo los bloques de extents, que Filesystem ya
+tiene en memoria):
+
+- Rangos fuera del área de datos (antes del primer cluster de datos o
+  más allá de total_clusters)
+- Archivos fragmentados cuyo tamaño excede sus extents o cuyo bloque de
+  extents no es válido
+- Subdirectorios cuya tabla no se pudo leer
+- Rangos de clusters compartidos por dos entradas (o dos extents de la
+  misma entrada)
+- Rutas duplicadas en un mismo directorio
+
+Las entradas compartidas (FLAG_SHARED, deduplicadas) con el mismo cluster
+inicial cuentan como un solo rango.
+
+Los traslapes se detectan ordenando todos los rangos por cluster inicial y
+recorriéndolos una sola vez (O(n log n) en el número de rangos, sin
+importar el tamaño de la imagen).
+
+Solo se reparan los casos en que no se pierde información que todavía se
+pueda leer: tamaños que exceden el espacio del archivo o de la imagen se
+recortan, y una reserva sin escribir que se traslapa con otra entrada se
+descarta. Los demás errores se reportan sin modificar nada.
+"""
+
+from typing import List, NamedTuple
+
+from .directory_entry import FLAG_RESERVED
+
+
+# Clases de error
+OUT_OF_RANGE = 'out_of_range'
+SIZE_OVERRUN = 'size_overrun'
+BAD_EXTENT_BLOCK = 'bad_extent_block'
+BAD_DIRECTORY = 'bad_directory'
+OVERLAP = 'overlap'
+DUPLICATE_NAME = 'duplicate_name'
+
+
+class FsckIssue(NamedTuple):
+    """
+    Un error encontrado por fsck.
+
+    Atributos:
+        kind: Clase de error (OUT_OF_RANGE, SIZE_OVERRUN, ...)
+        path: Ruta de la entrada afectada
+        detail: Descripción legible
+        repaired: True si se corrigió en la imagen
+    """
+    kind: str
+    path: str
+    detail: str
+    repaired: bool = False
+
+
+class _Range(NamedTuple):
+    """Rango de clusters [start, end) que ocupa una entrada."""
+    start: int
+    end: int
+    path: str
+    index: int
+    reserved_from: int  # Primer cluster que solo está reservado (= end si no hay)
+
+
+def check(fs, repair: bool = False) -> List[FsckIssue]:
+    """
+    Verifica la consistencia de un filesystem abierto.
+
+    El llamador debe tener el bloqueo de lectura (o el de escritura si
+    repair es True); ver Filesystem.fsck().
+
+    Args:
+        fs: Filesystem a verificar
+        repair: Corregir los casos seguros
+
+    Returns:
+        Lista de FsckIssue, en el orden en que se encontraron
+    """
+    superblock = fs.superblock
+    cluster_size = superblock.cluster_size
+    first_data = superblock.first_data_cluster
+    total = superblock.total_clusters
+
+    issues: List[FsckIssue] = []
+    fixes = {}
+    ranges: List[_Range] = []
+    seen = {}
+    shared = set()
+
+    for table in fs._tables:
+        for index in range(table.first_slot, table.first_slot + table.slots):
+            entry = fs.directory_entries[index]
+            if not entry.is_active():
+                continue
+
+            path = fs._entry_path(index, entry)
+            if path in seen:
+                issues.append(FsckIssue(
+                    DUPLICATE_NAME, path,
+                    f"slots {seen[path]} y {index} tienen la misma ruta"
+                ))
+            else:
+                seen[path] = index
+
+            if entry.is_directory() and path not in fs._table_index:
+                issues.append(FsckIssue(
+                    BAD_DIRECTORY, path,
+                    f"tabla ilegible (cluster {entry.start_cluster}, "
+                    f"{entry.file_size} bytes); su contenido no es accesible"
+                ))
+
+            if entry.is_fragmented():
+                extents = fs._file_extents(entry)
+                if not extents:
+                    issues.append(FsckIssue(
+                        BAD_EXTENT_BLOCK, path,
+                        f"el bloque de extents del cluster {entry.start_cluster} no es válido"
+                    ))
+                capacity = sum(count for _, count in extents) * cluster_size
+                if extents and entry.file_size > capacity:
+                    repaired = repair and _fix(fixes, index, entry, file_size=capacity)
+                    issues.append(FsckIssue(
+                        SIZE_OVERRUN, path,
+                        f"{entry.file_size} bytes en extents de {capacity} bytes",
+                        repaired
+                    ))
+                used_end = None
+            else:
+                used_end = entry.start_cluster + fs._clusters_for(entry.file_size)
+
+            if entry.is_shared():
+                if entry.start_cluster in shared:
+                    # Mismos clusters que otra entrada compartida ya revisada
+                    continue
+                shared.add(entry.start_cluster)
+
+            for start, count in fs._entry_ranges(entry):
+                end = start + count
+                if start < first_data or start >= total:
+                    issues.append(FsckIssue(
+                        OUT_OF_RANGE, path,
+                        f"clusters {start}-{end - 1} fuera del área de datos "
+                        f"({first_data}-{total - 1})"
+                    ))
+                    continue
+
+                if end > total:
+                    repaired = False
+                    if repair and not entry.is_fragmented() and not entry.is_directory():
+                        repaired = _fix(
+                            fixes, index, entry,
+                            file_size=min(entry.file_size, (total - start) * cluster_size),
+                            flags=entry.flags & ~FLAG_RESERVED,
+                            aux=0
+                        )
+                    issues.append(FsckIssue(
+                        OUT_OF_RANGE, path,
+                        f"clusters {start}-{end - 1} exceden el total de clusters ({total})",
+                        repaired
+                    ))
+                    end = total
+
+                reserved_from = end
+                if used_end is not None and entry.is_reserved():
+                    reserved_from = min(end, max(start, used_end))
+                ranges.append(_Range(start, end, path, index, reserved_from))
+
+    issues.extend(_sweep(fs, ranges, fixes, repair))
+
+    if fixes:
+        for index, entry in fixes.items():
+            fs._write_directory_entry(index, entry)
+        # Las entradas traslapadas dejan el mapa de clusters inconsistente
+        # al liberarse por separado: reconstruirlo desde el directorio
+        fs._read_directory()
+
+    return issues
+
+
+def _sweep(fs, ranges: List[_Range], fixes: dict, repair: bool) -> List[FsckIssue]:
+    """
+    Detecta traslapes recorriendo los rangos ordenados por inicio.
+
+    Cada rango se compara con el que llega más lejos entre los anteriores:
+    si empieza antes de que ese termine, se traslapan.
+
+    Args:
+        fs: Filesystem verificado
+        ranges: Rangos de todas las entradas activas
+        fixes: Entradas corregidas por índice (se agregan las nuevas)
+        repair: Descartar reservas sin escribir que causen el traslape
+
+    Returns:
+        Lista de FsckIssue de clase OVERLAP
+    """
+    issues = []
+    ranges.sort()
+    reach = None
+
+    for current in ranges:
+        if reach is not None and current.start < reach.end:
+            shared_end = min(reach.end, current.end)
+            detail = (
+                f"clusters {current.start}-{shared_end - 1} compartidos con "
+                f"'{reach.path}'"
+            )
+
+            # Si lo compartido es solo espacio reservado de una de las dos
+            # entradas, basta con descartar esa reserva
+            repaired = False
+            if repair:
+                for victim in (reach, current):
+                    if victim.reserved_from <= current.start:
+                        entry = fixes.get(victim.index, fs.directory_entries[victim.index])
+                        repaired = _fix(
+                            fixes, victim.index, entry,
+                            flags=entry.flags & ~FLAG_RESERVED, aux=0
+                        )
+                        break
+
+            issues.append(FsckIssue(OVERLAP, current.path, detail, repaired))
+
+        if reach is None or current.end > reach.end:
+            reach = current
+
+    return issues
+
+
+def _fix(fixes: dict, index: int, entry, **changes) -> bool:
+    """
+    Registra una corrección de una entrada (se escriben todas al final).
+
+    Args:
+        fixes: Entradas corregidas por índice
+        index: Índice del slot
+        entry: Entrada actual (o ya corregida)
+        **changes: Campos a reemplazar
+
+    Returns:
+        True
+    """
+    fixes[index] = fixes.get(index, entry)._replace(**changes)
+    return True
+
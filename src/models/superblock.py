@@ -4,6 +4,19 @@ Modelo del Superblock de FiUnamFS
 El superblock contiene los metadatos del filesystem y ocupa el cluster 0
 (los primeros 1024 bytes de la imagen). Define parámetros críticos como
 firma, versión, tamaño de cluster y distribución de clusters.
+
+Versiones:
+- 26-1 / 26-2: Geometría fija de disquete (1440 clusters de 1024 bytes,
+  directorio de 64 entradas en los clusters 1-4, datos desde el cluster 5)
+- 26-3: La geometría se toma del superblock (tamaño de cluster, total de
+  clusters y clusters de directorio), para imágenes de cientos de MB a
+  varios GB
+
+Los bytes 56-63 del padding guardan un contador de cambios (todas las
+versiones): cada escritor lo incrementa al terminar su ventana exclusiva,
+y los demás procesos solo releen el directorio si cambió (ver
+Filesystem.write_lock). No es parte de Superblock; una imagen recién
+formateada lo tiene en 0.
 """
 
 import struct
@@ -29,6 +42,31 @@ SUPERBLOCK_FORMAT = (
     'I'    # total_clusters (bytes 50-53): total de clusters (1440)
 )
 
+# Firma del formato
+FIUNAMFS_SIGNATURE = b'FiUnamFS'
+
+# Versiones con geometría fija de disquete (1.44 MB)
+LEGACY_VERSIONS = (b'26-1', b'26-2')
+
+# Versión cuya geometría se lee del superblock
+GEOMETRY_VERSION = b'26-3'
+
+# Geometría fija de las versiones 26-1 y 26-2
+LEGACY_CLUSTER_SIZE = 1024
+LEGACY_TOTAL_CLUSTERS = 1440
+LEGACY_DIRECTORY_CLUSTERS = 4
+
+# Límites del tamaño de cluster en la versión 26-3
+MIN_CLUSTER_SIZE = 512
+MAX_CLUSTER_SIZE = 1024 * 1024
+
+# Bytes por entrada de directorio
+DIRECTORY_ENTRY_SIZE = 64
+
+# Contador de cambios de la imagen (uint64 en el padding del superblock)
+CHANGE_COUNTER_OFFSET = 56
+CHANGE_COUNTER_FORMAT = '<Q'
+
 
 class Superblock(NamedTuple):
     """
@@ -36,11 +74,12 @@ class Superblock(NamedTuple):
 
     Atributos:
         signature: Debe ser b'FiUnamFS' (9 bytes)
-        version: Debe ser b'26-1' o b'26-2' (versión del formato)
+        version: b'26-1', b'26-2' (geometría fija) o b'26-3' (geometría
+            tomada del superblock)
         volume_label: Etiqueta del volumen (hasta 16 bytes)
-        cluster_size: Tamaño de cada cluster en bytes (debe ser 1024)
+        cluster_size: Tamaño de cada cluster en bytes (1024 en 26-1/26-2)
         directory_clusters: Clusters reservados para directorio (típicamente 3-4)
-        total_clusters: Total de clusters en el filesystem (debe ser 1440)
+        total_clusters: Total de clusters en el filesystem (1440 en 26-1/26-2)
     """
     signature: bytes
     version: bytes
@@ -75,33 +114,91 @@ class Superblock(NamedTuple):
             total_clusters=fields[5]                      # uint32 little-endian
         )
 
+    def to_bytes(self) -> bytes:
+        """
+        Serializa el superblock a un cluster 0 de 1024 bytes.
+
+        Returns:
+            1024 bytes (campos + padding en ceros)
+        """
+        data = struct.pack(
+            SUPERBLOCK_FORMAT,
+            self.signature,
+            self.version,
+            self.volume_label,
+            self.cluster_size,
+            self.directory_clusters,
+            self.total_clusters
+        )
+        return data.ljust(1024, b'\x00')
+
+    @property
+    def is_legacy(self) -> bool:
+        """True para las versiones de geometría fija (26-1 y 26-2)."""
+        return self.version in LEGACY_VERSIONS
+
+    @property
+    def directory_offset(self) -> int:
+        """Offset en bytes del directorio (siempre empieza en el cluster 1)."""
+        return self.cluster_size
+
+    @property
+    def layout_directory_clusters(self) -> int:
+        """
+        Clusters que ocupa realmente el directorio.
+
+        En 26-1/26-2 el directorio siempre ocupa los clusters 1-4, sin
+        importar el valor del campo directory_clusters.
+        """
+        return LEGACY_DIRECTORY_CLUSTERS if self.is_legacy else self.directory_clusters
+
+    @property
+    def directory_slots(self) -> int:
+        """Número de entradas de directorio (64 en 26-1/26-2)."""
+        return self.layout_directory_clusters * self.cluster_size // DIRECTORY_ENTRY_SIZE
+
+    @property
+    def first_data_cluster(self) -> int:
+        """Primer cluster del área de datos (5 en 26-1/26-2)."""
+        return 1 + self.layout_directory_clusters
+
+    @property
+    def data_capacity(self) -> int:
+        """Bytes del área de datos (1435 × 1024 en 26-1/26-2)."""
+        return (self.total_clusters - self.first_data_cluster) * self.cluster_size
+
     def validate(self) -> None:
         """
         Valida que el superblock cumpla con la especificación FiUnamFS.
 
         Verifica:
         - Firma correcta: "FiUnamFS"
-        - Versión soportada: "26-1" o "26-2"
-        - Tamaño de cluster: 1024 bytes
-        - Clusters de directorio: entre 1 y 64
-        - Total de clusters: 1440
+        - Versión soportada: "26-1", "26-2" o "26-3"
+        - 26-1/26-2: clusters de 1024 bytes y 1440 clusters en total
+        - 26-3: cluster potencia de 2 entre 512 bytes y 1 MB, y que
+          superblock y directorio dejen al menos un cluster de datos
+        - Clusters de directorio: entre 1 y 64 (26-1/26-2)
 
         Raises:
             InvalidFilesystemError: Si algún campo no cumple la especificación
         """
-        if self.signature != b'FiUnamFS':
+        if self.signature != FIUNAMFS_SIGNATURE:
             raise InvalidFilesystemError(
                 f"Firma inválida: se esperaba b'FiUnamFS', "
                 f"se encontró {self.signature!r}"
             )
 
-        if self.version not in (b'26-1', b'26-2'):
+        if self.version == GEOMETRY_VERSION:
+            self._validate_geometry()
+            return
+
+        if self.version not in LEGACY_VERSIONS:
             raise InvalidFilesystemError(
-                f"Versión no soportada: se esperaba b'26-1' o b'26-2', "
+                f"Versión no soportada: se esperaba b'26-1', b'26-2' o b'26-3', "
                 f"se encontró {self.version!r}"
             )
 
-        if self.cluster_size != 1024:
+        if self.cluster_size != LEGACY_CLUSTER_SIZE:
             raise InvalidFilesystemError(
                 f"Tamaño de cluster inválido: se esperaba 1024, "
                 f"se encontró {self.cluster_size}"
@@ -113,12 +210,39 @@ class Superblock(NamedTuple):
                 f"se encontró {self.directory_clusters}"
             )
 
-        if self.total_clusters != 1440:
+        if self.total_clusters != LEGACY_TOTAL_CLUSTERS:
             raise InvalidFilesystemError(
                 f"Total de clusters inválido: se esperaba 1440, "
                 f"se encontró {self.total_clusters}"
             )
 
+    def _validate_geometry(self) -> None:
+        """
+        Valida la geometría de un superblock versión 26-3.
+
+        Raises:
+            InvalidFilesystemError: Si la geometría no es utilizable
+        """
+        size = self.cluster_size
+        if (size < MIN_CLUSTER_SIZE or size > MAX_CLUSTER_SIZE or size & (size - 1)):
+            raise InvalidFilesystemError(
+                f"Tamaño de cluster inválido: debe ser potencia de 2 entre "
+                f"{MIN_CLUSTER_SIZE} y {MAX_CLUSTER_SIZE}, se encontró {size}"
+            )
+
+        if self.directory_clusters < 1:
+            raise InvalidFilesystemError(
+                f"Número de clusters de directorio inválido: debe ser al menos 1, "
+                f"se encontró {self.directory_clusters}"
+            )
+
+        if self.total_clusters <= self.first_data_cluster:
+            raise InvalidFilesystemError(
+                f"Total de clusters inválido: {self.total_clusters} no deja clusters "
+                f"de datos después del directorio (primer cluster de datos: "
+                f"{self.first_data_cluster})"
+            )
+
     def __str__(self) -> str:
         """Representación en string para debugging."""
         try:
@@ -0,0 +1,88 @@
+"""
+Discard diferido para el montaje FUSE de FiUnamFS
+
+Con la opción discard, los clusters que se liberan (unlink, truncate,
+rename que reemplaza un archivo) no se perforan en la imagen en la misma
+operación: Filesystem solo los anota y este hilo los perfora en lote con
+Filesystem.discard_freed().
+
+Arquitectura:
+- DiscardThread: Hilo worker que despierta cada DISCARD_INTERVAL segundos,
+  o antes si notify() ve al menos DISCARD_BATCH_CLUSTERS pendientes
+- La pasada toma el bloqueo exclusivo de la imagen; el costo de cada
+  unlink sigue siendo solo reescribir una entrada de directorio
+- Un discard fallido se ignora: los clusters siguen libres en el mapa y
+  solo conservan sus datos viejos en el host
+"""
+
+import threading
+
+
+# Segundos entre pasadas de discard
+DISCARD_INTERVAL = 5.0
+
+# Clusters pendientes con los que se adelanta la siguiente pasada
+DISCARD_BATCH_CLUSTERS = 4096
+
+
+class DiscardThread(threading.Thread):
+    """
+    Hilo que perfora periódicamente los clusters liberados.
+
+    Atributos:
+        filesystem: Instancia de Filesystem (abierta con discard=True)
+        interval: Segundos entre pasadas
+        passes: Pasadas que perforaron al menos un rango
+        clusters_discarded: Total de clusters perforados
+        method: Método de la última pasada ('punch_hole' o 'zero_fill')
+    """
+
+    def __init__(self, filesystem, interval: float = DISCARD_INTERVAL):
+        """
+        Inicializa el hilo de discard.
+
+        Args:
+            filesystem: Instancia de Filesystem compartida con el montaje
+            interval: Segundos entre pasadas (default: DISCARD_INTERVAL)
+        """
+        super().__init__(name='DiscardThread', daemon=True)
+        self.filesystem = filesystem
+        self.interval = interval
+        self.passes = 0
+        self.clusters_discarded = 0
+        self.method = None
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def notify(self) -> None:
+        """
+        Adelanta la siguiente pasada si ya hay un lote completo (no bloquea).
+        """
+        if self.filesystem.discard_pending_clusters >= DISCARD_BATCH_CLUSTERS:
+            self._wake.set()
+
+    def stop(self) -> None:
+        """Envía la señal de salida al hilo (no bloquea)."""
+        self._stopping = True
+        self._wake.set()
+
+    def run(self):
+        """Loop principal: una pasada por intervalo hasta recibir stop()."""
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+            if self._stopping or not self.filesystem.discard_pending_clusters:
+                continue
+
+            try:
+                result = self.filesystem.discard_freed()
+            except Exception:
+                # Se reintenta con lo que se libere después; los rangos
+                # de esta pasada se pierden (siguen libres, sin perforar)
+                continue
+
+            if result['discarded_ranges']:
+                self.passes += 1
+                self.clusters_discarded += result['discarded_clusters']
+                self.method = result['method']
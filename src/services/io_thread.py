@@ -16,7 +16,7 @@ import threading
 import queue
 from typing import Dict, Tuple, Optional
 
-from models.filesystem import Filesystem
+from models.filesystem import Filesystem, format_image
 from utils.exceptions import (
     FiUnamFSError,
     InvalidFilesystemError,
@@ -41,9 +41,13 @@ class IOThread(threading.Thread):
         command_queue: Cola de comandos (UI → I/O)
         result_queue: Cola de resultados (I/O → UI)
         filesystem: Instancia de Filesystem (exclusiva de este hilo)
+        read_only: Abrir el filesystem en modo solo lectura
+        discard: Abrir el filesystem con discard (los clusters liberados
+            se perforan en la imagen)
     """
 
-    def __init__(self, fs_path: str, command_queue: queue.Queue, result_queue: queue.Queue):
+    def __init__(self, fs_path: str, command_queue: queue.Queue, result_queue: queue.Queue,
+                 read_only: bool = False, discard: bool = False):
         """
         Inicializa el hilo de E/S.
 
@@ -51,9 +55,14 @@ class IOThread(threading.Thread):
             fs_path: Ruta al archivo .img del filesystem
             command_queue: Cola para recibir comandos del UI thread
             result_queue: Cola para enviar resultados al UI thread
+            read_only: Abrir en modo solo lectura (para 'list' y 'export')
+            discard: Anotar los clusters liberados para perforarlos (para
+                'delete --discard')
         """
         super().__init__(name='IOThread')
         self.fs_path = fs_path
+        self.read_only = read_only
+        self.discard = discard
         self.command_queue = command_queue
         self.result_queue = result_queue
         self.filesystem = None
@@ -64,11 +73,10 @@ class IOThread(threading.Thread):
 
         Este método se ejecuta en el hilo separado. Abre el filesystem,
         procesa comandos en loop, y cierra el filesystem al terminar.
+        El filesystem se abre con el primer comando que lo necesita
+        ('format' crea la imagen, así que no puede abrirla antes).
         """
         try:
-            # Abrir filesystem (exclusivo de este hilo)
-            self.filesystem = Filesystem(self.fs_path)
-
             # Loop de procesamiento de comandos
             while True:
                 # Esperar comando de la cola (blocking get)
@@ -103,7 +111,8 @@ class IOThread(threading.Thread):
         Ejecuta un comando del filesystem.
 
         Args:
-            cmd: Nombre del comando ('list', 'export', 'import', 'delete')
+            cmd: Nombre del comando ('format', 'list', 'export', 'import', 'copy',
+                'delete', 'mkdir', 'rmdir', 'scrub', 'fsck', 'clone', 'discard')
             args: Argumentos del comando (dict o None)
 
         Returns:
@@ -113,15 +122,43 @@ class IOThread(threading.Thread):
             ValueError: Si el comando no es reconocido
             FiUnamFSError: Si hay error en la operación del filesystem
         """
+        if cmd == 'format':
+            result = format_image(
+                self.fs_path,
+                args['total_clusters'],
+                args['cluster_size'],
+                args['directory_entries'],
+                args['label'],
+                args.get('overwrite', False)
+            )
+            result['status'] = 'success'
+            return result
+
+        if self.filesystem is None:
+            # Abrir filesystem (exclusivo de este hilo)
+            self.filesystem = Filesystem(self.fs_path, read_only=self.read_only,
+                                         discard=self.discard)
+
         if cmd == 'list':
-            result = self.filesystem.list_files()
+            path = (args or {}).get('path', '')
+            result = self.filesystem.list_files(path)
+            result['path'] = path.strip('/')
             result['status'] = 'success'
             return result
 
         elif cmd == 'export':
             result = self.filesystem.export_file(
                 args['filename'],
-                args['dest_path']
+                args['dest_path'],
+                args.get('verify', False)
+            )
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'clone':
+            result = self.filesystem.clone(
+                args['dest_path'],
+                args.get('overwrite', False)
             )
             result['status'] = 'success'
             return result
@@ -129,7 +166,17 @@ class IOThread(threading.Thread):
         elif cmd == 'import':
             result = self.filesystem.import_file(
                 args['src_path'],
-                args.get('filename')
+                args.get('filename'),
+                args.get('dedup', False),
+                args.get('compress')
+            )
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'copy':
+            result = self.filesystem.copy(
+                args['src_name'],
+                args['dst_name']
             )
             result['status'] = 'success'
             return result
@@ -147,9 +194,39 @@ class IOThread(threading.Thread):
             else:
                 # Ejecutar eliminación confirmada
                 result = self.filesystem.delete_file(args['filename'])
+                if self.discard:
+                    # Perforar ya los clusters del archivo eliminado
+                    result.update(self.filesystem.discard_freed())
                 result['status'] = 'success'
                 return result
 
+        elif cmd == 'mkdir':
+            result = self.filesystem.mkdir(args['path'])
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'rmdir':
+            result = self.filesystem.rmdir(args['path'])
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'scrub':
+            result = self.filesystem.scrub(args['workers'])
+            result['filesystem'] = self.fs_path
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'fsck':
+            result = self.filesystem.fsck(args.get('repair', False))
+            result['filesystem'] = self.fs_path
+            result['status'] = 'success'
+            return result
+
+        elif cmd == 'discard':
+            result = self.filesystem.discard_freed(all_free=True)
+            result['status'] = 'success'
+            return result
+
         else:
             raise ValueError(f"Comando no reconocido: {cmd}")
 
@@ -0,0 +1,165 @@
+"""
+Read-ahead secuencial para el montaje FUSE de FiUnamFS
+
+Este módulo detecta lecturas secuenciales por file handle y precarga en
+segundo plano los clusters siguientes en el cache de Filesystem.
+
+Arquitectura:
+- SequentialDetector: Estado por file handle. Decide el tamaño de la
+  ventana de read-ahead (crece al duplicarse en lecturas secuenciales y
+  colapsa a 0 en acceso aleatorio)
+- ReadAheadThread: Hilo worker que consume peticiones de prefetch de una
+  cola (mismo patrón productor-consumidor que IOThread)
+- Si la cola está llena, las peticiones nuevas se descartan: el read-ahead
+  es una optimización y nunca debe bloquear una lectura
+"""
+
+import threading
+import queue
+from typing import Optional, Tuple
+
+
+# Ventana inicial y máxima de read-ahead (en clusters)
+READAHEAD_MIN_CLUSTERS = 4
+READAHEAD_MAX_CLUSTERS = 256
+
+# Peticiones de prefetch pendientes antes de empezar a descartar
+READAHEAD_QUEUE_SIZE = 16
+
+
+class SequentialDetector:
+    """
+    Detecta acceso secuencial en un file handle y ajusta la ventana.
+
+    Atributos:
+        next_offset: Offset donde empezaría la siguiente lectura secuencial
+        window: Ventana actual de read-ahead en clusters (0 = desactivado)
+        prefetched_until: Offset (bytes) hasta donde ya se pidió prefetch
+    """
+
+    def __init__(self):
+        """Inicializa el detector sin historial (sin read-ahead)."""
+        self.next_offset = 0
+        self.window = 0
+        self.prefetched_until = 0
+
+    def record_read(self, offset: int, size: int) -> int:
+        """
+        Registra una lectura y actualiza la ventana.
+
+        Args:
+            offset: Offset de la lectura
+            size: Bytes leídos
+
+        Returns:
+            Ventana de read-ahead resultante en clusters
+        """
+        if offset == self.next_offset and offset > 0:
+            # Secuencial: duplicar la ventana hasta el máximo
+            self.window = min(
+                max(self.window * 2, READAHEAD_MIN_CLUSTERS),
+                READAHEAD_MAX_CLUSTERS
+            )
+        elif offset != self.next_offset:
+            # Aleatorio: colapsar la ventana y olvidar el prefetch previo
+            self.window = 0
+            self.prefetched_until = 0
+
+        self.next_offset = offset + size
+        return self.window
+
+    def next_window(self, file_size: int, cluster_size: int) -> Optional[Tuple[int, int]]:
+        """
+        Calcula el rango de bytes a precargar después de la última lectura.
+
+        Evita pedir de nuevo lo que ya se precargó para este handle.
+
+        Args:
+            file_size: Tamaño actual del archivo
+            cluster_size: Tamaño de cluster en bytes
+
+        Returns:
+            Tupla (offset_inicio, offset_fin) dentro del archivo, o None
+        """
+        if self.window == 0:
+            return None
+
+        start = max(self.next_offset, self.prefetched_until)
+        end = min(self.next_offset + self.window * cluster_size, file_size)
+
+        if start >= end:
+            return None
+
+        self.prefetched_until = end
+        return start, end
+
+
+class ReadAheadThread(threading.Thread):
+    """
+    Hilo que precarga clusters en el cache del filesystem.
+
+    Atributos:
+        filesystem: Instancia de Filesystem cuyo cache se llena
+        request_queue: Cola de peticiones (start_cluster, num_clusters, generation)
+        clusters_prefetched: Total de clusters leídos por adelantado
+    """
+
+    def __init__(self, filesystem):
+        """
+        Inicializa el hilo de read-ahead.
+
+        Args:
+            filesystem: Instancia de Filesystem compartida con el montaje
+        """
+        super().__init__(name='ReadAheadThread', daemon=True)
+        self.filesystem = filesystem
+        self.request_queue = queue.Queue(maxsize=READAHEAD_QUEUE_SIZE)
+        self.clusters_prefetched = 0
+
+    def request(self, start_cluster: int, num_clusters: int, generation: int) -> bool:
+        """
+        Encola una petición de prefetch sin bloquear.
+
+        Args:
+            start_cluster: Cluster inicial a precargar
+            num_clusters: Cantidad de clusters
+            generation: Generación del directorio al hacer la petición
+
+        Returns:
+            True si se encoló, False si la cola estaba llena
+        """
+        try:
+            self.request_queue.put_nowait((start_cluster, num_clusters, generation))
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self) -> None:
+        """Envía la señal de salida al hilo (no bloquea)."""
+        try:
+            self.request_queue.put_nowait(None)
+        except queue.Full:
+            # Vaciar una petición para hacer lugar a la señal de salida
+            try:
+                self.request_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.request_queue.put_nowait(None)
+
+    def run(self):
+        """Loop principal: procesa peticiones hasta recibir None."""
+        while True:
+            request = self.request_queue.get()
+
+            if request is None:
+                break
+
+            start_cluster, num_clusters, generation = request
+
+            try:
+                self.clusters_prefetched += self.filesystem.prefetch(
+                    start_cluster, num_clusters, generation
+                )
+            except Exception:
+                # Un prefetch fallido no afecta a las lecturas reales
+                pass
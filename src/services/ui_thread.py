@@ -24,7 +24,8 @@ def submit_command(command_queue: queue.Queue, cmd: str, args: Optional[Dict] =
 
     Args:
         command_queue: Cola de comandos (UI → I/O)
-        cmd: Nombre del comando ('list', 'export', 'import', 'delete', 'exit')
+        cmd: Nombre del comando ('format', 'list', 'export', 'import', 'copy', 'delete',
+            'mkdir', 'rmdir', 'scrub', 'fsck', 'clone', 'exit')
         args: Argumentos del comando (dict o None)
 
     Ejemplo:
@@ -82,12 +83,26 @@ def display_result(result: Dict) -> None:
         # Determinar tipo de operación por los campos presentes
         if 'files' in result:
             display_list_result(result)
+        elif 'directory' in result:
+            display_directory_result(result)
+        elif 'scrubbed' in result:
+            display_scrub_result(result)
+        elif 'issues' in result:
+            display_fsck_result(result)
+        elif 'clone_path' in result:
+            display_clone_result(result)
         elif 'dest_path' in result:
             display_export_result(result)
+        elif 'src_filename' in result:
+            display_copy_result(result)
         elif 'start_cluster' in result:
             display_import_result(result)
         elif 'freed_clusters' in result:
             display_delete_result(result)
+        elif 'discarded_ranges' in result:
+            display_discard_result(result)
+        elif 'directory_entries' in result:
+            display_format_result(result)
         else:
             print("\n✓ Operación completada exitosamente\n")
 
@@ -107,17 +122,21 @@ def display_list_result(result: Dict) -> None:
     free_space = result['free_space']
 
     print(f"\n{'=' * 80}")
-    print(f"Contenido del filesystem FiUnamFS")
+    if result.get('path'):
+        print(f"Contenido de /{result['path']}")
+    else:
+        print(f"Contenido del filesystem FiUnamFS")
     print(f"{'=' * 80}")
 
     if total_files == 0:
-        print("\nNo hay archivos en el filesystem.")
+        print("\nNo hay archivos en el directorio.")
     else:
         print(f"\n{'Archivo':<16} {'Tamaño':>10}  {'Creado':<20} {'Modificado':<20} {'Cluster':>7}")
         print(f"{'-' * 16} {'-' * 10}  {'-' * 20} {'-' * 20} {'-' * 7}")
 
         for file_info in files:
-            filename = file_info['filename'][:15]
+            # Los subdirectorios se marcan con '/' al final
+            filename = file_info['filename'] + ('/' if file_info.get('is_directory') else '')
             size = file_info['size']
             created = file_info['created']
             modified = file_info['modified']
@@ -136,7 +155,12 @@ def display_export_result(result: Dict) -> None:
     print(f"\n✓ Archivo exportado exitosamente")
     print(f"  Archivo: {result['filename']}")
     print(f"  Tamaño: {result['bytes_copied']:,} bytes ({result['bytes_copied'] / 1024:.2f} KB)")
-    print(f"  Destino: {result['dest_path']}\n")
+    print(f"  Destino: {result['dest_path']}")
+    if result.get('verified'):
+        print(f"  CRC32: verificado")
+    if result.get('sparse_bytes'):
+        print(f"  Huecos: {result['sparse_bytes']:,} bytes en ceros sin escribir")
+    print()
 
 
 def display_import_result(result: Dict) -> None:
@@ -145,7 +169,30 @@ def display_import_result(result: Dict) -> None:
     print(f"  Archivo: {result['filename']}")
     print(f"  Tamaño: {result['bytes_copied']:,} bytes ({result['bytes_copied'] / 1024:.2f} KB)")
     print(f"  Cluster inicial: {result['start_cluster']}")
-    print(f"  Clusters usados: {result['num_clusters']}\n")
+    print(f"  Clusters usados: {result['num_clusters']}")
+    if result.get('extents', 1) > 1:
+        print(f"  Extents: {result['extents']} (sin espacio contiguo suficiente)")
+    if 'checksum' in result:
+        print(f"  CRC32: {result['checksum']:08x}")
+    if result.get('compression'):
+        print(f"  Comprimido ({result['compression']}): {result['bytes_saved']:,} bytes ahorrados")
+    if result.get('deduplicated'):
+        print(f"  Deduplicado: comparte clusters con {result['duplicate_of']} "
+              f"({result['bytes_saved']:,} bytes ahorrados)")
+    print()
+
+
+def display_copy_result(result: Dict) -> None:
+    """Muestra resultado de operación copy."""
+    print(f"\n✓ Archivo copiado exitosamente")
+    print(f"  Origen: {result['src_filename']}")
+    print(f"  Copia: {result['filename']}")
+    print(f"  Tamaño: {result['bytes_copied']:,} bytes ({result['bytes_copied'] / 1024:.2f} KB)")
+    print(f"  Cluster inicial: {result['start_cluster']}")
+    print(f"  Clusters usados: {result['num_clusters']}")
+    if result.get('extents', 1) > 1:
+        print(f"  Extents: {result['extents']} (sin espacio contiguo suficiente)")
+    print()
 
 
 def display_delete_result(result: Dict) -> None:
@@ -153,7 +200,124 @@ def display_delete_result(result: Dict) -> None:
     print(f"\n✓ Archivo eliminado exitosamente")
     print(f"  Archivo: {result['filename']}")
     print(f"  Espacio liberado: {result['freed_bytes']:,} bytes ({result['freed_bytes'] / 1024:.2f} KB)")
-    print(f"  Clusters liberados: {result['freed_clusters']}\n")
+    print(f"  Clusters liberados: {result['freed_clusters']}")
+    if 'discarded_bytes' in result:
+        print(f"  Perforado en la imagen: {result['discarded_bytes']:,} bytes")
+    print()
+
+
+def display_discard_result(result: Dict) -> None:
+    """Muestra resultado de operación discard."""
+    usage_mb = result['disk_usage'] / (1024 * 1024)
+    metodo = "huecos" if result['method'] == 'punch_hole' else "ceros"
+
+    print(f"\n✓ Clusters libres perforados en {result['filesystem']}")
+    if result['discarded_ranges']:
+        print(f"  Perforado: {result['discarded_bytes']:,} bytes en "
+              f"{result['discarded_ranges']} rangos ({metodo}) en {result['elapsed']:.3f} s")
+    print(f"  Espacio en disco de la imagen: {usage_mb:.2f} MB\n")
+
+
+def display_format_result(result: Dict) -> None:
+    """Muestra resultado de operación format."""
+    print(f"\n✓ Imagen creada exitosamente")
+    print(f"  Imagen: {result['filesystem']}")
+    print(f"  Tamaño de cluster: {result['cluster_size']:,} bytes")
+    print(f"  Total de clusters: {result['total_clusters']:,}")
+    print(f"  Entradas de directorio: {result['directory_entries']:,} "
+          f"({result['directory_clusters']:,} clusters)")
+    print(f"  Capacidad: {result['capacity']:,} bytes ({result['capacity'] / (1024 * 1024):.2f} MB)\n")
+
+
+def display_directory_result(result: Dict) -> None:
+    """Muestra resultado de operaciones mkdir y rmdir."""
+    if 'entries' in result:
+        print(f"\n✓ Directorio creado exitosamente")
+        print(f"  Directorio: {result['directory']}")
+        print(f"  Entradas: {result['entries']}")
+        print(f"  Cluster inicial: {result['start_cluster']}\n")
+    else:
+        print(f"\n✓ Directorio eliminado exitosamente")
+        print(f"  Directorio: {result['directory']}")
+        print(f"  Clusters liberados: {result['freed_clusters']}\n")
+
+
+def display_scrub_result(result: Dict) -> None:
+    """Muestra resultado de operación scrub."""
+    elapsed = result['elapsed']
+    mb = result['bytes_verified'] / (1024 * 1024)
+
+    if result['corrupted']:
+        print(f"\n❌ Archivos dañados en {result['filesystem']}")
+        for item in result['corrupted']:
+            print(f"  {item['filename']}: CRC32 esperado {item['expected']:08x}, "
+                  f"calculado {item['actual']:08x}")
+    else:
+        print(f"\n✓ Sin archivos dañados en {result['filesystem']}")
+
+    print(f"  Archivos verificados: {result['scrubbed']}")
+    if result['unchecked']:
+        print(f"  Sin CRC32 (no verificados): {result['unchecked']}")
+    print(f"  Datos leídos: {mb:.2f} MB en {elapsed:.3f} s "
+          f"({result['throughput'] / (1024 * 1024):.1f} MB/s)\n")
+
+
+def display_clone_result(result: Dict) -> None:
+    """Muestra resultado de operación clone."""
+    image_mb = result['image_size'] / (1024 * 1024)
+
+    print(f"\n✓ Imagen copiada exitosamente")
+    print(f"  Origen: {result['filesystem']}")
+    print(f"  Copia: {result['clone_path']}")
+    print(f"  Tamaño de la imagen: {image_mb:.2f} MB")
+    print(f"  Datos leídos: {result['bytes_read']:,} bytes")
+    print(f"  Datos escritos: {result['bytes_written']:,} bytes "
+          f"(el resto queda como huecos) en {result['elapsed']:.3f} s\n")
+
+
+def display_fsck_result(result: Dict) -> None:
+    """Muestra resultado de operación fsck."""
+    if result['errors']:
+        print(f"\n❌ {result['errors']} errores en {result['filesystem']}")
+    else:
+        print(f"\n✓ Sin errores en {result['filesystem']}")
+
+    for issue in result['issues']:
+        estado = " (reparado)" if issue['repaired'] else ""
+        print(f"  [{issue['kind']}] {issue['path']}: {issue['detail']}{estado}")
+
+    print(f"  Entradas revisadas: {result['entries_checked']}")
+    if result['repaired']:
+        print(f"  Errores reparados: {result['repaired']}")
+    print()
+
+
+def format_fsck_line(result: Dict) -> str:
+    """
+    Resume el resultado de fsck en una línea (modo batch).
+
+    Args:
+        result: Resultado de fsck (o de error al abrir la imagen)
+
+    Returns:
+        Línea 'imagen: estado'
+    """
+    if result.get('status') == 'error':
+        return f"{result.get('filesystem', '?')}: ERROR {result.get('error_type', 'Error')}"
+
+    if not result['issues']:
+        return f"{result['filesystem']}: OK"
+
+    counts: Dict[str, int] = {}
+    for issue in result['issues']:
+        if not issue['repaired']:
+            counts[issue['kind']] = counts.get(issue['kind'], 0) + 1
+
+    status = 'ERRORES' if counts else 'REPARADO'
+    detail = ', '.join(f"{kind}={n}" for kind, n in sorted(counts.items()))
+    if result['repaired']:
+        detail = ', '.join(filter(None, [detail, f"reparados={result['repaired']}"]))
+    return f"{result['filesystem']}: {status} {detail}"
 
 
 def display_error_result(result: Dict) -> None:
@@ -5,7 +5,7 @@ Define la jerarquía de excepciones específicas del filesystem
 para manejo de errores más preciso y mensajes informativos.
 """
 
-from typing import List, Optional
+from typing import Callable, List, Optional, Union
 
 
 class FiUnamFSError(Exception):
@@ -38,27 +38,38 @@ class FileNotFoundInFilesystemError(FiUnamFSError):
     """
     Error cuando un archivo no existe en el filesystem.
 
-    Incluye lista de archivos disponibles para ayudar al usuario.
+    Incluye lista de archivos disponibles para ayudar al usuario. La
+    lista puede darse como una función sin argumentos que la construye:
+    solo se llama al leer archivos_disponibles o el mensaje, así que una
+    búsqueda fallida que se atrapa (e.g., ENOENT en FUSE) no la paga.
     """
 
-    def __init__(self, nombre_archivo: str, archivos_disponibles: Optional[List[str]] = None):
+    def __init__(self, nombre_archivo: str,
+                 archivos_disponibles: Union[None, List[str], Callable[[], List[str]]] = None):
         self.nombre_archivo = nombre_archivo
-        self.archivos_disponibles = archivos_disponibles or []
+        self._archivos_disponibles = archivos_disponibles
+        super().__init__(nombre_archivo)
 
+    @property
+    def archivos_disponibles(self) -> List[str]:
+        """Archivos del directorio donde se buscó (se construye una vez)."""
+        if callable(self._archivos_disponibles):
+            self._archivos_disponibles = self._archivos_disponibles()
+        return self._archivos_disponibles or []
+
+    def __str__(self) -> str:
         if self.archivos_disponibles:
-            mensaje = (
-                f"Archivo '{nombre_archivo}' no encontrado en el filesystem.\n"
+            return (
+                f"Archivo '{self.nombre_archivo}' no encontrado en el filesystem.\n"
                 f"Archivos disponibles: {', '.join(self.archivos_disponibles)}"
             )
-        else:
-            mensaje = f"Archivo '{nombre_archivo}' no encontrado en el filesystem (filesystem vacío)"
-
-        super().__init__(mensaje)
+        return f"Archivo '{self.nombre_archivo}' no encontrado en el filesystem (filesystem vacío)"
 
 
 class NoSpaceError(FiUnamFSError):
     """
-    Error cuando no hay espacio contiguo suficiente en el filesystem.
+    Error cuando no hay espacio suficiente en el filesystem (contiguo, o
+    libre en total para un archivo fragmentado).
 
     Incluye información sobre espacio necesario vs disponible.
     """
@@ -76,7 +87,7 @@ class NoSpaceError(FiUnamFSError):
         self.clusters_disponibles = clusters_disponibles
 
         mensaje = (
-            f"No hay espacio contiguo suficiente en el filesystem.\n"
+            f"No hay espacio suficiente en el filesystem.\n"
             f"Necesario: {bytes_necesarios} bytes ({clusters_necesarios} clusters)\n"
             f"Disponible: {bytes_disponibles} bytes ({clusters_disponibles} clusters)\n"
             f"Sugerencia: Elimina algunos archivos para liberar espacio contiguo"
@@ -105,20 +116,92 @@ class FilenameConflictError(FiUnamFSError):
 
 class DirectoryFullError(FiUnamFSError):
     """
-    Error cuando el directorio está lleno (64 archivos máximo).
+    Error cuando el directorio está lleno (64 archivos máximo en 26-1/26-2).
 
     Se lanza cuando se intenta importar un archivo y no hay entradas
     de directorio disponibles.
     """
 
-    def __init__(self):
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
         mensaje = (
-            "El directorio está lleno (máximo 64 archivos).\n"
+            f"El directorio está lleno (máximo {max_entries} archivos).\n"
             "Sugerencia: Elimina algunos archivos antes de importar nuevos"
         )
         super().__init__(mensaje)
 
 
+class EntryTypeError(FiUnamFSError):
+    """
+    Error cuando una ruta es de un tipo distinto al que pide la operación.
+
+    Se lanza al usar un directorio como archivo (exportar, eliminar con
+    delete) o un archivo como directorio (rmdir, listar, ruta padre).
+    """
+
+    def __init__(self, ruta: str, es_directorio: bool):
+        self.ruta = ruta
+        self.es_directorio = es_directorio
+
+        if es_directorio:
+            mensaje = f"'{ruta}' es un directorio"
+        else:
+            mensaje = f"'{ruta}' no es un directorio"
+
+        super().__init__(mensaje)
+
+
+class DirectoryNotEmptyError(FiUnamFSError):
+    """
+    Error cuando se intenta eliminar un directorio que tiene entradas.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        mensaje = (
+            f"El directorio '{ruta}' no está vacío.\n"
+            "Sugerencia: Elimina primero su contenido"
+        )
+        super().__init__(mensaje)
+
+
+class ChecksumError(FiUnamFSError):
+    """
+    Error cuando el contenido de un archivo no coincide con su CRC32.
+
+    Se lanza al exportar con verificación si los datos leídos de la
+    imagen están dañados.
+    """
+
+    def __init__(self, nombre_archivo: str, esperado: int, calculado: int):
+        self.nombre_archivo = nombre_archivo
+        self.esperado = esperado
+        self.calculado = calculado
+
+        mensaje = (
+            f"El archivo '{nombre_archivo}' está dañado: CRC32 esperado "
+            f"{esperado:08x}, calculado {calculado:08x}"
+        )
+        super().__init__(mensaje)
+
+
+class CompressionError(FiUnamFSError):
+    """
+    Error cuando el contenido comprimido de un archivo no se puede
+    descomprimir.
+
+    Se lanza al leer o exportar un archivo con FLAG_COMPRESSED cuyos datos
+    en la imagen están dañados.
+    """
+
+    def __init__(self, nombre_archivo: str, razon: str):
+        self.nombre_archivo = nombre_archivo
+        self.razon = razon
+
+        mensaje = f"El archivo comprimido '{nombre_archivo}' está dañado: {razon}"
+        super().__init__(mensaje)
+
+
 class InvalidFilenameError(FiUnamFSError):
     """
     Error cuando un nombre de archivo no cumple con los requisitos.
@@ -136,3 +219,21 @@ class InvalidFilenameError(FiUnamFSError):
         mensaje = f"Nombre de archivo inválido '{nombre_archivo}': {razon}"
 
         super().__init__(mensaje)
+
+
+class ReadOnlyFilesystemError(FiUnamFSError):
+    """
+    Error cuando se intenta modificar un filesystem abierto en solo lectura.
+
+    Se lanza desde cualquier operación de escritura de un Filesystem
+    abierto con read_only=True (e.g., montaje con -o ro).
+    """
+
+    def __init__(self, fs_path: str):
+        self.fs_path = fs_path
+
+        mensaje = (
+            f"El filesystem '{fs_path}' está abierto en modo solo lectura.\n"
+            f"Sugerencia: Ábrelo sin modo solo lectura para modificarlo"
+        )
+        super().__init__(mensaje)
@@ -0,0 +1,156 @@
+"""
+Bloqueo advisory de la imagen FiUnamFS entre procesos
+
+Coordina a varios procesos (CLI, montaje FUSE) que abren la misma imagen:
+- Lectores: bloqueo compartido (varios a la vez)
+- Escritores: bloqueo exclusivo, solo durante la ventana corta en que
+  leen el directorio, asignan clusters y escriben entradas
+
+Usa fcntl.flock(), que es advisory: solo protege entre procesos que usan
+este mismo módulo. En plataformas sin fcntl (Windows) los bloqueos son
+no-op y el comportamiento es el de antes (un solo proceso a la vez).
+"""
+
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Modos de bloqueo
+LOCK_SHARED = 'shared'
+LOCK_EXCLUSIVE = 'exclusive'
+
+
+def locking_available() -> bool:
+    """
+    Indica si la plataforma soporta bloqueos advisory.
+
+    Returns:
+        True si fcntl está disponible
+    """
+    return fcntl is not None
+
+
+class ImageLock:
+    """
+    Bloqueo advisory anidable sobre el descriptor de una imagen.
+
+    Las adquisiciones se anidan: el modo efectivo es exclusivo mientras
+    haya alguna exclusiva activa, compartido si solo hay compartidas, y
+    sin bloqueo cuando no hay ninguna. Solo se llama a flock() cuando el
+    modo efectivo cambia. Pasar de compartido a exclusivo no es atómico
+    (flock libera y vuelve a bloquear), por lo que quien obtiene el modo
+    exclusivo debe releer el estado que le interese.
+
+    No es thread-safe por sí mismo: Filesystem lo usa bajo su RLock.
+
+    Atributos:
+        fd: Descriptor de archivo de la imagen
+        shared_depth: Adquisiciones compartidas activas
+        exclusive_depth: Adquisiciones exclusivas activas
+    """
+
+    def __init__(self, fd: int):
+        """
+        Inicializa el bloqueo sin adquirirlo.
+
+        Args:
+            fd: Descriptor de archivo de la imagen abierta
+        """
+        self.fd = fd
+        self.shared_depth = 0
+        self.exclusive_depth = 0
+
+    @property
+    def mode(self) -> Optional[str]:
+        """Modo efectivo actual (LOCK_SHARED, LOCK_EXCLUSIVE o None)."""
+        if self.exclusive_depth:
+            return LOCK_EXCLUSIVE
+        if self.shared_depth:
+            return LOCK_SHARED
+        return None
+
+    def _apply(self, mode: Optional[str]) -> None:
+        """
+        Aplica un modo con flock() (bloquea hasta obtenerlo).
+
+        Args:
+            mode: Modo a aplicar (None = liberar)
+        """
+        if fcntl is None:
+            return
+
+        if mode == LOCK_EXCLUSIVE:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        elif mode == LOCK_SHARED:
+            fcntl.flock(self.fd, fcntl.LOCK_SH)
+        else:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def acquire(self, exclusive: bool) -> bool:
+        """
+        Adquiere el bloqueo en el modo indicado.
+
+        Args:
+            exclusive: True para exclusivo, False para compartido
+
+        Returns:
+            True si el modo efectivo cambió (se llamó a flock)
+        """
+        before = self.mode
+
+        if exclusive:
+            self.exclusive_depth += 1
+        else:
+            self.shared_depth += 1
+
+        if self.mode != before:
+            try:
+                self._apply(self.mode)
+            except BaseException:
+                if exclusive:
+                    self.exclusive_depth -= 1
+                else:
+                    self.shared_depth -= 1
+                raise
+            return True
+
+        return False
+
+    def release(self, exclusive: bool) -> None:
+        """
+        Libera una adquisición hecha con acquire().
+
+        Args:
+            exclusive: El mismo valor que se pasó a acquire()
+        """
+        before = self.mode
+
+        if exclusive:
+            self.exclusive_depth -= 1
+        else:
+            self.shared_depth -= 1
+
+        if self.mode != before:
+            self._apply(self.mode)
+
+    @contextmanager
+    def hold(self, exclusive: bool):
+        """
+        Context manager que adquiere y libera el bloqueo.
+
+        Args:
+            exclusive: True para exclusivo, False para compartido
+
+        Yields:
+            True si el modo efectivo cambió al adquirir
+        """
+        changed = self.acquire(exclusive)
+        try:
+            yield changed
+        finally:
+            self.release(exclusive)
@@ -0,0 +1,212 @@
+"""
+Métricas de operaciones para FiUnamFS
+
+Acumula, por operación, el número de llamadas, errores, bytes transferidos
+y un histograma de latencias. Lo usa el montaje FUSE para exponer el
+archivo virtual /.fiunamfs_stats y el volcado JSON al desmontar.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Dict, List
+
+
+# Límites superiores de los buckets del histograma (en segundos)
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005,
+    0.001, 0.005, 0.01, 0.05,
+    0.1, 0.5, 1.0,
+)
+
+
+def _bucket_label(limite: float) -> str:
+    """
+    Genera la etiqueta legible de un bucket del histograma.
+
+    Args:
+        limite: Límite superior del bucket en segundos
+
+    Returns:
+        Etiqueta como '<=100us', '<=5ms' o '<=1s'
+    """
+    if limite < 0.001:
+        return f"<={limite * 1_000_000:g}us"
+    if limite < 1.0:
+        return f"<={limite * 1000:g}ms"
+    return f"<={limite:g}s"
+
+
+BUCKET_LABELS = [_bucket_label(limite) for limite in LATENCY_BUCKETS] + ['>1s']
+
+
+def estimate_size(obj, _seen=None) -> int:
+    """
+    Estima la memoria ocupada por una estructura y todo lo que contiene.
+
+    Recorre diccionarios, listas, tuplas (incluidas NamedTuple), conjuntos
+    y atributos de objetos; cada objeto se cuenta una sola vez aunque esté
+    referenciado desde varios lugares.
+
+    Args:
+        obj: Estructura a medir
+
+    Returns:
+        Tamaño aproximado en bytes
+    """
+    if _seen is None:
+        _seen = set()
+
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += estimate_size(vars(obj), _seen)
+
+    return size
+
+
+class OperationStats:
+    """
+    Estadísticas acumuladas de una operación.
+
+    Atributos:
+        calls: Número de llamadas
+        errors: Llamadas que terminaron en error
+        bytes: Bytes transferidos (lecturas y escrituras)
+        total_time: Tiempo total acumulado en segundos
+        max_time: Latencia máxima observada en segundos
+        histogram: Conteo de llamadas por bucket de latencia
+    """
+
+    def __init__(self):
+        """Inicializa las estadísticas en cero."""
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram: List[int] = [0] * len(BUCKET_LABELS)
+
+    def record(self, elapsed: float, nbytes: int, error: bool) -> None:
+        """
+        Registra una llamada.
+
+        Args:
+            elapsed: Duración en segundos
+            nbytes: Bytes transferidos
+            error: True si la llamada falló
+        """
+        self.calls += 1
+        self.bytes += nbytes
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+        if error:
+            self.errors += 1
+
+        for i, limite in enumerate(LATENCY_BUCKETS):
+            if elapsed <= limite:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def to_dict(self) -> dict:
+        """
+        Convierte las estadísticas a diccionario serializable.
+
+        Returns:
+            Diccionario con contadores, latencias en microsegundos e histograma
+        """
+        avg = self.total_time / self.calls if self.calls else 0.0
+
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'avg_us': round(avg * 1_000_000, 1),
+            'max_us': round(self.max_time * 1_000_000, 1),
+            'histogram': {
+                label: count
+                for label, count in zip(BUCKET_LABELS, self.histogram)
+                if count
+            }
+        }
+
+
+class OperationMetrics:
+    """
+    Registro de métricas de todas las operaciones (thread-safe).
+
+    Atributos:
+        started: Tiempo Unix en que se empezaron a registrar métricas
+        operations: Diccionario {nombre_operación: OperationStats}
+    """
+
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self.started = time.time()
+        self.operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, elapsed: float, nbytes: int = 0, error: bool = False) -> None:
+        """
+        Registra una llamada a una operación.
+
+        Args:
+            operation: Nombre de la operación (e.g., 'read', 'getattr')
+            elapsed: Duración en segundos
+            nbytes: Bytes transferidos (default: 0)
+            error: True si la llamada falló (default: False)
+        """
+        with self._lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = self.operations[operation] = OperationStats()
+            stats.record(elapsed, nbytes, error)
+
+    def snapshot(self, **extra) -> dict:
+        """
+        Genera una fotografía de las métricas actuales.
+
+        Args:
+            **extra: Secciones adicionales a incluir (e.g., cache=...)
+
+        Returns:
+            Diccionario con uptime, operaciones (orden alfabético) y extras
+        """
+        with self._lock:
+            operations = {
+                name: self.operations[name].to_dict()
+                for name in sorted(self.operations)
+            }
+
+        result = {
+            'uptime_s': round(time.time() - self.started, 3),
+            'operations': operations,
+        }
+        result.update(extra)
+        return result
+
+    def to_json(self, **extra) -> bytes:
+        """
+        Serializa la fotografía de métricas a JSON.
+
+        Args:
+            **extra: Secciones adicionales a incluir
+
+        Returns:
+            JSON codificado en UTF-8 (con salto de línea final)
+        """
+        return (json.dumps(self.snapshot(**extra), indent=2) + '\n').encode('utf-8')
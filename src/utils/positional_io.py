@@ -0,0 +1,188 @@
+"""
+E/S posicional sobre descriptores de archivo
+
+Envuelve os.pread/os.pwrite y sus variantes vectoriales (preadv/pwritev):
+leen y escriben en una posición absoluta sin mover el offset del
+descriptor, así que varios hilos pueden usar el mismo descriptor sin
+coordinarse por el offset.
+
+En plataformas sin E/S posicional (Windows) se emula con lseek + read/write
+bajo un lock del módulo; el resultado es el mismo, solo que serializado.
+"""
+
+import os
+import threading
+from typing import List, Sequence
+
+
+# Lock de la emulación con lseek (solo se usa si falta os.pread)
+_seek_lock = threading.Lock()
+
+HAS_PREAD = hasattr(os, 'pread')
+HAS_PREADV = hasattr(os, 'preadv')
+HAS_PWRITEV = hasattr(os, 'pwritev')
+
+# Máximo de buffers por llamada vectorial (IOV_MAX del sistema)
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = -1
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+def pread(fd: int, size: int, offset: int) -> bytes:
+    """
+    Lee size bytes desde offset (menos si se alcanza el fin del archivo).
+
+    Args:
+        fd: Descriptor de archivo
+        size: Bytes a leer
+        offset: Posición absoluta
+
+    Returns:
+        Bytes leídos
+    """
+    if HAS_PREAD:
+        chunks = []
+        while size > 0:
+            data = os.pread(fd, size, offset)
+            if not data:
+                break
+            chunks.append(data)
+            size -= len(data)
+            offset += len(data)
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        chunks = []
+        while size > 0:
+            data = os.read(fd, size)
+            if not data:
+                break
+            chunks.append(data)
+            size -= len(data)
+        return b''.join(chunks)
+
+
+def pwrite(fd: int, data, offset: int) -> int:
+    """
+    Escribe todos los bytes de data en offset.
+
+    Args:
+        fd: Descriptor de archivo
+        data: Bytes (o bytes-like) a escribir
+        offset: Posición absoluta
+
+    Returns:
+        Bytes escritos (siempre len(data))
+    """
+    view = memoryview(data)
+    total = len(view)
+
+    if HAS_PREAD:
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+        return total
+
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        return total
+
+
+def preadv(fd: int, buffers: Sequence[bytearray], offset: int) -> int:
+    """
+    Llena varios buffers con una lectura contigua desde offset.
+
+    Args:
+        fd: Descriptor de archivo
+        buffers: Buffers mutables a llenar, en orden
+        offset: Posición absoluta del primer buffer
+
+    Returns:
+        Bytes leídos en total (menos que la suma de los buffers si se
+        alcanzó el fin del archivo)
+    """
+    if not HAS_PREADV:
+        data = pread(fd, sum(len(b) for b in buffers), offset)
+        pos = 0
+        for buf in buffers:
+            piece = data[pos:pos + len(buf)]
+            buf[:len(piece)] = piece
+            pos += len(buf)
+        return len(data)
+
+    total = 0
+    for i in range(0, len(buffers), IOV_MAX):
+        group = list(buffers[i:i + IOV_MAX])
+        expected = sum(len(b) for b in group)
+        n = os.preadv(fd, group, offset + total)
+        total += n
+        if n < expected:
+            # Lectura corta: completar con pread (o fin del archivo)
+            rest = pread(fd, expected - n, offset + total)
+            if rest:
+                _scatter(group, n, rest)
+                total += len(rest)
+            if n + len(rest) < expected:
+                break
+
+    return total
+
+
+def _scatter(buffers: List[bytearray], skip: int, data: bytes) -> None:
+    """
+    Copia data en los buffers a partir del byte skip del grupo.
+
+    Args:
+        buffers: Buffers del grupo
+        skip: Bytes del grupo ya llenos
+        data: Datos a repartir
+    """
+    pos = 0
+    for buf in buffers:
+        if skip >= len(buf):
+            skip -= len(buf)
+            continue
+        n = min(len(buf) - skip, len(data) - pos)
+        buf[skip:skip + n] = data[pos:pos + n]
+        pos += n
+        skip = 0
+        if pos >= len(data):
+            break
+
+
+def pwritev(fd: int, buffers: Sequence, offset: int) -> int:
+    """
+    Escribe varios buffers de forma contigua a partir de offset.
+
+    Evita concatenar los buffers en memoria antes de escribir.
+
+    Args:
+        fd: Descriptor de archivo
+        buffers: Buffers (bytes-like) a escribir, en orden
+        offset: Posición absoluta del primer buffer
+
+    Returns:
+        Bytes escritos en total
+    """
+    if not HAS_PWRITEV:
+        return pwrite(fd, b''.join(buffers), offset)
+
+    total = 0
+    for i in range(0, len(buffers), IOV_MAX):
+        group = list(buffers[i:i + IOV_MAX])
+        expected = sum(len(b) for b in group)
+        n = os.pwritev(fd, group, offset + total)
+        if n < expected:
+            # Escritura parcial: terminar el resto del grupo con pwrite
+            pwrite(fd, b''.join(group)[n:], offset + total + n)
+        total += expected
+
+    return total
@@ -0,0 +1,260 @@
+"""
+Escritura de archivos dispersos (sparse)
+
+Al exportar un archivo o copiar una imagen, los bloques que solo contienen
+ceros no se escriben: el destino avanza sobre ellos con seek y el sistema
+de archivos los deja como huecos, que no ocupan espacio en disco y se leen
+como ceros.
+
+Para leer una imagen que ya es dispersa (format_image() la crea así) se
+usan SEEK_DATA/SEEK_HOLE: solo se leen los rangos con datos. En
+plataformas o sistemas de archivos sin soporte se lee todo el archivo.
+
+Los clusters que se liberan en una imagen se pueden devolver al sistema
+de archivos del host con discard_range(): fallocate(FALLOC_FL_PUNCH_HOLE)
+los convierte en huecos. Donde no existe (otros sistemas operativos, o
+sistemas de archivos sin soporte) el rango se llena con ceros: la imagen
+no se reduce, pero clone() y cualquier copia dispersa lo omiten.
+"""
+
+import ctypes
+import errno
+import os
+import stat
+import sys
+from typing import Iterator, Tuple
+
+from . import positional_io
+
+
+# Bloque mínimo que se deja como hueco si el destino no indica el suyo
+DEFAULT_BLOCK_SIZE = 4096
+
+HAS_SEEK_DATA = hasattr(os, 'SEEK_DATA') and hasattr(os, 'SEEK_HOLE')
+
+# Modos de fallocate(2) (linux/falloc.h)
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+
+# Métodos con que discard_range() libera un rango
+DISCARD_PUNCH_HOLE = 'punch_hole'
+DISCARD_ZERO_FILL = 'zero_fill'
+
+# Bytes en ceros que se escriben por llamada al no poder perforar
+ZERO_FILL_CHUNK = 1024 * 1024
+
+# fallocate() de la libc (None = aún no se buscó, False = no disponible)
+_fallocate = None
+
+
+def data_ranges(fd: int, size: int, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    Rangos de un archivo que contienen datos (los huecos se omiten).
+
+    Args:
+        fd: Descriptor del archivo
+        size: Fin del recorrido (el tamaño del archivo para recorrerlo
+            completo)
+        start: Offset donde empieza el recorrido (default: 0)
+
+    Yields:
+        Tuplas (inicio, fin) en orden; un solo rango (start, size) si el
+        sistema de archivos no informa sus huecos
+    """
+    if not HAS_SEEK_DATA:
+        if start < size:
+            yield start, size
+        return
+
+    offset = start
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                # No hay más datos hasta el final
+                return
+            if offset == start:
+                # SEEK_DATA no soportado: todo el rango son datos
+                yield start, size
+                return
+            raise
+
+        if start >= size:
+            return
+
+        end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+        yield start, end
+        offset = end
+
+
+def _libc_fallocate():
+    """
+    Busca fallocate() en la libc (solo Linux; se busca una vez).
+
+    Returns:
+        Función de ctypes, o None si no está disponible
+    """
+    global _fallocate
+
+    if _fallocate is None:
+        _fallocate = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                # fallocate64 recibe offsets de 64 bits también en 32 bits
+                func = getattr(libc, 'fallocate64', None) or libc.fallocate
+            except (OSError, AttributeError):
+                func = None
+            if func is not None:
+                func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+                func.restype = ctypes.c_int
+                _fallocate = func
+
+    return _fallocate or None
+
+
+def discard_range(fd: int, offset: int, length: int) -> str:
+    """
+    Libera un rango de un archivo: queda leyéndose como ceros.
+
+    Primero intenta perforarlo (FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE:
+    el tamaño del archivo no cambia y el host recupera los bloques
+    completos del rango). Si el sistema operativo o el sistema de archivos
+    no lo soportan, escribe ceros solo sobre las partes del rango que
+    tienen datos, sin asignar los huecos que ya había.
+
+    Args:
+        fd: Descriptor del archivo (abierto para escritura)
+        offset: Offset inicial en bytes
+        length: Bytes del rango
+
+    Returns:
+        DISCARD_PUNCH_HOLE o DISCARD_ZERO_FILL
+
+    Raises:
+        OSError: Si falla la escritura (o fallocate() por otro motivo que
+            la falta de soporte)
+    """
+    func = _libc_fallocate()
+    if func is not None:
+        if func(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length) == 0:
+            return DISCARD_PUNCH_HOLE
+        err = ctypes.get_errno()
+        if err not in (errno.EOPNOTSUPP, errno.ENOSYS):
+            raise OSError(err, os.strerror(err))
+
+    zeros = bytes(min(length, ZERO_FILL_CHUNK))
+    for start, end in data_ranges(fd, offset + length, offset):
+        for pos in range(start, end, ZERO_FILL_CHUNK):
+            positional_io.pwrite(fd, zeros[:min(ZERO_FILL_CHUNK, end - pos)], pos)
+
+    return DISCARD_ZERO_FILL
+
+
+class SparseWriter:
+    """
+    Escribe un flujo de datos dejando como huecos los bloques en ceros.
+
+    Un bloque se omite solo si está completo (alineado a block_size desde
+    el inicio del archivo) y todos sus bytes son cero; un bloque partido
+    entre dos llamadas a write() se completa con la siguiente. Si el
+    destino no es un archivo regular (e.g., una tubería) todo se escribe
+    normalmente.
+
+    Atributos:
+        f: Archivo destino (binario, abierto para escritura desde el inicio)
+        block_size: Tamaño de bloque del destino
+        sparse: True si se pueden dejar huecos
+        position: Bytes del flujo procesados
+        skipped: Bytes que quedaron como huecos
+    """
+
+    def __init__(self, f, block_size: int = 0):
+        """
+        Prepara la escritura en un archivo abierto.
+
+        Args:
+            f: Archivo destino abierto en modo binario
+            block_size: Tamaño de bloque (default: st_blksize del destino)
+        """
+        st = os.fstat(f.fileno())
+
+        self.f = f
+        self.block_size = block_size or getattr(st, 'st_blksize', 0) or DEFAULT_BLOCK_SIZE
+        self.sparse = stat.S_ISREG(st.st_mode) and f.seekable()
+        self.position = 0
+        self.skipped = 0
+        self._zeros = bytes(self.block_size)
+        self._tail = b''  # Bloque incompleto pendiente de la llamada anterior
+
+    def write(self, data) -> None:
+        """
+        Escribe el siguiente tramo del flujo.
+
+        Los bytes no nulos consecutivos se escriben con una sola llamada.
+
+        Args:
+            data: Bytes (o bytes-like) del flujo
+        """
+        self.position += len(data)
+
+        if not self.sparse:
+            self.f.write(data)
+            return
+
+        data = self._tail + bytes(data) if self._tail else bytes(data)
+        block = self.block_size
+        full = len(data) - len(data) % block
+        pending = 0  # Inicio de los bytes aún no escritos
+
+        for pos in range(0, full, block):
+            if data.startswith(self._zeros, pos):
+                if pending < pos:
+                    self.f.write(data[pending:pos])
+                self.f.seek(block, os.SEEK_CUR)
+                self.skipped += block
+                pending = pos + block
+
+        if pending < full:
+            self.f.write(data[pending:full])
+        self._tail = data[full:]
+
+    def skip_to(self, offset: int) -> None:
+        """
+        Avanza hasta offset sin escribir (el tramo queda como hueco).
+
+        Args:
+            offset: Posición absoluta en el destino (>= position)
+        """
+        gap = offset - self.position
+        if gap <= 0:
+            return
+
+        if self.sparse:
+            self._flush_tail()
+            self.f.seek(gap, os.SEEK_CUR)
+            self.skipped += gap
+        else:
+            while gap > 0:
+                self.f.write(self._zeros[:gap])
+                gap -= min(gap, self.block_size)
+        self.position = offset
+
+    def finish(self) -> None:
+        """
+        Escribe lo pendiente y fija el tamaño final del destino.
+
+        Si el flujo termina en un hueco, el archivo se extiende hasta
+        position (seek más allá del final no cambia el tamaño).
+        """
+        if self.sparse:
+            self._flush_tail()
+            self.f.flush()
+            self.f.truncate(self.position)
+
+    def _flush_tail(self) -> None:
+        """Escribe el bloque incompleto pendiente, si hay."""
+        if self._tail:
+            self.f.write(self._tail)
+            self._tail = b''
@@ -42,44 +42,58 @@ def validar_nombre_archivo(nombre: str) -> None:
     if '/' in nombre or '\\' in nombre:
         raise ValueError(
             f"El nombre de archivo '{nombre}' no puede contener separadores "
-            "de ruta (/ o \\). FiUnamFS usa estructura plana de directorios"
+            "de ruta (/ o \\). Las rutas se separan en componentes antes de validarlos"
         )
 
 
-def validar_cluster(numero_cluster: int, es_dato: bool = True) -> None:
+# Tamaño máximo representable en el campo file_size (uint32)
+MAX_FILE_SIZE = 0xFFFFFFFF
+
+
+def validar_cluster(numero_cluster: int, es_dato: bool = True,
+                    total_clusters: int = 1440, primer_cluster_datos: int = 5) -> None:
     """
     Valida que un número de cluster esté en el rango válido.
 
+    Los valores por defecto corresponden a la geometría de 26-1/26-2;
+    para imágenes 26-3 se pasan los del superblock.
+
     Args:
         numero_cluster: Número de cluster a validar
-        es_dato: True si el cluster debe ser de datos (5-1439),
-                False si puede ser cualquier cluster (0-1439)
+        es_dato: True si el cluster debe ser de datos (de
+                primer_cluster_datos a total_clusters - 1), False si puede
+                ser cualquier cluster (de 0 a total_clusters - 1)
+        total_clusters: Total de clusters de la imagen
+        primer_cluster_datos: Primer cluster del área de datos
 
     Raises:
         ValueError: Si el número de cluster está fuera de rango
     """
+    ultimo = total_clusters - 1
     if es_dato:
-        # Clusters de datos: 5 a 1439 (0-4 están reservados)
-        if numero_cluster < 5 or numero_cluster >= 1440:
+        # Clusters de datos: los anteriores están reservados
+        if numero_cluster < primer_cluster_datos or numero_cluster >= total_clusters:
             raise ValueError(
                 f"Número de cluster {numero_cluster} fuera de rango. "
-                "Los clusters de datos deben estar entre 5 y 1439"
+                f"Los clusters de datos deben estar entre {primer_cluster_datos} y {ultimo}"
             )
     else:
-        # Cualquier cluster válido: 0 a 1439
-        if numero_cluster < 0 or numero_cluster >= 1440:
+        # Cualquier cluster válido
+        if numero_cluster < 0 or numero_cluster >= total_clusters:
             raise ValueError(
                 f"Número de cluster {numero_cluster} fuera de rango. "
-                "Los clusters válidos están entre 0 y 1439"
+                f"Los clusters válidos están entre 0 y {ultimo}"
             )
 
 
-def validar_tamanio_archivo(tamanio: int) -> None:
+def validar_tamanio_archivo(tamanio: int, capacidad_maxima: int = 1435 * 1024) -> None:
     """
     Valida que el tamaño de un archivo sea válido para FiUnamFS.
 
     Args:
         tamanio: Tamaño en bytes
+        capacidad_maxima: Bytes del área de datos (default: 1435 clusters ×
+            1024 bytes, la capacidad de 26-1/26-2)
 
     Raises:
         ValueError: Si el tamaño es negativo o excede la capacidad del filesystem
@@ -87,9 +101,8 @@ def validar_tamanio_archivo(tamanio: int) -> None:
     if tamanio < 0:
         raise ValueError(f"El tamaño de archivo no puede ser negativo: {tamanio}")
 
-    # Capacidad máxima: 1435 clusters × 1024 bytes = 1,469,440 bytes
-    # (clusters 5-1439, ya que 0-4 están reservados)
-    capacidad_maxima = 1435 * 1024
+    # El tamaño se guarda en un uint32 aunque la imagen sea más grande
+    capacidad_maxima = min(capacidad_maxima, MAX_FILE_SIZE)
 
     if tamanio > capacidad_maxima:
         raise ValueError(
@@ -98,24 +111,28 @@ def validar_tamanio_archivo(tamanio: int) -> None:
         )
 
 
-def calcular_clusters_necesarios(tamanio: int) -> int:
+def calcular_clusters_necesarios(tamanio: int, tamanio_cluster: int = 1024) -> int:
     """
     Calcula cuántos clusters se necesitan para almacenar un archivo.
 
+    Filesystem pasa siempre el tamaño de cluster de su superblock (512 B a
+    1 MB en 26-3); el default es el de la geometría fija de 26-1/26-2.
+
     Args:
         tamanio: Tamaño del archivo en bytes
+        tamanio_cluster: Bytes por cluster (default: 1024)
 
     Returns:
         Número de clusters necesarios (división con techo)
 
     Ejemplo:
-        >>> calcular_clusters_necesarios(100)
-        1
-        >>> calcular_clusters_necesarios(1024)
-        1
         >>> calcular_clusters_necesarios(1025)
         2
-        >>> calcular_clusters_necesarios(0)
+        >>> calcular_clusters_necesarios(4096, 4096)
+        1
+        >>> calcular_clusters_necesarios(10 * 1024 * 1024, 4096)
+        2560
+        >>> calcular_clusters_necesarios(0, 4096)
         1
     """
     # Incluso archivos vacíos necesitan al menos 1 cluster
@@ -123,31 +140,33 @@ def calcular_clusters_necesarios(tamanio: int) -> int:
     if tamanio == 0:
         return 1
 
-    # División con techo: (tamanio + 1023) // 1024
-    # Equivale a math.ceil(tamanio / 1024)
-    return (tamanio + 1023) // 1024
+    # División con techo: equivale a math.ceil(tamanio / tamanio_cluster)
+    return (tamanio + tamanio_cluster - 1) // tamanio_cluster
 
 
-def validar_rango_clusters(inicio: int, cantidad: int) -> None:
+def validar_rango_clusters(inicio: int, cantidad: int,
+                           total_clusters: int = 1440, primer_cluster_datos: int = 5) -> None:
     """
     Valida que un rango de clusters sea válido.
 
     Args:
         inicio: Cluster de inicio
         cantidad: Cantidad de clusters
+        total_clusters: Total de clusters de la imagen
+        primer_cluster_datos: Primer cluster del área de datos
 
     Raises:
         ValueError: Si el rango no es válido
     """
-    validar_cluster(inicio, es_dato=True)
+    validar_cluster(inicio, True, total_clusters, primer_cluster_datos)
 
     if cantidad < 0:
         raise ValueError(f"La cantidad de clusters no puede ser negativa: {cantidad}")
 
     # Verificar que el rango no exceda el límite
     ultimo_cluster = inicio + cantidad - 1
-    if ultimo_cluster >= 1440:
+    if ultimo_cluster >= total_clusters:
         raise ValueError(
             f"El rango de clusters {inicio}-{ultimo_cluster} excede el límite. "
-            "El último cluster de datos es 1439"
+            f"El último cluster de datos es {total_clusters - 1}"
         )